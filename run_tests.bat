@@ -13,6 +13,86 @@ echo Testing data_reader...
 py tests\test_data_reader.py
 if errorlevel 1 goto error
 
+echo.
+echo Testing jsonl_scanner...
+py tests\test_jsonl_scanner.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing transcript_index...
+py tests\test_transcript_index.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing project_catalog...
+py tests\test_project_catalog.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing cost_ledger...
+py tests\test_cost_ledger.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing usage_monitor...
+py tests\test_usage_monitor.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing replay...
+py tests\test_replay.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing usage_export...
+py tests\test_usage_export.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing alerts...
+py tests\test_alerts.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing config_loader...
+py tests\test_config_loader.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing discovery_roots...
+py tests\test_discovery_roots.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing soak...
+py tests\test_soak.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing tui...
+py tests\test_tui.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing heavy_turns...
+py tests\test_heavy_turns.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing hook_receiver...
+py tests\test_hook_receiver.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing archiver...
+py tests\test_archiver.py
+if errorlevel 1 goto error
+
+echo.
+echo Testing snapshot_shm...
+py tests\test_snapshot_shm.py
+if errorlevel 1 goto error
+
 echo.
 echo ========================================
 echo All tests completed successfully!
@@ -0,0 +1,389 @@
+"""Alert rules evaluated against usage snapshots, with pluggable sinks"""
+import ipaddress
+import json
+import logging
+import shutil
+import subprocess
+import threading
+import time
+import urllib.request
+from collections import deque
+from typing import Callable, Optional
+from urllib.parse import urlparse
+try:
+    from .config import Config
+    from .data_reader import get_live_sessions
+except ImportError:
+    from config import Config
+    from data_reader import get_live_sessions
+
+
+def make_alert(key: str, title: str, message: str, level: str = "warning",
+               session: Optional[str] = None) -> dict:
+    """
+    Build an alert dict.
+
+    Args:
+        key: Identity used for cooldowns (rule + subject + threshold)
+        title: Short heading
+        message: Body text
+        level: "warning" or "critical"
+        session: Session path the alert is about
+
+    Returns:
+        Alert dict
+    """
+    return {"key": key, "title": title, "message": message, "level": level,
+            "session": session}
+
+
+class ThresholdRule:
+    """
+    Fires when a session's usage percentage reaches a threshold.
+
+    Each (session, threshold) pair is armed until it fires and re-arms only
+    after usage falls ALERT_HYSTERESIS_PCT below the threshold, so a session
+    hovering at the line fires once.
+    """
+
+    def __init__(self, thresholds: list, any_session: bool = False,
+                 hysteresis: Optional[float] = None):
+        """
+        Initialize rule.
+
+        Args:
+            thresholds: Percentages to alert at
+            any_session: Watch every live session instead of the active one
+            hysteresis: Re-arm margin in percentage points
+                (default: Config.ALERT_HYSTERESIS_PCT)
+        """
+        if not thresholds or any(not 0 < t <= 1000 for t in thresholds):
+            raise ValueError(f"invalid thresholds: {thresholds!r}")
+        self.thresholds = sorted(float(t) for t in thresholds)
+        self.any_session = any_session
+        self.hysteresis = Config.ALERT_HYSTERESIS_PCT if hysteresis is None else hysteresis
+        self._fired = set()  # (session_path, threshold) currently disarmed
+
+    def _subjects(self, snapshot: dict) -> list[dict]:
+        if self.any_session and snapshot["sessions"]:
+            return snapshot["sessions"]
+        return [snapshot] if snapshot["active"] else []
+
+    def evaluate(self, snapshot: dict, now: float) -> list[dict]:
+        alerts = []
+        for subject in self._subjects(snapshot):
+            path = subject["session_path"]
+            pct = subject["percentage"]
+            for threshold in self.thresholds:
+                state = (path, threshold)
+                if state in self._fired:
+                    if pct < threshold - self.hysteresis:
+                        self._fired.discard(state)
+                elif pct >= threshold:
+                    self._fired.add(state)
+                    scope = "any" if self.any_session else "active"
+                    alerts.append(make_alert(
+                        f"threshold:{scope}:{path}:{threshold:g}",
+                        f"Context at {pct:.0f}%",
+                        f"{subject['project']} reached {threshold:g}% "
+                        f"({subject['tokens']:,} tokens)",
+                        "critical" if threshold >= 95 else "warning",
+                        path,
+                    ))
+        return alerts
+
+    def forget(self, live: set):
+        """Drop disarmed states of sessions that are no longer live."""
+        self._fired = {state for state in self._fired if state[0] in live}
+
+
+class BurnRateRule:
+    """
+    Fires when the active session consumes tokens faster than a limit.
+
+    The rate is measured over the last ALERT_BURN_WINDOW_S seconds of
+    snapshots and re-arms once it falls below (100 - hysteresis)% of the
+    limit.
+    """
+
+    def __init__(self, tokens_per_min: float, window_s: Optional[float] = None,
+                 hysteresis: Optional[float] = None):
+        """
+        Initialize rule.
+
+        Args:
+            tokens_per_min: Rate limit
+            window_s: Measurement span (default: Config.ALERT_BURN_WINDOW_S)
+            hysteresis: Re-arm margin in percent of the limit
+                (default: Config.ALERT_HYSTERESIS_PCT)
+        """
+        if tokens_per_min <= 0:
+            raise ValueError(f"invalid tokens_per_min: {tokens_per_min!r}")
+        self.tokens_per_min = float(tokens_per_min)
+        self.window_s = Config.ALERT_BURN_WINDOW_S if window_s is None else window_s
+        hysteresis = Config.ALERT_HYSTERESIS_PCT if hysteresis is None else hysteresis
+        self.rearm_rate = self.tokens_per_min * (1 - hysteresis / 100)
+        self._session = None
+        self._samples = deque()
+        self._armed = True
+
+    def rate(self, now: float) -> Optional[float]:
+        """Current tokens/minute, or None until enough history exists."""
+        if len(self._samples) < 2:
+            return None
+        (t0, tok0), (t1, tok1) = self._samples[0], self._samples[-1]
+        span = t1 - t0
+        if span < min(10.0, self.window_s):
+            return None
+        return (tok1 - tok0) / span * 60
+
+    def evaluate(self, snapshot: dict, now: float) -> list[dict]:
+        if not snapshot["active"]:
+            return []
+        if snapshot["session_path"] != self._session:
+            self._session = snapshot["session_path"]
+            self._samples.clear()
+            self._armed = True
+        self._samples.append((now, snapshot["tokens"]))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.window_s:
+            self._samples.popleft()
+
+        rate = self.rate(now)
+        if rate is None:
+            return []
+        if not self._armed:
+            if rate < self.rearm_rate:
+                self._armed = True
+            return []
+        if rate > self.tokens_per_min:
+            self._armed = False
+            return [make_alert(
+                f"burn_rate:{self._session}",
+                "High token burn rate",
+                f"{snapshot['project']} is using {rate:,.0f} tokens/min",
+                session=self._session,
+            )]
+        return []
+
+    def forget(self, live: set):
+        """Drop the measured session once it is no longer live."""
+        if self._session is not None and self._session not in live:
+            self._session = None
+            self._samples.clear()
+            self._armed = True
+
+
+def build_rules(specs: list) -> list:
+    """
+    Build rule objects from Config.ALERT_RULES-style dicts.
+
+    Args:
+        specs: List of rule dicts
+
+    Returns:
+        List of rule objects
+
+    Raises:
+        ValueError: On an unknown rule type or invalid parameters
+    """
+    rules = []
+    for spec in specs:
+        rule_type = spec.get("type")
+        if rule_type == "percentage":
+            rules.append(ThresholdRule(spec.get("thresholds", [])))
+        elif rule_type == "any_session":
+            rules.append(ThresholdRule(spec.get("thresholds", []), any_session=True))
+        elif rule_type == "burn_rate":
+            rules.append(BurnRateRule(spec.get("tokens_per_min", 0)))
+        else:
+            raise ValueError(f"unknown alert rule type: {rule_type!r}")
+    return rules
+
+
+# -- Sinks ------------------------------------------------------------------
+SINK_NAMES = ("tk", "notify-send", "webhook", "stdout")
+
+
+
+class StdoutSink:
+    """Prints alerts (headless mode)"""
+
+    def __call__(self, alert: dict):
+        print(f"[{alert['level'].upper()}] {alert['title']}: {alert['message']}", flush=True)
+
+
+class NotifySendSink:
+    """Desktop notifications through notify-send (Linux)"""
+
+    def __init__(self):
+        self.command = shutil.which("notify-send")
+
+    def __call__(self, alert: dict):
+        if not self.command:
+            return
+        urgency = "critical" if alert["level"] == "critical" else "normal"
+        try:
+            subprocess.Popen(
+                [self.command, "-a", "Context Monitor", "-u", urgency, alert["title"], alert["message"]],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            logging.warning(f"notify-send failed: {e}")
+
+
+def is_local_url(url: str) -> bool:
+    """Check that a webhook URL points at this machine."""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return False
+    if parsed.hostname == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(parsed.hostname).is_loopback
+    except ValueError:
+        return False
+
+
+class WebhookSink:
+    """POSTs alerts as JSON to a local HTTP endpoint from a worker thread"""
+
+    def __init__(self, url: str, timeout_s: float = 2.0):
+        if not is_local_url(url):
+            raise ValueError(f"webhook must be a local http(s) URL: {url!r}")
+        self.url = url
+        self.timeout_s = timeout_s
+
+    def _post(self, alert: dict):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(alert).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout_s).close()
+        except OSError as e:
+            logging.warning(f"Alert webhook failed: {e}")
+
+    def __call__(self, alert: dict):
+        threading.Thread(target=self._post, args=(alert,), daemon=True).start()
+
+
+class TkToastSink:
+    """Small self-closing window shown next to the widget"""
+
+    def __init__(self, root, duration_ms: int = 6000):
+        self.root = root
+        self.duration_ms = duration_ms
+
+    def __call__(self, alert: dict):
+        import tkinter as tk
+
+        toast = tk.Toplevel(self.root)
+        toast.overrideredirect(True)
+        toast.attributes("-topmost", True)
+        color = Config.COLOR_CRITICAL if alert["level"] == "critical" else Config.COLOR_WARNING
+        toast.configure(bg=color)
+        for text, font in ((alert["title"], ("Arial", 10, "bold")), (alert["message"], ("Arial", 9))):
+            tk.Label(toast, text=text, font=font, bg=Config.BG_COLOR, fg=Config.TEXT_COLOR,
+                     padx=10, pady=2).pack(fill="x", padx=2)
+        x = self.root.winfo_x()
+        y = self.root.winfo_y() + self.root.winfo_height() + 8
+        toast.geometry(f"+{x}+{y}")
+        toast.after(self.duration_ms, toast.destroy)
+        toast.bind("<Button-1>", lambda _event: toast.destroy())
+
+
+def build_sinks(names: list, root=None) -> list:
+    """
+    Build sinks from Config.ALERT_SINKS-style names.
+
+    Args:
+        names: Sink names
+        root: tkinter root window (the "tk" sink is skipped without one)
+
+    Returns:
+        List of callables taking an alert dict
+    """
+    sinks = []
+    for name in names:
+        if name == "tk":
+            if root is not None:
+                sinks.append(TkToastSink(root))
+        elif name == "notify-send":
+            sinks.append(NotifySendSink())
+        elif name == "webhook":
+            sinks.append(WebhookSink(Config.ALERT_WEBHOOK_URL))
+        elif name == "stdout":
+            sinks.append(StdoutSink())
+        else:
+            raise ValueError(f"unknown alert sink: {name!r}")
+    return sinks
+
+
+class AlertEngine:
+    """
+    Evaluates rules against each changed snapshot and dispatches alerts.
+
+    Subscribe evaluate() to a UsageMonitor: it only runs when the snapshot
+    actually changes. Identical alert keys are suppressed for
+    ALERT_COOLDOWN_S on top of each rule's own hysteresis.
+    """
+
+    def __init__(self, rules: list, sinks: list, cooldown_s: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rules = rules
+        self.sinks = sinks
+        self.cooldown_s = Config.ALERT_COOLDOWN_S if cooldown_s is None else cooldown_s
+        self.clock = clock
+        self._last_fired = {}  # alert key -> (time, session path)
+
+    @classmethod
+    def from_config(cls, root=None) -> "AlertEngine":
+        """Build an engine from Config.ALERT_RULES and Config.ALERT_SINKS."""
+        return cls(build_rules(Config.ALERT_RULES), build_sinks(Config.ALERT_SINKS, root))
+
+    @property
+    def needs_all_sessions(self) -> bool:
+        """True if any rule watches every live session."""
+        return any(getattr(rule, "any_session", False) for rule in self.rules)
+
+    def evaluate(self, snapshot: dict) -> list[dict]:
+        """
+        Evaluate all rules and dispatch new alerts.
+
+        Args:
+            snapshot: Snapshot dict from UsageMonitor
+
+        Returns:
+            Alerts dispatched
+        """
+        now = self.clock()
+        dispatched = []
+        for rule in self.rules:
+            for alert in rule.evaluate(snapshot, now):
+                last = self._last_fired.get(alert["key"])
+                if last is not None and now - last[0] < self.cooldown_s:
+                    continue
+                self._last_fired[alert["key"]] = (now, alert.get("session"))
+                dispatched.append(alert)
+                for sink in self.sinks:
+                    try:
+                        sink(alert)
+                    except Exception as e:
+                        logging.warning(f"Alert sink failed: {e}")
+        self._forget_ended(snapshot)
+        return dispatched
+
+    def _forget_ended(self, snapshot: dict):
+        """Drop rule and cooldown state of sessions that are no longer live."""
+        live = {str(path) for path in get_live_sessions()}
+        live.update(session["session_path"] for session in snapshot["sessions"])
+        if snapshot["active"]:
+            live.add(snapshot["session_path"])
+        for rule in self.rules:
+            rule.forget(live)
+        self._last_fired = {
+            key: (fired_at, session) for key, (fired_at, session) in self._last_fired.items()
+            if session is None or session in live
+        }
@@ -0,0 +1,262 @@
+"""Compress transcripts that have not been written to for a while
+
+Usage:
+    python src/archiver.py [--days 30] [--codec auto|gzip|xz|zstd] [--project NAME] [--dry-run]
+
+Each cold "<id>.jsonl" is replaced by "<id>.jsonl.gz" (or .xz / .zst) with
+the original modification time, plus a "<id>.summary.json" sidecar holding a
+usage summary computed while archiving. Archived transcripts are invisible
+to active-session discovery; usage_export.py stream-decompresses them, and
+heavy_turns.py takes their heaviest turns from the summary instead. Restore
+one with e.g. ``gunzip``.
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    from .config import Config
+    from .data_reader import iter_all_session_paths, extract_tokens_from_entry, extract_usage_breakdown
+    from .heavy_turns import TopTurns, TurnScanner
+    from .jsonl_scanner import (
+        LineScanner, LZMA_AVAILABLE, ZSTD_AVAILABLE, read_summary, summary_path_for, transcript_stem,
+    )
+    from .transcript_index import index_path_for
+except ImportError:
+    from config import Config
+    from data_reader import iter_all_session_paths, extract_tokens_from_entry, extract_usage_breakdown
+    from heavy_turns import TopTurns, TurnScanner
+    from jsonl_scanner import (
+        LineScanner, LZMA_AVAILABLE, ZSTD_AVAILABLE, read_summary, summary_path_for, transcript_stem,
+    )
+    from transcript_index import index_path_for
+
+if LZMA_AVAILABLE:
+    import lzma
+if ZSTD_AVAILABLE:
+    import zstandard
+
+
+CODEC_SUFFIXES = {"gzip": ".gz", "xz": ".xz", "zstd": ".zst"}
+
+# Heaviest turns kept in a summary; heavy_turns.py answers -n up to this
+# from the summary without decompressing the archive
+SUMMARY_TOP_TURNS = 50
+
+
+def resolve_codec(codec: str) -> str:
+    """
+    Pick the codec for "auto" and check availability.
+
+    Args:
+        codec: auto, gzip, xz or zstd
+
+    Returns:
+        Concrete codec name
+
+    Raises:
+        RuntimeError: If the requested codec is not available
+    """
+    if codec == "auto":
+        return "zstd" if ZSTD_AVAILABLE else "gzip"
+    if codec == "zstd" and not ZSTD_AVAILABLE:
+        raise RuntimeError("zstd needs the zstandard package (pip install zstandard)")
+    if codec == "xz" and not LZMA_AVAILABLE:
+        raise RuntimeError("xz needs a Python built with lzma")
+    return codec
+
+
+def _open_compressed(path: Path, codec: str):
+    """Binary writer for the given codec."""
+    if codec == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if codec == "xz":
+        return lzma.open(path, "wb", preset=6)
+    return zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb"), closefd=True)
+
+
+def summarize_transcript(path: Path) -> dict:
+    """
+    Compute the usage summary stored next to an archive.
+
+    Args:
+        path: Plain transcript
+
+    Returns:
+        Dict with turns, token totals by type (each assistant message counted
+        once), final context size, model, cwd, first/last timestamps and the
+        SUMMARY_TOP_TURNS heaviest turns (see heavy_turns.py)
+    """
+    totals = {"input": 0, "output": 0, "cache_read": 0, "cache_write_5m": 0, "cache_write_1h": 0}
+    summary = {"session": transcript_stem(path), "turns": 0, "context_tokens": 0,
+               "model": None, "cwd": None, "first_timestamp": None, "last_timestamp": None}
+    pending = None
+    pending_id = None
+
+    def commit(breakdown):
+        summary["turns"] += 1
+        for key, value in breakdown.items():
+            totals[key] += value
+
+    scanner = LineScanner()
+    with open(path, "rb") as f:
+        for _, entry in scanner.scan(f):
+            timestamp = entry.get("timestamp")
+            if isinstance(timestamp, str):
+                summary["first_timestamp"] = summary["first_timestamp"] or timestamp
+                summary["last_timestamp"] = timestamp
+            if summary["cwd"] is None and isinstance(entry.get("cwd"), str):
+                summary["cwd"] = entry["cwd"]
+            total = extract_tokens_from_entry(entry)
+            if total <= 0:
+                continue
+            message = entry.get("message", {})
+            message_id = message.get("id")
+            if pending is not None and (message_id is None or message_id != pending_id):
+                commit(pending)
+            pending = extract_usage_breakdown(entry)
+            pending_id = message_id
+            if not entry.get("isSidechain"):
+                summary["context_tokens"] = total
+                summary["model"] = message.get("model") or summary["model"]
+    if pending is not None:
+        commit(pending)
+    summary["tokens"] = totals
+
+    top = TopTurns(SUMMARY_TOP_TURNS)
+    turns = TurnScanner(path)
+    turns.feed(top.add, final=True)
+    turns.flush(top.add)
+    summary["top_turns_n"] = SUMMARY_TOP_TURNS
+    summary["top_turns"] = [{key: value for key, value in turn.items() if key != "session_path"}
+                            for turn in top.results()]
+    return summary
+
+
+def archive_transcript(path: Path, codec: str) -> Path:
+    """
+    Compress one transcript and write its summary.
+
+    The archive is written under a temporary name. The original is then
+    moved aside before it is checked for changes, so a write by path lands
+    in a new transcript rather than in a file about to be deleted; only if
+    the moved file is unchanged is the archive renamed into place and the
+    original removed.
+
+    Args:
+        path: Plain transcript
+        codec: gzip, xz or zstd (see resolve_codec)
+
+    Returns:
+        Path of the archive
+
+    Raises:
+        OSError: On I/O errors
+        RuntimeError: If the transcript was written to while archiving (the
+            message names the moved-aside original if it could not be put
+            back because a new transcript was created at its path)
+    """
+    before = path.stat()
+    summary = summarize_transcript(path)
+    summary.update({"codec": codec, "original_bytes": before.st_size,
+                    "original_mtime": before.st_mtime, "archived_at": time.time()})
+
+    archive = path.with_name(path.name + CODEC_SUFFIXES[codec])
+    partial = archive.with_name(archive.name + ".part")
+    held = path.with_name(path.name + ".archiving")
+    try:
+        with open(path, "rb") as src, _open_compressed(partial, codec) as dst:
+            shutil.copyfileobj(src, dst, Config.READ_CHUNK_SIZE)
+        os.utime(partial, (before.st_atime, before.st_mtime))
+        os.rename(path, held)
+        after = held.stat()
+        if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+            raise RuntimeError(f"{path.name} changed while archiving")
+        with open(summary_path_for(path), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        os.replace(partial, archive)
+    except BaseException as e:
+        partial.unlink(missing_ok=True)
+        if held.exists():
+            if not path.exists():
+                os.rename(held, path)  # put the original back
+            elif isinstance(e, Exception):
+                # A new transcript took its place: never drop the old one silently
+                raise RuntimeError(f"{path.name} was recreated while archiving; "
+                                   f"the original is kept as {held}") from e
+        raise
+    held.unlink()
+    index_path_for(path).unlink(missing_ok=True)  # the sidecar index is for the plain file
+    return archive
+
+
+def find_cold_transcripts(days: float, project: Optional[str] = None) -> list[Path]:
+    """
+    List plain transcripts not modified for the given number of days.
+
+    Args:
+        days: Idle age in days
+        project: Project filter (see iter_session_files)
+
+    Returns:
+        Paths, oldest first
+    """
+    cutoff = time.time() - days * 86400
+    cold = []
+    for path in iter_all_session_paths(project=project):
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            continue
+        if mtime < cutoff:
+            cold.append((mtime, path))
+    cold.sort()
+    return [path for _, path in cold]
+
+
+def main(argv=None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Compress transcripts idle for N days")
+    parser.add_argument("--days", type=float, default=Config.ARCHIVE_AFTER_DAYS,
+                        help=f"idle age in days (default: {Config.ARCHIVE_AFTER_DAYS})")
+    parser.add_argument("--codec", default=Config.ARCHIVE_CODEC, choices=("auto", *CODEC_SUFFIXES))
+    parser.add_argument("--project", help="project name or path to include")
+    parser.add_argument("--dry-run", action="store_true", help="only list what would be archived")
+    args = parser.parse_args(argv)
+
+    try:
+        codec = resolve_codec(args.codec)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    paths = find_cold_transcripts(args.days, args.project)
+    saved = 0
+    archived = 0
+    for path in paths:
+        if args.dry_run:
+            print(path)
+            continue
+        try:
+            size = path.stat().st_size
+            archive = archive_transcript(path, codec)
+        except (OSError, RuntimeError) as e:
+            print(f"Skipped {path}: {e}", file=sys.stderr)
+            continue
+        archived += 1
+        saved += size - archive.stat().st_size
+    if args.dry_run:
+        print(f"{len(paths)} transcripts idle for {args.days:g}+ days")
+    else:
+        print(f"Archived {archived} of {len(paths)} transcripts ({codec}), saved {saved / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,16 @@ MODEL_INFO = {
     "claude-haiku-4-5-20251001":  {"name": "Haiku 4.5",   "limit": 200000},
 }
 
+# USD per million tokens. cache_write is the 5-minute TTL rate,
+# cache_write_1h the 1-hour TTL rate.
+MODEL_PRICING = {
+    "claude-opus-4-6":            {"input": 5.00, "output": 25.00, "cache_read": 0.50, "cache_write": 6.25, "cache_write_1h": 10.00},
+    "claude-opus-4-5-20251101":   {"input": 5.00, "output": 25.00, "cache_read": 0.50, "cache_write": 6.25, "cache_write_1h": 10.00},
+    "claude-sonnet-4-6":          {"input": 3.00, "output": 15.00, "cache_read": 0.30, "cache_write": 3.75, "cache_write_1h": 6.00},
+    "claude-sonnet-4-5-20250929": {"input": 3.00, "output": 15.00, "cache_read": 0.30, "cache_write": 3.75, "cache_write_1h": 6.00},
+    "claude-haiku-4-5-20251001":  {"input": 1.00, "output": 5.00,  "cache_read": 0.10, "cache_write": 1.25, "cache_write_1h": 2.00},
+}
+
 DEFAULT_MODEL_NAME = "Unknown"
 DEFAULT_MODEL_LIMIT = 200000
 
@@ -32,9 +42,50 @@ class Config:
     # Claude Code directories
     CLAUDE_PROJECTS_DIR = Path.home() / ".claude" / "projects"
 
+    # Extra projects roots (WSL, devcontainers, network mounts). Each is
+    # scanned by its own background worker and merged into the active-session
+    # view. Entries are paths or dicts:
+    #   {"path": "//wsl$/Ubuntu/home/me/.claude/projects", "label": "wsl",
+    #    "interval_s": 30, "timeout_s": 10}
+    CLAUDE_PROJECTS_DIRS = []
+    ROOT_SCAN_INTERVAL_S = 15  # Default rescan interval of an extra root
+    ROOT_SCAN_TIMEOUT_S = 10  # A scan running longer marks the root unavailable
+
+    # Discovery
+    DISCOVERY_MAX_AGE_S = 0  # Never select a transcript idle longer than this (0 = no cutoff)
+    DISCOVERY_WORKERS = 1  # Threads stat'ing project dirs in parallel (helps slow disks)
+
+    # Live sessions (all recently written transcripts, not just the newest)
+    LIVE_SESSION_WINDOW_S = 600  # Modified within 10 minutes counts as live
+    TRACK_LIVE_SESSIONS = False  # Include every live session in snapshots
+
+    # Subagents (sidechain entries and <session>/subagents/*.jsonl transcripts)
+    SHOW_SUBAGENTS = False  # List a session's active subagents in snapshots
+    SUBAGENT_ACTIVE_S = 120  # A subagent written to within this long counts as active
+
+    # Push events from Claude Code hooks (src/hook_client.py)
+    HOOK_ENABLED = True  # Listen for hook events on localhost
+    HOOK_PORT = 47391  # UDP port on 127.0.0.1 (hook_client.py: CLAUDE_MONITOR_HOOK_PORT)
+    HOOK_PIN_TTL_S = 600  # A pushed session stays selected this long after its last event
+    HOOK_DISCOVERY_INTERVAL_S = 30  # Full discovery pass frequency while a session is pinned
+    HOOK_CHECK_INTERVAL_MS = 100  # How often the window checks for pushed events
+
+    # Shared-memory snapshot for local readers (src/snapshot_reader.py)
+    SNAPSHOT_SHM_ENABLED = True
+    SNAPSHOT_SHM_PATH = None  # None = /dev/shm/claude-monitor-<uid>.snapshot, else CONFIG_DIR/snapshot.shm
+
+    # Transcript reading
+    READ_CHUNK_SIZE = 64 * 1024  # Bytes read per I/O call
+    MAX_LINE_BYTES = 1024 * 1024  # Longer lines are streamed, never built
+    JSON_BACKEND = "json"  # "json" (stdlib) or "orjson" (if installed)
+
+    # Archiving cold transcripts (src/archiver.py)
+    ARCHIVE_AFTER_DAYS = 30  # Transcripts idle this long are compressed
+    ARCHIVE_CODEC = "auto"  # "auto" (zstd if installed, else gzip), "gzip", "xz" or "zstd"
+
     # Window settings
     WINDOW_WIDTH = 420
-    WINDOW_HEIGHT = 240  # Increased to accommodate project name label
+    WINDOW_HEIGHT = 272  # Room for the project, compaction, cache, subagent and cost lines
     ALWAYS_ON_TOP = True
 
     # Color thresholds and values
@@ -52,12 +103,44 @@ class Config:
     # Compress button settings
     COMPRESS_THRESHOLD = 70.0  # Enable button at 70% usage
 
+    # Prompt-cache telemetry
+    CACHE_WINDOW_TURNS = 20  # Messages in the rolling cache-hit ratio
+    CACHE_HIT_WARN_PCT = 50.0  # Highlight the cache line below this hit ratio
+
+    # Alert settings
+    ALERTS_ENABLED = False
+    ALERT_RULES = [
+        {"type": "percentage", "thresholds": [80, 95]},   # active session
+        {"type": "burn_rate", "tokens_per_min": 30000},
+        {"type": "any_session", "thresholds": [90]},      # any live session
+    ]
+    ALERT_HYSTERESIS_PCT = 3.0  # Re-arm once usage drops this far below a threshold
+    ALERT_COOLDOWN_S = 300  # Minimum time between repeats of the same alert
+    ALERT_BURN_WINDOW_S = 120  # Span over which burn rate is measured
+    ALERT_SINKS = ["tk"]  # Any of: "tk", "notify-send", "webhook", "stdout"
+    ALERT_WEBHOOK_URL = "http://127.0.0.1:8765/claude-monitor"  # Local endpoints only
+
     # Auto-close settings
     AUTO_CLOSE_ENABLED = True  # Enable auto-close when Claude Code exits
     AUTO_CLOSE_PROCESS_NAME = "claude.exe"  # Windows process name
     AUTO_CLOSE_CHECK_INTERVAL_MS = 5000  # Check every 5 seconds
     AUTO_CLOSE_GRACE_PERIOD_MS = 10000  # Wait 10s after last process exits
 
+    # Cost tracking
+    COST_TRACKING_ENABLED = False  # Maintain the cost ledger and show a cost line
+    LEDGER_SAVE_INTERVAL_S = 30  # Max ledger write frequency
+
+    # Soak test budgets (src/soak.py)
+    SOAK_MAX_TRACED_GROWTH_MB = 1.0  # Python heap growth after warmup
+    SOAK_MAX_RSS_GROWTH_MB = 5.0  # Resident set growth after warmup
+    SOAK_MAX_CPU_PCT = 1.0  # Mean tick CPU as % of REFRESH_INTERVAL_MS
+
     # Persistence
     CONFIG_DIR = Path.home() / ".claude-monitor"
     POSITION_FILE = CONFIG_DIR / "position.json"
+    INDEX_DIR = CONFIG_DIR / "index"  # Sidecar transcript indexes
+    INDEX_CACHE_SIZE = 32  # Transcript indexes kept in memory
+    PROJECT_CATALOG_FILE = CONFIG_DIR / "projects.json"
+    CATALOG_SAVE_INTERVAL_S = 60  # Max catalog write frequency while sessions grow
+    COST_LEDGER_FILE = CONFIG_DIR / "costs.json"
+    USER_CONFIG_FILES = ("config.toml", "config.json")  # Overrides in CONFIG_DIR, first found wins
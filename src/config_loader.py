@@ -0,0 +1,388 @@
+"""Hot-reloadable user overrides for Config (TOML or JSON in Config.CONFIG_DIR)
+
+Example ~/.claude-monitor/config.toml:
+
+    refresh_interval_ms = 1000
+    discovery_workers = 4
+    json_backend = "orjson"
+    claude_projects_dirs = [
+        {path = "//wsl$/Ubuntu/home/me/.claude/projects", label = "wsl", interval_s = 30},
+    ]
+
+    [models."claude-sonnet-4-6"]
+    limit = 1000000
+
+Keys are the lower-cased names of the Config attributes listed in TUNABLES.
+A changed file is picked up by a stat() check on the next refresh; an
+invalid file is rejected as a whole and the previous values stay in effect.
+Settings in STARTUP_ONLY are read when a front-end starts (alerts, hooks,
+the shared-memory segment) and take effect on the next start.
+"""
+import copy
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import tomllib
+    TOML_AVAILABLE = True
+except ImportError:
+    try:
+        import tomli as tomllib
+        TOML_AVAILABLE = True
+    except ImportError:
+        TOML_AVAILABLE = False
+
+try:
+    from .config import Config, MODEL_INFO
+    from .jsonl_scanner import ORJSON_AVAILABLE, ZSTD_AVAILABLE
+    from .discovery_roots import normalize_root_spec
+    from .alerts import SINK_NAMES, build_rules, is_local_url
+except ImportError:
+    from config import Config, MODEL_INFO
+    from jsonl_scanner import ORJSON_AVAILABLE, ZSTD_AVAILABLE
+    from discovery_roots import normalize_root_spec
+    from alerts import SINK_NAMES, build_rules, is_local_url
+
+
+# Config attribute -> (type, minimum, maximum) or (type, allowed values)
+TUNABLES = {
+    # Poll intervals
+    "REFRESH_INTERVAL_MS": (int, 100, 60_000),
+    "AUTO_CLOSE_CHECK_INTERVAL_MS": (int, 500, 600_000),
+    "AUTO_CLOSE_GRACE_PERIOD_MS": (int, 0, 3_600_000),
+    # Discovery
+    "CLAUDE_PROJECTS_DIRS": (list,),
+    "ROOT_SCAN_INTERVAL_S": (int, 1, 3600),
+    "ROOT_SCAN_TIMEOUT_S": (int, 1, 3600),
+    "DISCOVERY_MAX_AGE_S": (int, 0, 365 * 86400),
+    "DISCOVERY_WORKERS": (int, 1, 32),
+    "LIVE_SESSION_WINDOW_S": (int, 10, 86400),
+    "HOOK_PIN_TTL_S": (int, 1, 86400),
+    "HOOK_DISCOVERY_INTERVAL_S": (int, 1, 3600),
+    "HOOK_CHECK_INTERVAL_MS": (int, 10, 10_000),
+    "SUBAGENT_ACTIVE_S": (int, 1, 86400),
+    # Caches and I/O sizes
+    "INDEX_CACHE_SIZE": (int, 1, 4096),
+    "READ_CHUNK_SIZE": (int, 4096, 16 * 1024 * 1024),
+    "MAX_LINE_BYTES": (int, 64 * 1024, 256 * 1024 * 1024),
+    "CATALOG_SAVE_INTERVAL_S": (int, 1, 3600),
+    "LEDGER_SAVE_INTERVAL_S": (int, 1, 3600),
+    # Parser backend
+    "JSON_BACKEND": (str, ("json", "orjson")),
+    # Archiver
+    "ARCHIVE_AFTER_DAYS": (int, 1, 3650),
+    "ARCHIVE_CODEC": (str, ("auto", "gzip", "xz", "zstd")),
+    # Behaviour
+    "AUTO_CLOSE_ENABLED": (bool,),
+    "AUTO_CLOSE_PROCESS_NAME": (str,),
+    "COMPRESS_THRESHOLD": (float, 0.0, 100.0),
+    "CACHE_WINDOW_TURNS": (int, 1, 1000),
+    "CACHE_HIT_WARN_PCT": (float, 0.0, 100.0),
+    "SHOW_SUBAGENTS": (bool,),
+    "COST_TRACKING_ENABLED": (bool,),
+    "TRACK_LIVE_SESSIONS": (bool,),
+    # Alerts
+    "ALERTS_ENABLED": (bool,),
+    "ALERT_RULES": (list,),
+    "ALERT_SINKS": (list,),
+    "ALERT_HYSTERESIS_PCT": (float, 0.0, 50.0),
+    "ALERT_COOLDOWN_S": (int, 0, 86400),
+    "ALERT_BURN_WINDOW_S": (int, 10, 3600),
+    "ALERT_WEBHOOK_URL": (str,),
+    # Hooks and shared-memory snapshot
+    "HOOK_ENABLED": (bool,),
+    "HOOK_PORT": (int, 1024, 65535),
+    "SNAPSHOT_SHM_ENABLED": (bool,),
+    "SNAPSHOT_SHM_PATH": (str,),
+}
+
+# Tunables only read when a front-end starts
+STARTUP_ONLY = frozenset({
+    "ALERTS_ENABLED", "ALERT_RULES", "ALERT_SINKS", "ALERT_HYSTERESIS_PCT",
+    "ALERT_COOLDOWN_S", "ALERT_BURN_WINDOW_S", "ALERT_WEBHOOK_URL",
+    "HOOK_ENABLED", "HOOK_PORT", "SNAPSHOT_SHM_ENABLED", "SNAPSHOT_SHM_PATH",
+})
+
+
+def validate_value(name: str, value):
+    """
+    Check and coerce one override.
+
+    Args:
+        name: Config attribute name (a TUNABLES key)
+        value: Value read from the file
+
+    Returns:
+        Value converted to the attribute's type
+
+    Raises:
+        ValueError: If the value has the wrong type or is out of range
+    """
+    spec = TUNABLES[name]
+    expected = spec[0]
+    # bool is an int subclass: never accept it for numeric settings
+    if isinstance(value, bool) != (expected is bool):
+        raise ValueError(f"{name.lower()}: expected {expected.__name__}, got {value!r}")
+    if expected is float and isinstance(value, int):
+        value = float(value)
+    if not isinstance(value, expected):
+        raise ValueError(f"{name.lower()}: expected {expected.__name__}, got {value!r}")
+    if len(spec) == 3 and not spec[1] <= value <= spec[2]:
+        raise ValueError(f"{name.lower()}: {value!r} outside {spec[1]}..{spec[2]}")
+    if len(spec) == 2 and value not in spec[1]:
+        raise ValueError(f"{name.lower()}: {value!r} not one of {', '.join(spec[1])}")
+    if name == "CLAUDE_PROJECTS_DIRS":
+        for root in value:
+            normalize_root_spec(root)
+    if name == "JSON_BACKEND" and value == "orjson" and not ORJSON_AVAILABLE:
+        raise ValueError("json_backend: orjson is not installed (pip install orjson)")
+    if name == "ARCHIVE_CODEC" and value == "zstd" and not ZSTD_AVAILABLE:
+        raise ValueError("archive_codec: zstandard is not installed (pip install zstandard)")
+    if name == "ALERT_RULES":
+        if not all(isinstance(rule, dict) for rule in value):
+            raise ValueError("alert_rules: expected a list of tables")
+        try:
+            build_rules(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"alert_rules: {e}")
+    if name == "ALERT_SINKS":
+        unknown = [sink for sink in value if sink not in SINK_NAMES]
+        if unknown:
+            raise ValueError(f"alert_sinks: {unknown!r} not among {', '.join(SINK_NAMES)}")
+    if name == "ALERT_WEBHOOK_URL" and not is_local_url(value):
+        raise ValueError("alert_webhook_url: only localhost endpoints are allowed")
+    return value
+
+
+def validate_models(models) -> dict:
+    """
+    Check [models] overrides.
+
+    Args:
+        models: Mapping of model id -> {"limit": int, "name": str}
+
+    Returns:
+        Validated mapping
+
+    Raises:
+        ValueError: On a malformed entry
+    """
+    if not isinstance(models, dict):
+        raise ValueError("models: expected a table of model ids")
+    validated = {}
+    for model_id, info in models.items():
+        if not isinstance(info, dict) or not set(info) <= {"limit", "name"}:
+            raise ValueError(f"models.{model_id}: only 'limit' and 'name' can be set")
+        limit = info.get("limit")
+        if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit <= 0):
+            raise ValueError(f"models.{model_id}.limit: expected a positive integer, got {limit!r}")
+        name = info.get("name")
+        if name is not None and not isinstance(name, str):
+            raise ValueError(f"models.{model_id}.name: expected a string, got {name!r}")
+        validated[model_id] = info
+    return validated
+
+
+def parse_config_file(path: Path) -> tuple[dict, dict]:
+    """
+    Read and validate a config file.
+
+    Args:
+        path: .toml or .json file
+
+    Returns:
+        Tuple of (attribute overrides, model overrides)
+
+    Raises:
+        ValueError: If the file cannot be parsed or fails validation
+        OSError: If the file cannot be read
+    """
+    if path.suffix == ".toml":
+        if not TOML_AVAILABLE:
+            raise ValueError(f"{path.name}: TOML needs Python 3.11+ or tomli; use config.json")
+        with open(path, "rb") as f:
+            try:
+                data = tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f"{path.name}: {e}")
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path.name}: {e}")
+    if not isinstance(data, dict):
+        raise ValueError(f"{path.name}: expected a table of settings")
+
+    overrides = {}
+    models = {}
+    for key, value in data.items():
+        if key == "models":
+            models = validate_models(value)
+            continue
+        name = key.upper()
+        if name not in TUNABLES:
+            raise ValueError(f"unknown setting: {key}")
+        overrides[name] = validate_value(name, value)
+    return overrides, models
+
+
+class ConfigReloader:
+    """
+    Applies a user config file over the built-in Config defaults.
+
+    check() costs one stat() per config file candidate while nothing has
+    changed, so it can run on every refresh. Settings removed from the file
+    revert to their defaults.
+    """
+
+    def __init__(self, config_dir: Optional[Path] = None):
+        """
+        Initialize reloader.
+
+        Args:
+            config_dir: Directory holding config.toml / config.json
+                (default: Config.CONFIG_DIR)
+        """
+        self.config_dir = config_dir or Config.CONFIG_DIR
+        self.defaults = {name: getattr(Config, name) for name in TUNABLES}
+        self.default_models = copy.deepcopy(MODEL_INFO)
+        self.path = None
+        self.overrides = {}
+        self.model_overrides = {}
+        self.error = None
+        self.loaded_at = None
+        self._signature = None
+        self._checked = False
+
+    def find_config_file(self) -> Optional[Path]:
+        """First existing file of Config.USER_CONFIG_FILES, if any."""
+        for name in Config.USER_CONFIG_FILES:
+            path = self.config_dir / name
+            if path.is_file():
+                return path
+        return None
+
+    def check(self) -> list[str]:
+        """
+        Reload the config file if it appeared, changed or disappeared.
+
+        Returns:
+            Names of the settings whose effective value changed
+        """
+        first = not self._checked
+        self._checked = True
+        path = self.find_config_file()
+        signature = None
+        if path is not None:
+            try:
+                stat = path.stat()
+                signature = (path, stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                path = None
+        if signature == self._signature:
+            return []
+        self._signature = signature
+        self.path = path
+
+        if path is None:
+            overrides, models = {}, {}
+        else:
+            try:
+                overrides, models = parse_config_file(path)
+            except (ValueError, OSError) as e:
+                self.error = str(e)
+                logging.warning(f"Ignoring {path}: {e}")
+                return []
+        self.error = None
+        self.loaded_at = time.time()
+        changed = self.apply(overrides, models)
+        restart = sorted(STARTUP_ONLY.intersection(changed))
+        if restart and not first:
+            logging.warning(f"{', '.join(name.lower() for name in restart)}: takes effect on the next start")
+        return changed
+
+    def apply(self, overrides: dict, models: dict) -> list[str]:
+        """
+        Make the given overrides the effective configuration.
+
+        Args:
+            overrides: Validated attribute overrides
+            models: Validated model overrides
+
+        Returns:
+            Names of the settings whose effective value changed
+        """
+        changed = []
+        for name, default in self.defaults.items():
+            value = overrides.get(name, default)
+            if getattr(Config, name) != value:
+                setattr(Config, name, value)
+                changed.append(name)
+
+        effective_models = copy.deepcopy(self.default_models)
+        for model_id, info in models.items():
+            entry = effective_models.setdefault(model_id, {"name": model_id, "limit": Config.PLAN_LIMIT})
+            entry.update(info)
+        if effective_models != MODEL_INFO:
+            # Update in place: other modules hold a reference to MODEL_INFO
+            MODEL_INFO.clear()
+            MODEL_INFO.update(effective_models)
+            changed.append("MODEL_INFO")
+
+        self.overrides = overrides
+        self.model_overrides = models
+        return changed
+
+    def effective_config(self) -> list[tuple[str, object, str]]:
+        """
+        List every tunable with its effective value.
+
+        Returns:
+            Tuples of (setting key, value, "file" or "default"), including
+            one "models.<id>.limit" row per known model
+        """
+        rows = []
+        for name in TUNABLES:
+            source = "file" if name in self.overrides else "default"
+            rows.append((name.lower(), getattr(Config, name), source))
+        for model_id, info in MODEL_INFO.items():
+            source = "file" if model_id in self.model_overrides else "default"
+            rows.append((f"models.{model_id}.limit", info["limit"], source))
+        return rows
+
+    def format_effective_config(self) -> str:
+        """Effective configuration as aligned text (for --print-config and the debug view)."""
+        if self.path is not None:
+            header = f"# config file: {self.path}"
+        else:
+            candidates = ", ".join(str(self.config_dir / name) for name in Config.USER_CONFIG_FILES)
+            header = f"# config file: none (looked for {candidates})"
+        lines = [header]
+        if self.error:
+            lines.append(f"# ERROR (previous values kept): {self.error}")
+        rows = self.effective_config()
+        width = max(len(key) for key, _, _ in rows)
+        for key, value, source in rows:
+            marker = "" if source == "default" else "  # from file"
+            lines.append(f"{key:<{width}} = {json.dumps(value)}{marker}")
+        return "\n".join(lines)
+
+
+_reloader: Optional[ConfigReloader] = None
+
+
+def get_reloader() -> ConfigReloader:
+    """
+    Get the process-wide config reloader.
+
+    Returns:
+        Shared ConfigReloader instance
+    """
+    global _reloader
+    if _reloader is None:
+        _reloader = ConfigReloader()
+    return _reloader
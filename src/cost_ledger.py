@@ -0,0 +1,356 @@
+"""Incremental per-model cost ledger for Claude Code sessions"""
+import json
+import os
+import time
+from bisect import bisect_right
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+try:
+    from .config import Config, MODEL_PRICING
+    from .data_reader import extract_usage_breakdown, extract_project_name, get_subagent_files
+    from .jsonl_scanner import LineScanner
+    from .project_catalog import project_key
+    from .transcript_index import TranscriptIndex, get_index
+except ImportError:
+    from config import Config, MODEL_PRICING
+    from data_reader import extract_usage_breakdown, extract_project_name, get_subagent_files
+    from jsonl_scanner import LineScanner
+    from project_catalog import project_key
+    from transcript_index import TranscriptIndex, get_index
+
+
+LEDGER_VERSION = 2  # 2: project totals keyed by project_key(), per-session days
+
+# Breakdown field -> MODEL_PRICING rate key
+_RATE_KEYS = (
+    ("input", "input"),
+    ("output", "output"),
+    ("cache_read", "cache_read"),
+    ("cache_write_5m", "cache_write"),
+    ("cache_write_1h", "cache_write_1h"),
+)
+
+
+def entry_cost(model: Optional[str], breakdown: dict) -> Optional[float]:
+    """
+    Price one assistant usage entry.
+
+    Args:
+        model: Model id from the entry
+        breakdown: Result of extract_usage_breakdown()
+
+    Returns:
+        Cost in USD, or None if the model has no pricing
+    """
+    rates = MODEL_PRICING.get(model) if model else None
+    if rates is None:
+        return None
+    return sum(breakdown[field] * rates[key] for field, key in _RATE_KEYS) / 1_000_000
+
+
+def entry_day(entry: dict) -> str:
+    """
+    Get the local calendar day an entry belongs to.
+
+    Args:
+        entry: Parsed JSONL entry
+
+    Returns:
+        ISO date string (today if the entry has no usable timestamp)
+    """
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, str):
+        try:
+            parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+            return parsed.astimezone().date().isoformat()
+        except ValueError:
+            pass
+    return date.today().isoformat()
+
+
+class CostLedger:
+    """
+    Running cost totals per session, project and day.
+
+    Each session remembers the offset of the last entry it priced, so
+    update() only prices entries appended since and is safe to call every
+    refresh. Claude Code writes one line per content block with the same
+    message id; a repeated id replaces the previous line's cost instead of
+    adding to it.
+
+    Project totals are keyed by the catalog's project_key(), so two projects
+    with the same folder name stay apart; project_names holds their display
+    names.
+    """
+
+    def __init__(self, ledger_file: Optional[Path] = None):
+        """
+        Initialize ledger, loading any persisted totals.
+
+        Args:
+            ledger_file: JSON file location (default: Config.COST_LEDGER_FILE)
+        """
+        self.ledger_file = ledger_file or Config.COST_LEDGER_FILE
+        self.sessions = {}
+        self.projects = {}
+        self.project_names = {}
+        self.days = {}
+        self.unpriced_entries = 0
+        self._dirty = False
+        self._last_save = 0.0
+        self._load()
+
+    def _load(self):
+        """Load persisted totals (ignored if missing or corrupt)."""
+        try:
+            with open(self.ledger_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.sessions = data.get("sessions", {})
+            self.projects = data.get("projects", {})
+            self.project_names = data.get("project_names", {})
+            self.days = data.get("days", {})
+            self.unpriced_entries = data.get("unpriced_entries", 0)
+        except (OSError, json.JSONDecodeError, AttributeError):
+            return
+        if data.get("version") != LEDGER_VERSION:
+            # Version 1 keyed projects by display name: regroup from the sessions
+            self.projects = {}
+            for session_key, session in self.sessions.items():
+                key = project_key(Path(session_key))
+                self.project_names.setdefault(key, session.get("project"))
+                session["project"] = key
+                self.projects[key] = self.projects.get(key, 0.0) + session["cost"]
+            self._dirty = True
+
+    def save(self, force: bool = False):
+        """
+        Persist totals if they changed.
+
+        Args:
+            force: Write even if Config.LEDGER_SAVE_INTERVAL_S has not elapsed
+        """
+        if not self._dirty:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_save < Config.LEDGER_SAVE_INTERVAL_S:
+            return
+        try:
+            self.ledger_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.ledger_file.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": LEDGER_VERSION,
+                    "sessions": self.sessions,
+                    "projects": self.projects,
+                    "project_names": self.project_names,
+                    "days": self.days,
+                    "unpriced_entries": self.unpriced_entries,
+                }, f)
+            os.replace(tmp, self.ledger_file)
+            self._dirty = False
+            self._last_save = now
+        except OSError:
+            pass
+
+    def record(self, session_key: str, project: str, offset: int, entry: dict) -> float:
+        """
+        Add one assistant usage entry to the totals.
+
+        Args:
+            session_key: Stable session identifier (transcript path)
+            project: Project key (see project_catalog.project_key)
+            offset: Byte offset of the entry in its transcript
+            entry: Parsed JSONL entry
+
+        Returns:
+            Cost added by this entry in USD (may be negative when a repeated
+            message id replaces a larger earlier figure)
+        """
+        session = self.sessions.get(session_key)
+        if session is None:
+            session = {"cost": 0.0, "offset": -1, "project": project, "days": {}, "streams": {}}
+            self.sessions[session_key] = session
+        if offset <= session["offset"]:
+            return 0.0  # Already priced
+
+        message = entry.get("message", {})
+        cost = entry_cost(message.get("model"), extract_usage_breakdown(entry))
+        session["offset"] = offset
+        self._dirty = True
+        if cost is None:
+            self.unpriced_entries += 1
+            return 0.0
+
+        message_id = message.get("id")
+        day = entry_day(entry)
+        session_days = session.setdefault("days", {})
+        # The main thread and each subagent interleave their lines, so the
+        # last message is tracked per stream: stream -> [id, cost, day]
+        streams = session.setdefault("streams", {})
+        if "message_id" in session:  # ledger saved before per-stream tracking
+            streams[""] = [session.pop("message_id"), session.pop("message_cost", 0.0),
+                           session.pop("message_day", None)]
+        stream = str(entry.get("agentId") or "sidechain") if entry.get("isSidechain") else ""
+        last = streams.get(stream)
+        if message_id and last and message_id == last[0]:
+            # Same API response split over several lines: undo its last figure
+            previous, previous_day = last[1], last[2]
+            self.days[previous_day] = self.days.get(previous_day, 0.0) - previous
+            session_days[previous_day] = session_days.get(previous_day, 0.0) - previous
+        else:
+            previous = 0.0
+
+        delta = cost - previous
+        session["cost"] += delta
+        streams[stream] = [message_id, cost, day]
+        self.projects[project] = self.projects.get(project, 0.0) + delta
+        self.days[day] = self.days.get(day, 0.0) + cost
+        session_days[day] = session_days.get(day, 0.0) + cost
+        return delta
+
+    def forget(self, session_key: str):
+        """
+        Remove a session and its contribution to the project and day totals.
+
+        Args:
+            session_key: Session identifier used with record()
+        """
+        session = self.sessions.pop(session_key, None)
+        if session is None:
+            return
+        project = session.get("project")
+        if project in self.projects:
+            self.projects[project] -= session["cost"]
+        for day, cost in session.get("days", {}).items():
+            self.days[day] = self.days.get(day, 0.0) - cost
+        self._dirty = True
+
+    def update(self, session_path: Path, index: TranscriptIndex) -> int:
+        """
+        Price every indexed entry of a session not yet in the ledger.
+
+        Uses the index's entry offsets to seek straight to the first unpriced
+        entry, so steady-state cost is proportional to new entries only.
+        Subagent (sidechain) entries are priced too. A transcript that was
+        truncated or rewritten (the last priced offset is past the indexed
+        end) is priced again from the start.
+
+        Args:
+            session_path: Path to the session JSONL file
+            index: Up-to-date TranscriptIndex for the session
+
+        Returns:
+            Number of entries priced
+        """
+        session_key = str(session_path)
+        session = self.sessions.get(session_key)
+        if session is not None and session["offset"] >= index.scanned_offset:
+            self.forget(session_key)
+            session = None
+        last_offset = session["offset"] if session else -1
+        first = bisect_right(index.usage_offsets, last_offset)
+        if first >= len(index.usage_offsets):
+            return 0
+
+        pending = set(index.usage_offsets[first:])
+        project = project_key(Path(session_path))
+        if project not in self.project_names:
+            self.project_names[project] = extract_project_name(session_path)
+        priced = 0
+        scanner = LineScanner(needles=(b'"assistant"',))
+        try:
+            with open(session_path, "rb") as f:
+                for offset, entry in scanner.scan(f, index.usage_offsets[first]):
+                    if offset in pending:
+                        self.record(session_key, project, offset, entry)
+                        pending.discard(offset)
+                        priced += 1
+                        if not pending:
+                            break
+        except OSError:
+            pass
+        self.save()
+        return priced
+
+    def session_cost(self, session_path: Path) -> float:
+        """Total cost of one session in USD."""
+        session = self.sessions.get(str(session_path))
+        return session["cost"] if session else 0.0
+
+    def project_cost(self, project: str) -> float:
+        """
+        Total cost of one project in USD.
+
+        Args:
+            project: Project key (see project_catalog.project_key)
+        """
+        return self.projects.get(project, 0.0)
+
+    def day_cost(self, day: Optional[str] = None) -> float:
+        """
+        Total cost of one calendar day in USD.
+
+        Args:
+            day: ISO date (default: today)
+        """
+        return self.days.get(day or date.today().isoformat(), 0.0)
+
+
+_ledger: Optional[CostLedger] = None
+
+
+def get_ledger() -> CostLedger:
+    """
+    Get the process-wide cost ledger, loading it on first use.
+
+    Returns:
+        Shared CostLedger instance
+    """
+    global _ledger
+    if _ledger is None:
+        _ledger = CostLedger()
+    return _ledger
+
+
+def _price_transcript(ledger: CostLedger, path: Path, index: Optional[TranscriptIndex] = None):
+    """Bring one transcript's ledger entry up to date (index: already updated)."""
+    if index is None:
+        index = get_index(path)
+        index.update()
+    ledger.update(path, index)
+
+
+def get_session_costs(session_path: Path, live_sessions=(),
+                      index: Optional[TranscriptIndex] = None) -> dict:
+    """
+    Bring the ledger up to date and report a session's totals.
+
+    The project and day totals only include what has been priced, so the
+    other live sessions (and recently written subagent transcripts) are
+    priced on every call too; each costs a stat() while idle.
+
+    Args:
+        session_path: Path to the session JSONL file
+        live_sessions: Other concurrently written sessions
+            (see data_reader.get_live_sessions)
+        index: Already-updated index of session_path (default: the cached
+            one, updated first)
+
+    Returns:
+        Dictionary with keys: session (including its subagent transcripts),
+        project, today (USD)
+    """
+    ledger = get_ledger()
+    session_path = Path(session_path)
+    since = time.time() - Config.LIVE_SESSION_WINDOW_S
+    for path in dict.fromkeys([session_path, *map(Path, live_sessions)]):
+        _price_transcript(ledger, path, index if path == session_path else None)
+        for transcript in get_subagent_files(path, since):
+            _price_transcript(ledger, transcript)
+    subagent_cost = sum(ledger.session_cost(path) for path in get_subagent_files(session_path))
+    return {
+        "session": ledger.session_cost(session_path) + subagent_cost,
+        "project": ledger.project_cost(project_key(session_path)),
+        "today": ledger.day_cost(),
+    }
@@ -1,11 +1,18 @@
 """Data reader for Claude Code JSONL log files"""
-import json
+import os
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 try:
     from .config import Config
+    from .project_catalog import get_catalog, encode_project_path
+    from .transcript_index import TranscriptIndex, get_index
+    from .discovery_roots import walk_root, normalize_root_spec, get_root_manager
 except ImportError:
     from config import Config
+    from project_catalog import get_catalog, encode_project_path
+    from transcript_index import TranscriptIndex, get_index
+    from discovery_roots import walk_root, normalize_root_spec, get_root_manager
 
 
 def extract_project_name(session_path: Path) -> str:
@@ -13,7 +20,10 @@ def extract_project_name(session_path: Path) -> str:
     Extract readable project name from session file path.
 
     Claude Code stores sessions in: ~/.claude/projects/<encoded-path>/<session-id>.jsonl
-    Where <encoded-path> uses '--' as separator (e.g., 'E--projects--myapp')
+    where <encoded-path> is the project cwd with every non-alphanumeric
+    character replaced by '-' (e.g. '-home-user-myapp', 'E--projects-myapp').
+    Decoding goes through the project catalog, which prefers the "cwd" field
+    recorded in the transcripts and memoizes the result.
 
     Args:
         session_path: Path to the session JSONL file
@@ -22,55 +32,196 @@ def extract_project_name(session_path: Path) -> str:
         Readable project name (last component of decoded path)
     """
     try:
-        # Get the parent directory name (encoded project path)
-        encoded_path = session_path.parent.name
-
-        # Decode: replace '--' with path separator and get last component
-        # E--10-CLAUDE-CODE--12-CC-ContextMonitor -> E:\10_CLAUDE_CODE\12_CC_ContextMonitor
-        decoded_path = encoded_path.replace('--', '\\')
-
-        # Return just the last folder name for brevity
-        # E:\10_CLAUDE_CODE\12_CC_ContextMonitor -> 12_CC_ContextMonitor
-        project_name = Path(decoded_path).name
-
+        project_name = get_catalog().project_name(Path(session_path))
         return project_name if project_name else "Unknown Project"
     except (AttributeError, IndexError):
         return "Unknown Project"
 
 
+def iter_session_files(
+    since: Optional[float] = None,
+    project: Optional[str] = None,
+    root: Optional[Path] = None,
+    include_archived: bool = False,
+) -> Iterator[tuple[str, str, Path, os.stat_result]]:
+    """
+    Walk the transcripts under a projects root.
+
+    Filters are applied at discovery time so excluded projects are never
+    listed and excluded files never opened.
+
+    Args:
+        since: Skip files not modified at or after this epoch time
+        project: Only walk project directories whose encoded name contains
+            this name or path (encoded the same way Claude Code does)
+        root: Projects root (default: Config.CLAUDE_PROJECTS_DIR)
+        include_archived: Also yield compressed transcripts (see archiver.py)
+
+    Yields:
+        Tuples of (project dir name, path relative to the project dir,
+        path, stat result)
+
+    Raises:
+        OSError: If the projects directory cannot be listed
+    """
+    needle = encode_project_path(project) if project else None
+    yield from walk_root(root or Config.CLAUDE_PROJECTS_DIR, since, needle,
+                         include_archived=include_archived)
+
+
+def get_projects_roots() -> list[Path]:
+    """
+    Get every configured projects root.
+
+    Returns:
+        Config.CLAUDE_PROJECTS_DIR followed by the valid extra roots
+    """
+    roots = [Config.CLAUDE_PROJECTS_DIR]
+    for spec in Config.CLAUDE_PROJECTS_DIRS:
+        try:
+            roots.append(Path(normalize_root_spec(spec)["path"]).expanduser())
+        except ValueError:
+            continue
+    return roots
+
+
+def iter_all_session_paths(since: Optional[float] = None, project: Optional[str] = None,
+                           include_archived: bool = False) -> Iterator[Path]:
+    """
+    Walk the transcripts of every projects root (unreadable roots are skipped).
+
+    Args:
+        since: Skip files not modified at or after this epoch time
+        project: Project filter (see iter_session_files)
+        include_archived: Also yield compressed transcripts
+
+    Yields:
+        Transcript paths
+    """
+    for root in get_projects_roots():
+        try:
+            for _, _, path, _ in iter_session_files(since, project, root, include_archived):
+                yield path
+        except OSError:
+            continue
+
+
+# Transcripts modified within Config.LIVE_SESSION_WINDOW_S as of the last
+# discovery pass, most recent first
+_live_sessions: list[Path] = []
+
+# Subagent transcripts (<session>/subagents/*.jsonl) seen by the last
+# discovery pass: parent session path -> [(mtime, path)]
+_subagent_files: dict[Path, list[tuple[float, Path]]] = {}
+
+
+def get_live_sessions() -> list[Path]:
+    """
+    Get the sessions the last discovery pass found recently active.
+
+    Returns:
+        Session paths, most recently modified first
+    """
+    return list(_live_sessions)
+
+
+def _parent_session(session_key: str, path: Path) -> Optional[Path]:
+    """Main transcript a nested transcript belongs to (None for a main transcript)."""
+    depth = session_key.count("/")
+    if not depth:
+        return None
+    return path.parents[depth] / f"{session_key.split('/', 1)[0]}.jsonl"
+
+
 def find_active_session() -> Optional[Path]:
     """
     Find the most recently active Claude Code session JSONL file.
 
+    This is also the discovery pass: every transcript stat'ed here is fed to
+    the project catalog so its per-project metadata stays current, and the
+    recently modified ones are remembered for get_live_sessions().
+    Subagent transcripts are never selected; they are remembered per parent
+    session for get_subagents().
+
+    Config.CLAUDE_PROJECTS_DIR is walked inline. Extra roots from
+    Config.CLAUDE_PROJECTS_DIRS contribute the latest results of their own
+    background scanners, so a slow root never delays this pass.
+
+    Transcripts idle for longer than Config.DISCOVERY_MAX_AGE_S (if set) are
+    cataloged but never selected.
+
     Returns:
         Path to the most recent JSONL file, or None if no files found
     """
-    claude_dir = Config.CLAUDE_PROJECTS_DIR
-
-    if not claude_dir.exists():
+    global _live_sessions, _subagent_files
+
+    catalog = get_catalog()
+    newest = None
+    newest_mtime = None
+    live = []
+    subagents = {}
+    now = time.time()
+    live_cutoff = now - Config.LIVE_SESSION_WINDOW_S
+    age_cutoff = now - Config.DISCOVERY_MAX_AGE_S if Config.DISCOVERY_MAX_AGE_S else None
+
+    def consider(session_key: str, path: Path, stat: os.stat_result):
+        nonlocal newest, newest_mtime
+        parent = _parent_session(session_key, path)
+        if parent is not None:
+            subagents.setdefault(parent, []).append((stat.st_mtime, path))
+            return
+        if stat.st_mtime >= live_cutoff:
+            live.append((stat.st_mtime, path))
+        if age_cutoff is not None and stat.st_mtime < age_cutoff:
+            return
+        if newest_mtime is None or stat.st_mtime > newest_mtime:
+            newest = path
+            newest_mtime = stat.st_mtime
+
+    scanners = get_root_manager().scanners.values() if Config.CLAUDE_PROJECTS_DIRS else ()
+    if not Config.CLAUDE_PROJECTS_DIR.exists() and not scanners:
+        _live_sessions = []
+        _subagent_files = {}
         return None
 
     try:
-        jsonl_files = list(claude_dir.glob("**/*.jsonl"))
+        if Config.CLAUDE_PROJECTS_DIR.exists():
+            for project_dir, session_key, path, stat in iter_session_files():
+                catalog.observe(project_dir, session_key, path, stat)
+                consider(session_key, path, stat)
     except (PermissionError, OSError):
         return None
 
-    if not jsonl_files:
-        return None
+    unavailable = []
+    for scanner in scanners:
+        if scanner.status not in ("ok", "scanning"):
+            unavailable.append(f"{scanner.label}:")
+            continue
+        for project_dir, session_key, path, stat in scanner.results():
+            # The scanner already read the cwd; never touch a slow root here
+            catalog.observe(f"{scanner.label}:{project_dir}", session_key, path, stat,
+                            cwd=scanner.cwds.get(project_dir), read_cwd=False)
+            consider(session_key, path, stat)
+
+    catalog.finish_pass(keep_prefixes=tuple(unavailable))
+    live.sort(key=lambda item: item[0], reverse=True)
+    _live_sessions = [path for _, path in live]
+    _subagent_files = subagents
 
     # Return the most recently modified file
-    return max(jsonl_files, key=lambda p: p.stat().st_mtime)
+    return newest
 
 
 def extract_tokens_from_entry(entry: dict) -> int:
     """
     Extract total tokens from a single JSONL entry.
 
-    Sums all token types:
+    Sums all token types of extract_usage_breakdown():
     - input_tokens
     - output_tokens
     - cache_read_input_tokens
-    - cache_creation.ephemeral_5m_input_tokens
+    - cache writes of both TTLs (cache_creation.ephemeral_5m/1h_input_tokens,
+      or the flat cache_creation_input_tokens)
 
     Args:
         entry: Parsed JSONL entry dictionary
@@ -78,72 +229,180 @@ def extract_tokens_from_entry(entry: dict) -> int:
     Returns:
         Total token count for this entry
     """
-    if entry.get("type") != "assistant":
-        return 0
+    return sum(extract_usage_breakdown(entry).values())
 
-    usage = entry.get("message", {}).get("usage", {})
 
-    tokens = (
-        usage.get("input_tokens", 0) +
-        usage.get("output_tokens", 0) +
-        usage.get("cache_read_input_tokens", 0)
-    )
+def extract_usage_breakdown(entry: dict) -> dict:
+    """
+    Extract the individual token counts from a single JSONL entry.
 
-    # Add cache creation tokens
-    cache_creation = usage.get("cache_creation", {})
-    tokens += cache_creation.get("ephemeral_5m_input_tokens", 0)
+    Cache writes are split by TTL. When only the flat
+    cache_creation_input_tokens field is present it is counted as 5-minute
+    writes.
 
-    return tokens
+    Args:
+        entry: Parsed JSONL entry dictionary
+
+    Returns:
+        Dictionary with keys: input, output, cache_read, cache_write_5m,
+        cache_write_1h (all 0 for non-assistant entries)
+    """
+    breakdown = {"input": 0, "output": 0, "cache_read": 0,
+                 "cache_write_5m": 0, "cache_write_1h": 0}
+    if entry.get("type") != "assistant":
+        return breakdown
+
+    usage = entry.get("message", {}).get("usage", {})
+    breakdown["input"] = usage.get("input_tokens", 0) or 0
+    breakdown["output"] = usage.get("output_tokens", 0) or 0
+    breakdown["cache_read"] = usage.get("cache_read_input_tokens", 0) or 0
+
+    cache_creation = usage.get("cache_creation") or {}
+    write_5m = cache_creation.get("ephemeral_5m_input_tokens", 0) or 0
+    write_1h = cache_creation.get("ephemeral_1h_input_tokens", 0) or 0
+    flat = usage.get("cache_creation_input_tokens", 0) or 0
+    # The flat total includes both TTLs; any remainder is 5-minute writes
+    breakdown["cache_write_5m"] = max(write_5m, flat - write_1h)
+    breakdown["cache_write_1h"] = write_1h
+    return breakdown
 
 
-def read_session_tokens(jsonl_path: Path) -> tuple[int, Optional[str]]:
+def read_session_tokens(jsonl_path: Path, index: Optional[TranscriptIndex] = None) -> tuple[int, Optional[str]]:
     """
     Read current token usage and model from a JSONL session file.
 
     Returns the token count and model from the MOST RECENT assistant message.
+    Only bytes appended since the previous call are read: the transcript's
+    sidecar index (see transcript_index.TranscriptIndex) remembers how far it
+    got and the offsets of every usage entry.
 
     Args:
         jsonl_path: Path to the JSONL file
+        index: Already-updated index of the transcript (default: the cached
+            one, updated first)
 
     Returns:
         Tuple of (token_count, model_id)
     """
-    last_tokens = 0
-    last_model = None
-
-    try:
-        with open(jsonl_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    entry = json.loads(line)
-                    tokens = extract_tokens_from_entry(entry)
-                    if tokens > 0:
-                        last_tokens = tokens
-                        model = entry.get("message", {}).get("model")
-                        if model:
-                            last_model = model
-                except json.JSONDecodeError:
-                    continue
-
-    except (FileNotFoundError, PermissionError, OSError):
+    if not Path(jsonl_path).exists():
         return 0, None
 
-    return last_tokens, last_model
+    if index is None:
+        index = get_index(jsonl_path)
+        index.update()
+    return index.latest_tokens, index.latest_model
 
 
-def get_current_usage() -> tuple[int, Optional[Path], Optional[str]]:
+def get_compaction_history(jsonl_path: Path, index: Optional[TranscriptIndex] = None) -> list[dict]:
+    """
+    Get the compactions recorded in a session so far.
+
+    Args:
+        jsonl_path: Path to the JSONL file
+        index: Already-updated index of the transcript (default: the cached
+            one, updated first)
+
+    Returns:
+        List of dicts (see TranscriptIndex.compactions), oldest first
+    """
+    if index is None:
+        index = get_index(jsonl_path)
+        index.update()
+    return index.compactions()
+
+
+def get_cache_stats(jsonl_path: Path, index: Optional[TranscriptIndex] = None) -> dict:
+    """
+    Get prompt-cache efficiency for a session.
+
+    Args:
+        jsonl_path: Path to session JSONL file
+        index: Already-updated index of the transcript (default: the cached
+            one, updated first)
+
+    Returns:
+        Dict from TranscriptIndex.cache_stats() over the last
+        Config.CACHE_WINDOW_TURNS messages
+    """
+    if index is None:
+        index = get_index(jsonl_path)
+        index.update()
+    return index.cache_stats(Config.CACHE_WINDOW_TURNS)
+
+
+def get_subagent_files(session_path: Path, since: Optional[float] = None) -> list[Path]:
+    """
+    Get the subagent transcripts of a session seen by the last discovery pass.
+
+    Args:
+        session_path: Path to the main session JSONL file
+        since: Only those modified at or after this epoch time
+
+    Returns:
+        Paths, most recently modified first
+    """
+    return [path for mtime, path in sorted(_subagent_files.get(Path(session_path), ()), reverse=True)
+            if since is None or mtime >= since]
+
+
+def _subagent_summary(stream: dict) -> dict:
+    """A TranscriptIndex.sidechains() stream as a get_subagents() entry."""
+    return {"agent": stream["agent"], "model_id": stream["model"],
+            "tokens": stream["tokens"], "entries": stream["entries"]}
+
+
+def get_subagents(session_path: Path, index: Optional[TranscriptIndex] = None) -> list[dict]:
+    """
+    Get the active subagents of a session.
+
+    Inline sidechain entries come from the session's own index (active while
+    written after the latest main-thread entry). Separate subagent
+    transcripts come from the last discovery pass and are active while
+    modified within Config.SUBAGENT_ACTIVE_S; each is read through its own
+    incremental index, and idle ones are never opened.
+
+    Args:
+        session_path: Path to the main session JSONL file
+        index: Already-updated index of the transcript (default: the cached
+            one, updated first)
+
+    Returns:
+        List of dicts with keys: agent, model_id, tokens, entries; most
+        recently active first
+    """
+    if index is None:
+        index = get_index(session_path)
+        index.update()
+    subagents = [_subagent_summary(stream) for stream in index.sidechains() if stream["active"]]
+    cutoff = time.time() - Config.SUBAGENT_ACTIVE_S
+    for mtime, path in sorted(_subagent_files.get(Path(session_path), ()), reverse=True):
+        if mtime < cutoff:
+            continue
+        sub_index = get_index(path)
+        sub_index.update()
+        streams = sub_index.sidechains()
+        if streams:
+            subagents.append(_subagent_summary(streams[0]))
+        elif sub_index.entry_offsets:
+            # Entries not flagged as sidechain: the whole file is one stream
+            subagents.append({"agent": path.stem.removeprefix("agent-"), "model_id": sub_index.latest_model,
+                              "tokens": sub_index.latest_tokens, "entries": len(sub_index.entry_offsets)})
+    return subagents
+
+
+def get_current_usage(session_path: Optional[Path] = None) -> tuple[int, Optional[Path], Optional[str]]:
     """
     Get current token usage from the most active session.
 
+    Args:
+        session_path: Session to read (default: find_active_session())
+
     Returns:
         Tuple of (total_tokens, session_path, model_id)
         If no active session, returns (0, None, None)
     """
-    session_path = find_active_session()
+    if session_path is None:
+        session_path = find_active_session()
 
     if session_path is None:
         return 0, None, None
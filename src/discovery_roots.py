@@ -0,0 +1,276 @@
+"""Transcript discovery across one or more Claude Code projects roots"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+try:
+    from .config import Config
+    from .project_catalog import read_transcript_cwd, root_label
+    from .jsonl_scanner import ARCHIVE_SUFFIXES
+except ImportError:
+    from config import Config
+    from project_catalog import read_transcript_cwd, root_label
+    from jsonl_scanner import ARCHIVE_SUFFIXES
+
+
+def _scan_project_dir(project_dir: Path, since: Optional[float],
+                      include_archived: bool = False) -> list[tuple[str, str, Path, os.stat_result]]:
+    """List and stat the transcripts of one project directory (see walk_root)."""
+    found = []
+    try:
+        paths = list(project_dir.glob("**/*.jsonl"))
+        if include_archived:
+            plain = set(paths)
+            for suffix in ARCHIVE_SUFFIXES:
+                # An archive next to its original is an interrupted archiver run
+                paths += [path for path in project_dir.glob(f"**/*.jsonl{suffix}")
+                          if path.with_suffix("") not in plain]
+    except OSError:
+        return found
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if since is not None and stat.st_mtime < since:
+            continue
+        found.append((project_dir.name, path.relative_to(project_dir).as_posix(), path, stat))
+    return found
+
+
+def walk_root(root: Path, since: Optional[float] = None, needle: Optional[str] = None,
+              workers: Optional[int] = None,
+              include_archived: bool = False) -> Iterator[tuple[str, str, Path, os.stat_result]]:
+    """
+    Walk the transcripts under one projects root.
+
+    Args:
+        root: Projects root directory
+        since: Skip files not modified at or after this epoch time
+        needle: Only walk project directories whose name contains this
+        workers: Threads stat'ing project directories in parallel
+            (default: Config.DISCOVERY_WORKERS)
+        include_archived: Also list compressed transcripts (reports only;
+            the active-session search never looks at them)
+
+    Yields:
+        Tuples of (project dir name, path relative to the project dir,
+        path, stat result)
+
+    Raises:
+        OSError: If the root cannot be listed
+    """
+    project_dirs = [
+        project_dir for project_dir in root.iterdir()
+        if project_dir.is_dir() and (not needle or needle in project_dir.name)
+    ]
+
+    workers = min(workers or Config.DISCOVERY_WORKERS, len(project_dirs))
+    if workers > 1:
+        # Overlap the per-directory stat latency of slow (e.g. network) disks
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="discovery") as pool:
+            for found in pool.map(lambda d: _scan_project_dir(d, since, include_archived), project_dirs):
+                yield from found
+    else:
+        for project_dir in project_dirs:
+            yield from _scan_project_dir(project_dir, since, include_archived)
+
+
+def normalize_root_spec(spec) -> dict:
+    """
+    Validate one Config.CLAUDE_PROJECTS_DIRS entry and fill in defaults.
+
+    Args:
+        spec: Path string or dict with "path" and optional "label",
+            "interval_s", "timeout_s"
+
+    Returns:
+        Dict with keys: path, label, interval_s, timeout_s
+
+    Raises:
+        ValueError: On a malformed entry
+    """
+    if isinstance(spec, str):
+        spec = {"path": spec}
+    if not isinstance(spec, dict) or not isinstance(spec.get("path"), str) or not spec["path"]:
+        raise ValueError(f"projects root needs a 'path': {spec!r}")
+    unknown = set(spec) - {"path", "label", "interval_s", "timeout_s"}
+    if unknown:
+        raise ValueError(f"projects root {spec['path']}: unknown keys {', '.join(sorted(unknown))}")
+    normalized = {
+        "path": spec["path"],
+        "label": root_label(spec),
+        "interval_s": spec.get("interval_s", Config.ROOT_SCAN_INTERVAL_S),
+        "timeout_s": spec.get("timeout_s", Config.ROOT_SCAN_TIMEOUT_S),
+    }
+    for key in ("interval_s", "timeout_s"):
+        value = normalized[key]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"projects root {spec['path']}: {key} must be a positive number")
+    return normalized
+
+
+class RootScanner:
+    """
+    Rescans one extra projects root from its own thread.
+
+    The refresh loop only ever reads the latest finished scan, so a slow or
+    hung mount delays nothing but its own results. A scan still running after
+    timeout_s (or one that failed) makes the root unavailable until a scan
+    succeeds again.
+    """
+
+    def __init__(self, spec: dict):
+        """
+        Initialize scanner (not started).
+
+        Args:
+            spec: Result of normalize_root_spec()
+        """
+        self.path = Path(spec["path"]).expanduser()
+        self.label = spec["label"]
+        self.interval_s = spec["interval_s"]
+        self.timeout_s = spec["timeout_s"]
+
+        self.cwds = {}  # project dir name -> cwd recorded in its transcripts
+        self.scans = 0
+        self.last_duration = None
+        self.error = None
+        self._results = []
+        self._scan_started = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start rescanning in a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name=f"root-{self.label}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Ask the thread to exit after its current scan."""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.scan_once()
+            self._stop.wait(self.interval_s)
+
+    def scan_once(self):
+        """Walk the root and publish the results."""
+        started = time.monotonic()
+        with self._lock:
+            self._scan_started = started
+        error = None
+        try:
+            results = list(walk_root(self.path))
+            self._learn_cwds(results)
+        except OSError as e:
+            results = []
+            error = str(e)
+        with self._lock:
+            self._results = results
+            self.error = error
+            self._scan_started = None
+            self.scans += 1
+            self.last_duration = time.monotonic() - started
+
+    def _learn_cwds(self, results: list):
+        """Read the cwd of newly seen projects here rather than in the refresh loop."""
+        tried = set()
+        for project_dir, session_key, path, _ in results:
+            if project_dir in self.cwds or project_dir in tried or "/" in session_key:
+                continue
+            tried.add(project_dir)  # one transcript per project and scan
+            cwd = read_transcript_cwd(path)
+            if cwd:
+                self.cwds[project_dir] = cwd
+
+    @property
+    def status(self) -> str:
+        """"pending", "ok", "scanning", "timeout" or "error"."""
+        with self._lock:
+            if self._scan_started is not None:
+                if time.monotonic() - self._scan_started > self.timeout_s:
+                    return "timeout"
+                return "scanning" if self.scans else "pending"
+            if self.error:
+                return "error"
+            return "ok" if self.scans else "pending"
+
+    def results(self) -> list[tuple[str, str, Path, os.stat_result]]:
+        """Latest scan results (empty while the root is unavailable)."""
+        if self.status in ("timeout", "error"):
+            return []
+        with self._lock:
+            return self._results
+
+    def describe(self) -> str:
+        """One status line for the debug view."""
+        duration = "-" if self.last_duration is None else f"{self.last_duration * 1000:.0f}ms"
+        line = (f"{self.label}: {self.status}, {len(self._results)} transcripts, "
+                f"last scan {duration}, every {self.interval_s:g}s")
+        return f"{line} ({self.error})" if self.error else line
+
+
+class RootManager:
+    """Keeps one RootScanner per Config.CLAUDE_PROJECTS_DIRS entry"""
+
+    def __init__(self):
+        self.scanners = {}
+        self._specs = None
+
+    def sync(self):
+        """Start and stop scanners to match Config.CLAUDE_PROJECTS_DIRS."""
+        if Config.CLAUDE_PROJECTS_DIRS == self._specs:
+            return
+        self._specs = list(Config.CLAUDE_PROJECTS_DIRS)
+
+        wanted = {}
+        for spec in self._specs:
+            try:
+                normalized = normalize_root_spec(spec)
+            except ValueError as e:
+                logging.warning(f"Ignoring projects root: {e}")
+                continue
+            wanted[normalized["label"]] = normalized
+
+        for label in list(self.scanners):
+            scanner = self.scanners[label]
+            spec = wanted.get(label)
+            if (spec is None or scanner.path != Path(spec["path"]).expanduser()
+                    or (scanner.interval_s, scanner.timeout_s) != (spec["interval_s"], spec["timeout_s"])):
+                scanner.stop()
+                del self.scanners[label]
+        for label, spec in wanted.items():
+            if label not in self.scanners:
+                scanner = RootScanner(spec)
+                scanner.start()
+                self.scanners[label] = scanner
+
+    def stop_all(self):
+        """Stop every scanner."""
+        for scanner in self.scanners.values():
+            scanner.stop()
+        self.scanners = {}
+        self._specs = None
+
+
+_manager: Optional[RootManager] = None
+
+
+def get_root_manager() -> RootManager:
+    """
+    Get the process-wide root manager, synced with the current config.
+
+    Returns:
+        Shared RootManager instance
+    """
+    global _manager
+    if _manager is None:
+        _manager = RootManager()
+    _manager.sync()
+    return _manager
@@ -0,0 +1,252 @@
+"""Top-N heaviest assistant turns by context growth
+
+Usage:
+    python src/heavy_turns.py [TRANSCRIPT ...] [-n 10] [--since 7d] [--project NAME] [--json]
+
+Without transcript arguments every transcript of every configured projects
+root is scanned, archived (compressed) ones included; an archive whose
+summary (see archiver.py) already lists enough of its heaviest turns is not
+decompressed at all. Each transcript is read once, front to back; a turn's delta
+is its context size minus the previous turn's, and the tool reported for it
+is the tool_use of the previous assistant turn, whose result is what the
+context grew by. Only the N largest turns are kept (a bounded min-heap), so
+memory does not depend on how many or how large the transcripts are.
+"""
+import argparse
+import heapq
+import itertools
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+try:
+    from .data_reader import iter_all_session_paths, extract_tokens_from_entry
+    from .jsonl_scanner import LineScanner, is_archived, open_transcript, read_summary
+    from .project_catalog import get_catalog
+    from .usage_export import parse_since
+except ImportError:
+    from data_reader import iter_all_session_paths, extract_tokens_from_entry
+    from jsonl_scanner import LineScanner, is_archived, open_transcript, read_summary
+    from project_catalog import get_catalog
+    from usage_export import parse_since
+
+
+DEFAULT_TOP_N = 10
+
+
+def _tool_names(message: dict) -> tuple:
+    """Names of the tool_use blocks in a message."""
+    content = message.get("content")
+    if not isinstance(content, list):
+        return ()
+    return tuple(block["name"] for block in content
+                 if isinstance(block, dict) and block.get("type") == "tool_use" and "name" in block)
+
+
+class TurnScanner:
+    """
+    Incremental per-transcript turn reader.
+
+    Claude Code writes one line per content block with the same message id;
+    a turn is emitted once the next message starts (or on flush()), with the
+    usage of its last line and the tool names of all its lines. Subagent
+    (sidechain) entries are ignored. Only the previous turn is kept.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.prev_total = None
+        self.prev_tools = ()
+        self.pending = None  # [message id, offset, timestamp, total, tools]
+
+    def feed(self, on_turn: Callable[[dict], None], final: bool = False):
+        """
+        Read lines appended since the last call.
+
+        Args:
+            on_turn: Called with each completed turn dict (delta, tokens,
+                tool, timestamp, offset, session_path)
+            final: Also read an unterminated last line (file is not being written)
+        """
+        if is_archived(self.path):
+            if self.offset:
+                return  # archives do not grow
+            final = True
+        with open_transcript(self.path) as f:
+            if not final:
+                f.seek(0, 2)
+                if f.tell() < self.offset:
+                    self._reset()  # rewritten: start over
+            scanner = LineScanner(needles=(b'"assistant"',))
+            for offset, entry in scanner.scan(f, self.offset):
+                if offset >= scanner.end_offset and not final:
+                    break  # unterminated last line: still being written
+                if entry.get("isSidechain"):
+                    continue
+                total = extract_tokens_from_entry(entry)
+                if total <= 0:
+                    continue
+                message = entry.get("message", {})
+                message_id = message.get("id")
+                pending = self.pending
+                if pending is not None and message_id is not None and message_id == pending[0]:
+                    pending[1:4] = [offset, entry.get("timestamp") or pending[2], total]
+                    pending[4] += _tool_names(message)
+                    continue
+                self._complete(on_turn)
+                self.pending = [message_id, offset, entry.get("timestamp"), total, _tool_names(message)]
+            self.offset = scanner.end_offset
+
+    def flush(self, on_turn: Callable[[dict], None]):
+        """Emit the last turn of the transcript."""
+        self._complete(on_turn)
+
+    def peek(self) -> Optional[dict]:
+        """The turn still in progress, as on_turn would receive it (None if none)."""
+        if self.pending is None or self.prev_total is None:
+            return None
+        return self._turn(self.pending)
+
+    def _turn(self, pending: list) -> dict:
+        _, offset, timestamp, total, _ = pending
+        return {
+            "delta": total - self.prev_total,
+            "tokens": total,
+            "tool": ", ".join(dict.fromkeys(self.prev_tools)) or None,
+            "timestamp": timestamp,
+            "offset": offset,
+            "session_path": self.path,
+        }
+
+    def _complete(self, on_turn: Callable[[dict], None]):
+        pending = self.pending
+        if pending is None:
+            return
+        # The first turn has no baseline: its size is the system prompt
+        if self.prev_total is not None:
+            on_turn(self._turn(pending))
+        self.prev_total = pending[3]
+        self.prev_tools = pending[4]
+        self.pending = None
+
+
+class TopTurns:
+    """Bounded min-heap of the N turns with the largest positive delta"""
+
+    def __init__(self, n: int = DEFAULT_TOP_N):
+        self.n = n
+        self._heap = []
+        self._seq = itertools.count()  # tie-breaker: dicts do not compare
+
+    def add(self, turn: dict):
+        """Offer a turn; kept only if it is among the N largest so far."""
+        delta = turn["delta"]
+        if delta <= 0 or self.n <= 0:
+            return  # compactions and cache shrinkage are not jumps
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, (delta, next(self._seq), turn))
+        elif delta > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (delta, next(self._seq), turn))
+
+    def results(self, extra: Iterable[dict] = ()) -> list[dict]:
+        """
+        Kept turns, largest delta first.
+
+        Args:
+            extra: Additional candidate turns (e.g. one still in progress)
+        """
+        turns = [turn for _, _, turn in self._heap]
+        turns += [turn for turn in extra if turn and turn["delta"] > 0]
+        turns.sort(key=lambda turn: turn["delta"], reverse=True)
+        return turns[:self.n]
+
+
+def summary_turns(path: Path, n: int) -> Optional[list[dict]]:
+    """
+    Heaviest turns of an archived transcript, from its summary.
+
+    Args:
+        path: Archived transcript
+        n: Number of turns needed
+
+    Returns:
+        Turn dicts, or None if there is no summary or it keeps fewer than n
+    """
+    summary = read_summary(path)
+    if not summary or summary.get("top_turns_n", 0) < n or "top_turns" not in summary:
+        return None
+    return [dict(turn, session_path=path) for turn in summary["top_turns"]]
+
+
+def find_heavy_turns(paths: Iterable[Path], n: int = DEFAULT_TOP_N) -> list[dict]:
+    """
+    Scan transcripts once and return the N turns that grew the context most.
+
+    Args:
+        paths: Transcript paths
+        n: Number of turns to keep
+
+    Returns:
+        Turn dicts, largest delta first
+    """
+    top = TopTurns(n)
+    for path in paths:
+        stored = summary_turns(path, n) if is_archived(path) else None
+        if stored is not None:
+            for turn in stored:
+                top.add(turn)
+            continue
+        scanner = TurnScanner(path)
+        try:
+            scanner.feed(top.add, final=True)
+        except OSError:
+            continue
+        scanner.flush(top.add)
+    return top.results()
+
+
+def format_turn(turn: dict, project: Optional[str] = None) -> str:
+    """One-line description of a turn."""
+    where = f"{project}/" if project else ""
+    return (f"+{turn['delta']:>9,}  {turn['tokens']:>9,}  {turn['tool'] or '(prompt)':<20} "
+            f"{turn['timestamp'] or '-':<24}  {where}{turn['session_path'].name}@{turn['offset']}")
+
+
+def main(argv=None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="List the assistant turns that grew the context most")
+    parser.add_argument("transcripts", nargs="*", type=Path,
+                        help="transcripts to scan (default: every projects root)")
+    parser.add_argument("-n", type=int, default=DEFAULT_TOP_N, help=f"turns to list (default: {DEFAULT_TOP_N})")
+    parser.add_argument("--since", type=parse_since,
+                        help="only transcripts modified since (ISO date/datetime or age such as 7d)")
+    parser.add_argument("--project", help="project name or path to include")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    paths = args.transcripts or iter_all_session_paths(args.since, args.project, include_archived=True)
+    turns = find_heavy_turns(paths, args.n)
+    catalog = get_catalog()
+
+    if args.json:
+        for turn in turns:
+            turn["project"] = catalog.project_name(turn["session_path"])
+            turn["session_path"] = str(turn["session_path"])
+        print(json.dumps(turns, indent=2))
+        return 0
+    if not turns:
+        print("No assistant turns found")
+        return 0
+    print(f"{'delta':>10}  {'context':>9}  {'after tool':<20} {'timestamp':<24}  transcript@offset")
+    for turn in turns:
+        print(format_turn(turn, catalog.project_name(turn["session_path"])))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
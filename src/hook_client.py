@@ -0,0 +1,46 @@
+"""Forward a Claude Code hook event to the running monitor
+
+Configure as the command of the SessionStart, PostToolUse and Stop hooks:
+
+    python -S /path/to/src/hook_client.py
+
+Claude Code passes the event as JSON on stdin; the session id, transcript
+path, cwd and event name are sent as one UDP datagram to 127.0.0.1 and the
+script exits. Nothing is printed and the exit code is always 0, so a monitor
+that is not running costs nothing but the datagram. Only the standard
+library is imported (and -S skips site-packages) to keep startup short
+enough for every tool call.
+"""
+import json
+import os
+import socket
+import sys
+
+# Must match Config.HOOK_PORT; override with CLAUDE_MONITOR_HOOK_PORT
+DEFAULT_PORT = 47391
+FIELDS = ("hook_event_name", "session_id", "transcript_path", "cwd")
+
+
+def build_message(event: dict) -> bytes:
+    """Datagram payload: the fields the monitor needs, nothing else."""
+    return json.dumps({key: event.get(key) for key in FIELDS}, separators=(",", ":")).encode("utf-8")
+
+
+def send(message: bytes, port: int):
+    """Send one datagram to the monitor on localhost."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.sendto(message, ("127.0.0.1", port))
+
+
+def main() -> int:
+    try:
+        event = json.load(sys.stdin)
+        if isinstance(event, dict) and event.get("transcript_path"):
+            send(build_message(event), int(os.environ.get("CLAUDE_MONITOR_HOOK_PORT", DEFAULT_PORT)))
+    except (ValueError, OSError):
+        pass  # never fail or block the hook
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
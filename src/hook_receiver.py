@@ -0,0 +1,164 @@
+"""Receiver for events pushed by hook_client.py
+
+A daemon thread listens on 127.0.0.1:Config.HOOK_PORT. The most recent valid
+event is kept for the UI thread, which takes it with take() (front-ends check
+``pending`` on a short timer, so a push is handled within
+Config.HOOK_CHECK_INTERVAL_MS instead of the next refresh).
+"""
+import json
+import logging
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    from .config import Config
+    from .data_reader import get_projects_roots
+except ImportError:
+    from config import Config
+    from data_reader import get_projects_roots
+
+
+EVENTS = ("SessionStart", "PostToolUse", "Stop", "SubagentStop", "UserPromptSubmit", "PreCompact")
+
+
+def is_transcript_path(path: Path) -> bool:
+    """Whether a path resolves to a .jsonl file under one of the projects roots."""
+    try:
+        resolved = path.resolve()
+    except (OSError, RuntimeError):
+        return False
+    for root in get_projects_roots():
+        try:
+            if resolved.is_relative_to(root.expanduser().resolve()):
+                return True
+        except (OSError, RuntimeError):
+            continue
+    return False
+
+
+def parse_event(data: bytes) -> Optional[dict]:
+    """
+    Validate a datagram from hook_client.py.
+
+    Any local process can send to the port, so the transcript must resolve
+    (symlinks and "..") to a path under Config.CLAUDE_PROJECTS_DIR or one of
+    Config.CLAUDE_PROJECTS_DIRS; anything else is dropped.
+
+    Args:
+        data: Datagram payload
+
+    Returns:
+        Event dict with transcript_path as a Path, or None if malformed or
+        outside the projects roots
+    """
+    try:
+        event = json.loads(data)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(event, dict) or event.get("hook_event_name") not in EVENTS:
+        return None
+    transcript = event.get("transcript_path")
+    if not isinstance(transcript, str) or not transcript.endswith(".jsonl"):
+        return None
+    path = Path(transcript).expanduser()
+    if not is_transcript_path(path):
+        return None
+    event["transcript_path"] = path
+    event["received_at"] = time.monotonic()
+    return event
+
+
+class HookReceiver:
+    """Background UDP listener for hook events"""
+
+    def __init__(self, port: Optional[int] = None):
+        """
+        Initialize receiver.
+
+        Args:
+            port: UDP port on 127.0.0.1 (default: Config.HOOK_PORT; 0 = any free port)
+        """
+        self.port = Config.HOOK_PORT if port is None else port
+        self.events_received = 0
+        self._latest = None
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._sock = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> bool:
+        """
+        Bind the socket and start listening.
+
+        Returns:
+            False if the port is taken (e.g. another monitor instance)
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.bind(("127.0.0.1", self.port))
+        except OSError as e:
+            sock.close()
+            logging.warning(f"Hook receiver disabled, cannot bind 127.0.0.1:{self.port}: {e}")
+            return False
+        sock.settimeout(0.5)
+        self._sock = sock
+        self.port = sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._run, name="hook-receiver", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop listening and close the socket."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._sock is not None:
+            self._sock.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                data, _ = self._sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            event = parse_event(data)
+            if event is None:
+                continue
+            with self._lock:
+                self._latest = event
+                self.events_received += 1
+            self._pending.set()
+
+    @property
+    def pending(self) -> bool:
+        """Whether an event arrived since the last take()."""
+        return self._pending.is_set()
+
+    def take(self) -> Optional[dict]:
+        """
+        Take the latest event (older ones since the last call are superseded).
+
+        Returns:
+            Event dict, or None if nothing arrived
+        """
+        if not self._pending.is_set():
+            return None
+        with self._lock:
+            event, self._latest = self._latest, None
+            self._pending.clear()
+        return event
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Block until an event arrives or the timeout expires.
+
+        Returns:
+            True if an event is pending
+        """
+        return self._pending.wait(timeout)
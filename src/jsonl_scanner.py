@@ -0,0 +1,342 @@
+"""Bounded-memory line scanner for Claude Code JSONL transcripts"""
+import gzip
+import json
+import re
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import lzma
+    LZMA_AVAILABLE = True
+except ImportError:  # Python built without liblzma
+    LZMA_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    from .config import Config
+except ImportError:
+    from config import Config
+
+
+# Markers that identify an assistant entry in the head of an oversized line.
+# Claude Code writes "message":{..."role":"assistant"...} near the start of
+# the line and the top-level "type":"assistant" near the end.
+_ASSISTANT_MARKERS = (b'"role":"assistant"', b'"type":"assistant"')
+
+# Bytes of an oversized line kept for field extraction
+HEAD_BYTES = 16 * 1024
+TAIL_BYTES = 16 * 1024
+
+_USAGE_RE = re.compile(rb'"usage"\s*:\s*\{')
+_MODEL_RE = re.compile(rb'"model"\s*:\s*"([^"\\]*)"')
+_MESSAGE_ID_RE = re.compile(rb'"id"\s*:\s*"(msg_[^"\\]*)"')
+_TIMESTAMP_RE = re.compile(rb'"timestamp"\s*:\s*"([^"\\]*)"')
+_SESSION_ID_RE = re.compile(rb'"sessionId"\s*:\s*"([^"\\]*)"')
+_CWD_RE = re.compile(rb'"cwd"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_SIDECHAIN_RE = re.compile(rb'"isSidechain"\s*:\s*(true|false)')
+_AGENT_ID_RE = re.compile(rb'"agentId"\s*:\s*"([^"\\]*)"')
+_TOOL_NAME_RE = re.compile(rb'"type"\s*:\s*"tool_use"\s*,\s*"id"\s*:\s*"[^"\\]*"\s*,\s*"name"\s*:\s*"([^"\\]*)"')
+
+_decoder = json.JSONDecoder()
+
+# Archived transcript suffix (after ".jsonl") -> codec name
+ARCHIVE_SUFFIXES = {".gz": "gzip", ".xz": "xz", ".zst": "zstd"}
+
+
+def is_archived(path: Path) -> bool:
+    """Check whether a path is a compressed transcript (e.g. "<id>.jsonl.gz")."""
+    return path.suffix in ARCHIVE_SUFFIXES and path.stem.endswith(".jsonl")
+
+
+def transcript_stem(path: Path) -> str:
+    """Session id of a plain or archived transcript path."""
+    name = path.name
+    if is_archived(path):
+        name = name[:-len(path.suffix)]
+    return name[:-len(".jsonl")] if name.endswith(".jsonl") else path.stem
+
+
+def open_transcript(path: Path) -> BinaryIO:
+    """
+    Open a plain or archived transcript for binary reading.
+
+    Compressed transcripts are decompressed as a stream, so LineScanner reads
+    them in bounded memory like plain ones (but they can only be scanned
+    from the start).
+
+    Args:
+        path: .jsonl, .jsonl.gz, .jsonl.xz or .jsonl.zst file
+
+    Returns:
+        Binary file object
+
+    Raises:
+        OSError: If the file cannot be opened or its codec is unavailable
+    """
+    codec = ARCHIVE_SUFFIXES.get(path.suffix) if is_archived(path) else None
+    if codec is None:
+        return open(path, "rb")
+    if codec == "gzip":
+        return gzip.open(path, "rb")
+    if codec == "xz":
+        if not LZMA_AVAILABLE:
+            raise OSError(f"{path.name}: this Python has no lzma module")
+        return lzma.open(path, "rb")
+    if not ZSTD_AVAILABLE:
+        raise OSError(f"{path.name}: zstandard is not installed (pip install zstandard)")
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+
+
+def summary_path_for(transcript_path: Path) -> Path:
+    """Sidecar summary location of a plain or archived transcript."""
+    return transcript_path.parent / f"{transcript_stem(transcript_path)}.summary.json"
+
+
+def read_summary(transcript_path: Path) -> Optional[dict]:
+    """
+    Load the sidecar summary the archiver wrote for a transcript.
+
+    Returns:
+        Summary dict, or None if missing or unreadable
+    """
+    try:
+        with open(summary_path_for(transcript_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def get_json_loads(backend: Optional[str] = None) -> Callable[[bytes], object]:
+    """
+    Get the JSON decoder for a parser backend.
+
+    Args:
+        backend: "json" or "orjson" (default: Config.JSON_BACKEND); orjson
+            falls back to the stdlib when it is not installed
+
+    Returns:
+        A loads() function accepting bytes and raising json.JSONDecodeError
+        (orjson's error type subclasses it)
+    """
+    backend = backend or Config.JSON_BACKEND
+    if backend == "orjson" and ORJSON_AVAILABLE:
+        return orjson.loads
+    return json.loads
+
+
+def _first_group(pattern: re.Pattern, *buffers: bytes) -> Optional[str]:
+    """Return the first captured group found in the given buffers, decoded."""
+    for buf in buffers:
+        match = pattern.search(buf)
+        if match:
+            return match.group(1).decode("utf-8", errors="replace")
+    return None
+
+
+def _last_usage(buf: bytes) -> Optional[dict]:
+    """Decode the last complete "usage" object found in a buffer."""
+    for match in reversed(list(_USAGE_RE.finditer(buf))):
+        text = buf[match.end() - 1:].decode("utf-8", errors="replace")
+        try:
+            usage, _ = _decoder.raw_decode(text)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(usage, dict):
+            return usage
+    return None
+
+
+def is_assistant_head(head: bytes) -> bool:
+    """Check whether the start of a line identifies an assistant entry."""
+    return any(marker in head for marker in _ASSISTANT_MARKERS)
+
+
+def build_skeleton_entry(head: bytes, tail: bytes) -> Optional[dict]:
+    """
+    Build a minimal entry dict from the head and tail of an oversized line.
+
+    Only the fields the monitor needs are recovered (type, usage, model,
+    message id, timestamp, session/agent metadata and tool names); the message
+    content itself is never decoded.
+
+    Args:
+        head: First bytes of the line
+        tail: Last bytes of the line
+
+    Returns:
+        Entry dict shaped like a parsed transcript line, or None if the line
+        is not an assistant entry or carries no usage object
+    """
+    if not (is_assistant_head(head) or _ASSISTANT_MARKERS[1] in tail):
+        return None
+
+    usage = _last_usage(tail) or _last_usage(head)
+    if usage is None:
+        return None
+
+    message = {"usage": usage}
+    model = _first_group(_MODEL_RE, head, tail)
+    if model:
+        message["model"] = model
+    message_id = _first_group(_MESSAGE_ID_RE, head, tail)
+    if message_id:
+        message["id"] = message_id
+    tool_names = [m.group(1).decode("utf-8", errors="replace")
+                  for m in _TOOL_NAME_RE.finditer(head)]
+    if tool_names:
+        message["content"] = [{"type": "tool_use", "name": name} for name in tool_names]
+
+    entry = {"type": "assistant", "message": message, "oversized": True}
+    sidechain = _first_group(_SIDECHAIN_RE, head, tail)
+    if sidechain is not None:
+        entry["isSidechain"] = sidechain == "true"
+    for key, pattern in (("sessionId", _SESSION_ID_RE), ("cwd", _CWD_RE), ("agentId", _AGENT_ID_RE)):
+        value = _first_group(pattern, head, tail)
+        if value is not None:
+            entry[key] = value
+    timestamp = _first_group(_TIMESTAMP_RE, tail, head)
+    if timestamp:
+        entry["timestamp"] = timestamp
+    if "cwd" in entry:
+        try:
+            entry["cwd"] = json.loads(f'"{entry["cwd"]}"')
+        except json.JSONDecodeError:
+            pass
+    return entry
+
+
+class LineScanner:
+    """
+    Reads a JSONL file in fixed-size chunks with a per-line size ceiling.
+
+    Lines up to ``max_line_bytes`` are decoded normally. Longer lines are
+    streamed past chunk by chunk: only their first HEAD_BYTES and a rolling
+    window of their last TAIL_BYTES are kept, and assistant lines are turned
+    into a skeleton entry carrying just the usage object. Peak memory is
+    therefore bounded by ``chunk_size + max_line_bytes`` regardless of how
+    large individual lines get.
+    """
+
+    def __init__(self, max_line_bytes: Optional[int] = None,
+                 chunk_size: Optional[int] = None,
+                 needles: Optional[tuple] = None):
+        """
+        Initialize scanner.
+
+        Args:
+            max_line_bytes: Per-line ceiling (default: Config.MAX_LINE_BYTES)
+            chunk_size: Bytes read per I/O call (default: Config.READ_CHUNK_SIZE)
+            needles: Optional byte strings; lines containing none of them are
+                skipped without being decoded
+        """
+        self.max_line_bytes = max_line_bytes or Config.MAX_LINE_BYTES
+        self.chunk_size = chunk_size or Config.READ_CHUNK_SIZE
+        self.needles = needles
+        self._loads = get_json_loads()
+
+        # Offset just past the last complete (newline-terminated) line
+        self.end_offset = 0
+        self.oversized_lines = 0
+
+    def _decode(self, line: bytes) -> Optional[dict]:
+        """Decode one line within the ceiling, honouring the needle filter."""
+        if self.needles and not any(needle in line for needle in self.needles):
+            return None
+        try:
+            entry = self._loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def scan(self, f: BinaryIO, start: int = 0) -> Iterator[tuple[int, dict]]:
+        """
+        Yield parsed entries from a binary file object.
+
+        ``end_offset`` already points past a line when its entry is yielded.
+        A trailing line without a newline is treated as still being written:
+        it is parsed if complete JSON, but ``end_offset`` is not advanced past
+        it (``offset >= end_offset``) so incremental readers can leave it for
+        the next pass.
+
+        Args:
+            f: File opened in binary mode
+            start: Byte offset to start reading from (must be a line start)
+
+        Yields:
+            Tuples of (byte offset of line start, entry dict)
+        """
+        f.seek(start)
+        self.end_offset = start
+        line_start = start
+        parts = []          # pieces of the current line while under the ceiling
+        size = 0            # bytes of the current line seen so far
+        head = None         # set once the current line exceeds the ceiling
+        tail = b""
+        skipping = False    # oversized non-assistant line: just find its end
+        pos_base = start    # absolute offset of the current chunk
+
+        while True:
+            chunk = f.read(self.chunk_size)
+            if not chunk:
+                break
+            pos = 0
+            while pos < len(chunk):
+                nl = chunk.find(b"\n", pos)
+                end = nl if nl != -1 else len(chunk)
+                piece = chunk[pos:end]
+                size += len(piece)
+
+                if head is None:
+                    parts.append(piece)
+                    if size > self.max_line_bytes:
+                        # Switch to streaming mode for this line
+                        joined = b"".join(parts)
+                        head = joined[:HEAD_BYTES]
+                        skipping = not is_assistant_head(head)
+                        tail = b"" if skipping else joined[-TAIL_BYTES:]
+                        parts = []
+                        self.oversized_lines += 1
+                elif not skipping:
+                    tail = (tail + piece)[-TAIL_BYTES:]
+
+                if nl == -1:
+                    break
+
+                # Complete line
+                if head is None:
+                    line = b"".join(parts).strip()
+                    entry = self._decode(line) if line else None
+                elif skipping:
+                    entry = None
+                else:
+                    entry = build_skeleton_entry(head, tail)
+                pos = nl + 1
+                self.end_offset = pos_base + pos
+                if entry is not None:
+                    yield line_start, entry
+
+                line_start = self.end_offset
+                parts = []
+                size = 0
+                head = None
+                tail = b""
+                skipping = False
+            pos_base += len(chunk)
+
+        # Unterminated final line: parse if it is complete JSON already
+        if head is None and parts:
+            line = b"".join(parts).strip()
+            entry = self._decode(line) if line else None
+            if entry is not None:
+                yield line_start, entry
@@ -1,17 +1,33 @@
 """Main entry point for Claude Code Odometer Monitor"""
-import tkinter as tk
+import argparse
+import atexit
 import json
+import logging
+import sys
 import time
+from typing import Optional
 try:
     from .config import Config
-    from .ui_widget import OdometerWidget
+    from .usage_monitor import UsageMonitor, format_snapshot
     from .data_reader import find_active_session
     from .process_monitor import ProcessMonitor
+    from .project_catalog import get_catalog
+    from .cost_ledger import get_ledger
+    from .alerts import AlertEngine, StdoutSink
+    from .config_loader import get_reloader
+    from .hook_receiver import HookReceiver
+    from .snapshot_shm import SnapshotPublisher
 except ImportError:
     from config import Config
-    from ui_widget import OdometerWidget
+    from usage_monitor import UsageMonitor, format_snapshot
     from data_reader import find_active_session
     from process_monitor import ProcessMonitor
+    from project_catalog import get_catalog
+    from cost_ledger import get_ledger
+    from alerts import AlertEngine, StdoutSink
+    from config_loader import get_reloader
+    from hook_receiver import HookReceiver
+    from snapshot_shm import SnapshotPublisher
 
 
 # Global mutex handle for single instance enforcement
@@ -79,7 +95,7 @@ def release_lock():
             pass
 
 
-def load_window_position(root: tk.Tk) -> bool:
+def load_window_position(root: "tk.Tk") -> bool:
     """
     Load saved window position from config file.
 
@@ -114,7 +130,7 @@ def load_window_position(root: tk.Tk) -> bool:
     return False
 
 
-def save_window_position(root: tk.Tk):
+def save_window_position(root: "tk.Tk"):
     """
     Save current window position to config file.
 
@@ -139,7 +155,7 @@ def save_window_position(root: tk.Tk):
         pass
 
 
-def save_and_quit(root: tk.Tk):
+def save_and_quit(root: "tk.Tk"):
     """
     Save window position and quit application.
 
@@ -147,6 +163,8 @@ def save_and_quit(root: tk.Tk):
         root: tkinter root window
     """
     save_window_position(root)
+    get_catalog().save(force=True)
+    get_ledger().save(force=True)
     release_lock()
     root.quit()
 
@@ -165,25 +183,178 @@ def wait_for_session() -> bool:
     return False
 
 
-def main():
+def attach_alerts(monitor: UsageMonitor, root=None, console: bool = True):
+    """
+    Subscribe a configured AlertEngine to the monitor if alerts are enabled.
+
+    Args:
+        monitor: Usage snapshot feed
+        root: tkinter root window for toast notifications (None in headless mode)
+        console: Print alerts to stdout when there is no window (off under curses)
+    """
+    if not Config.ALERTS_ENABLED:
+        return
+    engine = AlertEngine.from_config(root)
+    if not console:
+        # stdout belongs to curses: printing would corrupt the screen
+        engine.sinks = [sink for sink in engine.sinks if not isinstance(sink, StdoutSink)]
+    elif root is None and "stdout" not in Config.ALERT_SINKS:
+        engine.sinks.append(StdoutSink())  # alerts are always visible headless
+    if engine.needs_all_sessions:
+        monitor.track_sessions = True
+    monitor.subscribe(engine.evaluate)
+
+
+def attach_hooks(monitor: UsageMonitor) -> Optional[HookReceiver]:
+    """
+    Start listening for hook_client.py events if enabled.
+
+    Args:
+        monitor: Usage snapshot feed that will read the pushed sessions
+
+    Returns:
+        The running receiver, or None if disabled or the port is taken
+    """
+    if not Config.HOOK_ENABLED:
+        return None
+    receiver = HookReceiver()
+    if not receiver.start():
+        return None
+    monitor.hook_receiver = receiver
+    return receiver
+
+
+def attach_snapshot_shm(monitor: UsageMonitor) -> Optional[SnapshotPublisher]:
+    """
+    Publish every snapshot to the shared-memory segment if enabled.
+
+    Args:
+        monitor: Usage snapshot feed
+
+    Returns:
+        The publisher, or None if disabled or the segment cannot be created
+    """
+    if not Config.SNAPSHOT_SHM_ENABLED:
+        return None
+    try:
+        publisher = SnapshotPublisher()
+    except OSError as e:
+        logging.warning(f"Shared-memory snapshot disabled: {e}")
+        return None
+    publisher.publish(monitor.snapshot)
+    monitor.subscribe(publisher.publish)
+    atexit.register(publisher.close)  # readers see the monitor stopped
+    return publisher
+
+
+def run_headless(monitor: UsageMonitor, max_ticks: int = 0):
+    """
+    Run the refresh loop without a window, printing one line per change.
+
+    Args:
+        monitor: Usage snapshot feed
+        max_ticks: Stop after this many refreshes (0 = run until interrupted)
+    """
+    monitor.subscribe(lambda snapshot: print(format_snapshot(snapshot), flush=True))
+    print(format_snapshot(monitor.snapshot), flush=True)
+
+    reloader = get_reloader()
+    ticks = 0
+    try:
+        while not max_ticks or ticks < max_ticks:
+            reloader.check()
+            monitor.poll()
+            ticks += 1
+            if monitor.hook_receiver is not None:
+                monitor.hook_receiver.wait(Config.REFRESH_INTERVAL_MS / 1000)
+            else:
+                time.sleep(Config.REFRESH_INTERVAL_MS / 1000)
+    except KeyboardInterrupt:
+        pass
+
+
+def run_terminal(monitor: UsageMonitor) -> int:
+    """
+    Run the curses terminal UI, keeping the config file live.
+
+    Args:
+        monitor: Usage snapshot feed
+
+    Returns:
+        Exit code
+    """
+    try:
+        from .tui import run_tui
+    except ImportError:
+        from tui import run_tui
+
+    return run_tui(monitor, before_poll=get_reloader().check)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Claude Code context usage monitor")
+    parser.add_argument("--headless", action="store_true",
+                        help="print usage to stdout instead of opening a window")
+    parser.add_argument("--tui", action="store_true",
+                        help="full-screen terminal UI instead of a window (e.g. over SSH)")
+    parser.add_argument("--print-config", action="store_true",
+                        help="print the effective configuration and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main application entry point"""
+    args = parse_args(argv)
+
+    # Apply user overrides before anything reads Config
+    reloader = get_reloader()
+    reloader.check()
+    if args.print_config:
+        print(reloader.format_effective_config())
+        return
+
+    if args.headless:
+        monitor = UsageMonitor()
+        attach_alerts(monitor)
+        attach_hooks(monitor)
+        attach_snapshot_shm(monitor)
+        run_headless(monitor)
+        return
+
+    if args.tui:
+        monitor = UsageMonitor()
+        attach_alerts(monitor, console=False)
+        attach_hooks(monitor)
+        attach_snapshot_shm(monitor)
+        sys.exit(run_terminal(monitor))
 
     # Check for duplicate instance
     if not acquire_lock():
         return  # Another instance running, exit silently
 
+    # tkinter is only needed for the window; --headless/--tui work without it
+    import tkinter as tk
+    try:
+        from .ui_widget import OdometerWidget
+    except ImportError:
+        from ui_widget import OdometerWidget
+
     # Create root window
     root = tk.Tk()
 
     # Initialize odometer widget
-    odometer = OdometerWidget(root)
+    monitor = UsageMonitor()
+    attach_alerts(monitor, root)
+    receiver = attach_hooks(monitor)
+    attach_snapshot_shm(monitor)
+    odometer = OdometerWidget(root, monitor)
 
     # Initialize process monitor
     process_monitor = ProcessMonitor(Config.AUTO_CLOSE_PROCESS_NAME)
 
     # Track consecutive "no process" checks
     no_process_count = 0
-    grace_period_checks = Config.AUTO_CLOSE_GRACE_PERIOD_MS // Config.AUTO_CLOSE_CHECK_INTERVAL_MS
 
     # Load saved window position (or center if first run)
     if not load_window_position(root):
@@ -200,6 +371,8 @@ def main():
 
     # Start refresh loop
     def refresh():
+        if reloader.check():
+            process_monitor.apply_config()
         odometer.update_display()
         root.after(Config.REFRESH_INTERVAL_MS, refresh)
 
@@ -209,12 +382,22 @@ def main():
     # Schedule first refresh
     root.after(Config.REFRESH_INTERVAL_MS, refresh)
 
+    # Pushed hook events are handled between refreshes
+    def check_hooks():
+        if receiver.pending:
+            odometer.update_display()
+        root.after(Config.HOOK_CHECK_INTERVAL_MS, check_hooks)
+
+    if receiver is not None:
+        root.after(Config.HOOK_CHECK_INTERVAL_MS, check_hooks)
+
     # Process monitoring loop
     def check_processes():
         nonlocal no_process_count
 
         if process_monitor.should_auto_close():
             no_process_count += 1
+            grace_period_checks = Config.AUTO_CLOSE_GRACE_PERIOD_MS // Config.AUTO_CLOSE_CHECK_INTERVAL_MS
 
             # If no processes for grace period, close
             if no_process_count >= grace_period_checks:
@@ -226,9 +409,8 @@ def main():
         # Schedule next check
         root.after(Config.AUTO_CLOSE_CHECK_INTERVAL_MS, check_processes)
 
-    # Start process monitoring if enabled
-    if process_monitor.enabled:
-        root.after(Config.AUTO_CLOSE_CHECK_INTERVAL_MS, check_processes)
+    # Start process monitoring (idle while disabled; the config file can enable it live)
+    root.after(Config.AUTO_CLOSE_CHECK_INTERVAL_MS, check_processes)
 
     # Save position on close (save_and_quit handles lock release)
     root.protocol("WM_DELETE_WINDOW", lambda: save_and_quit(root))
@@ -25,6 +25,11 @@ class ProcessMonitor:
                 "Install with: pip install psutil"
             )
 
+    def apply_config(self):
+        """Pick up AUTO_CLOSE_* settings changed at runtime (config reload)"""
+        self.process_name = Config.AUTO_CLOSE_PROCESS_NAME
+        self.enabled = PSUTIL_AVAILABLE and Config.AUTO_CLOSE_ENABLED
+
     def has_running_instances(self) -> bool:
         """Check if any Claude Code processes are running"""
         if not self.enabled:
@@ -0,0 +1,417 @@
+"""Cached catalog of Claude Code project directories"""
+import io
+import json
+import os
+import re
+import time
+from pathlib import Path, PurePosixPath, PureWindowsPath
+from typing import Optional
+try:
+    from .config import Config
+    from .jsonl_scanner import LineScanner
+except ImportError:
+    from config import Config
+    from jsonl_scanner import LineScanner
+
+
+# Claude Code encodes a project's cwd into its directory name by replacing
+# every character outside [A-Za-z0-9] with '-':
+#   /home/user/my_repo           -> -home-user-my-repo
+#   E:\10_CLAUDE_CODE\12_Monitor -> E--10-CLAUDE-CODE-12-Monitor
+_ENCODE_RE = re.compile(r"[^A-Za-z0-9]")
+_DRIVE_RE = re.compile(r"^([A-Za-z])--(.*)$")
+_WINDOWS_PATH_RE = re.compile(r"^(?:[A-Za-z]:[\\/]|\\\\)")
+
+# Bytes of a transcript searched for a "cwd" field before giving up
+_CWD_SEARCH_BYTES = 256 * 1024
+
+
+def encode_project_path(path: str) -> str:
+    """
+    Encode a filesystem path the way Claude Code names project directories.
+
+    Args:
+        path: Absolute project path
+
+    Returns:
+        Encoded directory name
+    """
+    return _ENCODE_RE.sub("-", path)
+
+
+def _resolve_on_disk(base: str, rest: str, depth: int = 0) -> Optional[str]:
+    """Find a real path under base whose encoded components spell rest."""
+    if not rest:
+        return base
+    if depth > 32:
+        return None
+    try:
+        names = os.listdir(base)
+    except OSError:
+        return None
+    # Longest match first; backtrack if a branch dead-ends
+    candidates = []
+    for name in names:
+        encoded = encode_project_path(name)
+        if rest == encoded or rest.startswith(encoded + "-"):
+            candidates.append((len(encoded), name))
+    for length, name in sorted(candidates, reverse=True):
+        found = _resolve_on_disk(os.path.join(base, name), rest[length + 1:], depth + 1)
+        if found:
+            return found
+    return None
+
+
+def decode_project_dir(encoded: str) -> str:
+    """
+    Decode a project directory name without transcript help.
+
+    The encoding is lossy, so the local filesystem is consulted first (which
+    recovers folder names containing '-', '_' or '.'). If the path does not
+    exist here (another machine, a deleted checkout), every '-' is taken as a
+    separator: '-home-user-repo' -> '/home/user/repo' and 'C--a-b' ->
+    'C:\\a\\b' (the drive's ':' and '\\' both became '-').
+
+    Args:
+        encoded: Encoded project directory name
+
+    Returns:
+        Best-guess absolute project path
+    """
+    drive = _DRIVE_RE.match(encoded)
+    if drive:
+        letter, rest = drive.groups()
+        base = f"{letter.upper()}:\\"
+        if os.name == "nt":
+            found = _resolve_on_disk(base, rest)
+            if found:
+                return found
+        return base + rest.replace("-", "\\")
+
+    if encoded.startswith("-"):
+        found = _resolve_on_disk("/", encoded[1:]) if os.name != "nt" else None
+        return found or encoded.replace("-", "/")
+
+    return encoded
+
+
+def project_display_name(project_path: str) -> str:
+    """
+    Get the last component of a project path on any platform.
+
+    Args:
+        project_path: Decoded project path (POSIX or Windows style)
+
+    Returns:
+        Last path component, or "" if there is none
+    """
+    if _WINDOWS_PATH_RE.match(project_path):
+        return PureWindowsPath(project_path).name
+    return PurePosixPath(project_path).name
+
+
+def root_label(spec) -> str:
+    """
+    Get the label of an extra projects root from Config.CLAUDE_PROJECTS_DIRS.
+
+    Args:
+        spec: Root path string or {"path": ..., "label": ...} dict
+
+    Returns:
+        The explicit label, or the root path itself
+    """
+    if isinstance(spec, dict):
+        return spec.get("label") or str(Path(spec["path"]).expanduser())
+    return str(Path(spec).expanduser())
+
+
+def project_key(session_path: Path) -> str:
+    """
+    Get the catalog key of the project a transcript belongs to.
+
+    Projects under the primary Config.CLAUDE_PROJECTS_DIR are keyed by their
+    encoded directory name; projects under an extra root are prefixed with
+    "<root label>:" so the same project seen from two machines stays apart.
+
+    Args:
+        session_path: Path to a transcript (sub-directories allowed)
+
+    Returns:
+        Catalog key
+    """
+    for spec in Config.CLAUDE_PROJECTS_DIRS:
+        root = Path(spec["path"] if isinstance(spec, dict) else spec).expanduser()
+        try:
+            return f"{root_label(spec)}:{session_path.relative_to(root).parts[0]}"
+        except (ValueError, IndexError):
+            continue
+    try:
+        return session_path.relative_to(Config.CLAUDE_PROJECTS_DIR).parts[0]
+    except (ValueError, IndexError):
+        return session_path.parent.name
+
+
+def search_transcript_cwd(session_path: Path, start: int = 0) -> tuple[Optional[str], int]:
+    """
+    Search the first _CWD_SEARCH_BYTES of a transcript for a "cwd" field.
+
+    At most _CWD_SEARCH_BYTES - start bytes are read, whether or not any
+    line in them mentions "cwd".
+
+    Args:
+        session_path: Path to a session JSONL file
+        start: Line-start offset already searched up to (see the return value)
+
+    Returns:
+        Tuple of (cwd or None, offset to resume from; _CWD_SEARCH_BYTES or
+        more once the window has been searched completely)
+    """
+    window = _CWD_SEARCH_BYTES - start
+    if window <= 0:
+        return None, start
+    try:
+        with open(session_path, "rb") as f:
+            f.seek(start)
+            data = f.read(window)
+    except OSError:
+        return None, start
+    scanner = LineScanner(needles=(b'"cwd"',))
+    for _, entry in scanner.scan(io.BytesIO(data)):
+        cwd = entry.get("cwd")
+        if isinstance(cwd, str) and cwd:
+            return cwd, start
+    if len(data) == window:
+        return None, _CWD_SEARCH_BYTES  # window exhausted: nothing more to find
+    return None, start + scanner.end_offset
+
+
+def read_transcript_cwd(session_path: Path) -> Optional[str]:
+    """
+    Read the working directory Claude Code recorded in a transcript.
+
+    Args:
+        session_path: Path to a session JSONL file
+
+    Returns:
+        The first "cwd" value found near the start of the file, or None
+    """
+    return search_transcript_cwd(session_path)[0]
+
+
+class ProjectCatalog:
+    """
+    Maps encoded project directories to decoded paths plus usage metadata.
+
+    Entries are memoized in memory and persisted to Config.PROJECT_CATALOG_FILE.
+    The discovery pass calls observe() for every transcript it stats, which
+    updates session counts and byte totals by delta rather than rescanning.
+    """
+
+    def __init__(self, catalog_file: Optional[Path] = None):
+        """
+        Initialize catalog, loading any persisted state.
+
+        Args:
+            catalog_file: JSON file location (default: Config.PROJECT_CATALOG_FILE)
+        """
+        self.catalog_file = catalog_file or Config.PROJECT_CATALOG_FILE
+        self.projects = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self._seen = set()
+        self._seen_paths = set()
+        self._structural = False  # sessions added/removed since last save
+        # Transcripts searched for a cwd without finding one: str path ->
+        # offset searched up to (see search_transcript_cwd)
+        self._cwd_searched = {}
+        self._load()
+
+    def _load(self):
+        """Load persisted catalog (ignored if missing or corrupt)."""
+        try:
+            with open(self.catalog_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data.get("projects"), dict):
+                self.projects = data["projects"]
+        except (OSError, json.JSONDecodeError, AttributeError):
+            self.projects = {}
+
+    def save(self, force: bool = False):
+        """
+        Persist the catalog if it changed.
+
+        Routine changes (byte counts growing) are written at most every
+        Config.CATALOG_SAVE_INTERVAL_S seconds; structural ones pass force=True.
+
+        Args:
+            force: Write even if the save interval has not elapsed
+        """
+        if not self._dirty:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_save < Config.CATALOG_SAVE_INTERVAL_S:
+            return
+        try:
+            self.catalog_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.catalog_file.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"projects": self.projects}, f)
+            os.replace(tmp, self.catalog_file)
+            self._dirty = False
+            self._last_save = now
+        except OSError:
+            pass
+
+    def _read_cwd(self, session_path: Path) -> Optional[str]:
+        """read_transcript_cwd() that never searches the same bytes twice."""
+        key = str(session_path)
+        cwd, searched = search_transcript_cwd(session_path, self._cwd_searched.get(key, 0))
+        if cwd is None:
+            self._cwd_searched[key] = searched
+        else:
+            self._cwd_searched.pop(key, None)
+        return cwd
+
+    def _project(self, encoded: str, session_path: Path, probe_cwd: bool,
+                 cwd: Optional[str] = None, read_cwd: bool = True) -> dict:
+        """
+        Get or create the entry for a project key.
+
+        A new entry reads the transcript for its cwd, an existing one only
+        when probe_cwd is set and it has none yet. A cwd passed in is used
+        as is, and read_cwd=False forbids touching the transcript at all.
+        """
+        project = self.projects.get(encoded)
+        if project is None:
+            if cwd is None and read_cwd:
+                cwd = self._read_cwd(session_path)
+            project = {
+                "path": cwd or decode_project_dir(encoded.rpartition(":")[2]),
+                "from_cwd": cwd is not None,
+                "session_count": 0,
+                "first_seen": None,
+                "last_seen": None,
+                "total_bytes": 0,
+                "sessions": {},
+            }
+            self.projects[encoded] = project
+            self._dirty = True
+            self._structural = True
+        elif not project["from_cwd"]:
+            if cwd is None and probe_cwd and read_cwd:
+                cwd = self._read_cwd(session_path)
+            if cwd:
+                project["path"] = cwd
+                project["from_cwd"] = True
+                self._dirty = True
+        return project
+
+    def observe(self, encoded: str, session_key: str, session_path: Path,
+                stat: os.stat_result, cwd: Optional[str] = None, read_cwd: bool = True):
+        """
+        Record one transcript seen by the discovery pass.
+
+        Args:
+            encoded: Project key (see project_key())
+            session_key: Transcript path relative to the project directory;
+                only top-level keys (no '/') count as sessions
+            session_path: Path to the session JSONL file
+            stat: Result of session_path.stat()
+            cwd: Project working directory if already known
+            read_cwd: Whether the transcript may be read to find the cwd
+                (False for slow roots, whose scanner supplies cwd itself)
+        """
+        project = self.projects.get(encoded)
+        self._seen.add((encoded, session_key))
+        self._seen_paths.add(str(session_path))
+        if project is not None:
+            known = project["sessions"].get(session_key)
+            if known == stat.st_size:
+                return  # Nothing changed since the last pass
+
+        # New or grown transcript: worth another look for a recorded cwd
+        project = self._project(encoded, session_path, probe_cwd=True, cwd=cwd, read_cwd=read_cwd)
+        sessions = project["sessions"]
+        previous = sessions.get(session_key)
+        if previous is None:
+            if "/" not in session_key:
+                project["session_count"] += 1
+            self._structural = True
+            previous = 0
+        if previous != stat.st_size:
+            project["total_bytes"] += stat.st_size - previous
+            sessions[session_key] = stat.st_size
+            self._dirty = True
+        mtime = stat.st_mtime
+        if project["first_seen"] is None or mtime < project["first_seen"]:
+            project["first_seen"] = mtime
+        if project["last_seen"] is None or mtime > project["last_seen"]:
+            project["last_seen"] = mtime
+
+    def finish_pass(self, keep_prefixes: tuple = ()):
+        """
+        Drop sessions that disappeared since the previous pass and persist.
+
+        Call once after observe() has been called for every transcript.
+
+        Args:
+            keep_prefixes: Project key prefixes whose sessions are kept even
+                if unseen (roots that could not be scanned this time)
+        """
+        for encoded, project in self.projects.items():
+            if keep_prefixes and encoded.startswith(keep_prefixes):
+                continue
+            for session_key in list(project["sessions"]):
+                if (encoded, session_key) not in self._seen:
+                    project["total_bytes"] -= project["sessions"].pop(session_key)
+                    if "/" not in session_key:
+                        project["session_count"] -= 1
+                    self._structural = True
+        self._seen = set()
+        if self._structural:
+            self._dirty = True
+        self.save(force=self._structural)
+        self._structural = False
+        self._cwd_searched = {key: end for key, end in self._cwd_searched.items()
+                              if key in self._seen_paths}
+        self._seen_paths = set()
+
+    def project_path(self, session_path: Path) -> str:
+        """
+        Get the decoded project path for a session file.
+
+        Args:
+            session_path: Path to the session JSONL file
+
+        Returns:
+            Decoded absolute project path
+        """
+        return self._project(project_key(session_path), session_path, probe_cwd=False)["path"]
+
+    def project_name(self, session_path: Path) -> str:
+        """
+        Get the short display name of a session's project.
+
+        Args:
+            session_path: Path to the session JSONL file
+
+        Returns:
+            Last component of the project path
+        """
+        return project_display_name(self.project_path(session_path))
+
+
+_catalog: Optional[ProjectCatalog] = None
+
+
+def get_catalog() -> ProjectCatalog:
+    """
+    Get the process-wide project catalog, loading it on first use.
+
+    Returns:
+        Shared ProjectCatalog instance
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = ProjectCatalog()
+    return _catalog
@@ -0,0 +1,306 @@
+"""Replay a recorded transcript into a scratch projects dir for load testing
+
+Usage:
+    python src/replay.py SESSION.jsonl [--speed N] [--gui] [--poll-ms MS] [--json]
+
+--speed 1 replays in real time (from the entries' timestamps), 10 replays
+ten times faster and 0 appends lines as fast as possible. The real pipeline
+(UsageMonitor, plus OdometerWidget with --gui) polls the scratch copy while
+it grows, and the report covers append-to-render latency (measured when the
+changed snapshot reaches a subscriber), coalesced and dropped updates, poll
+durations and CPU per appended MB.
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+try:
+    from .config import Config
+    from .data_reader import extract_tokens_from_entry
+    from .transcript_index import get_index
+    from .usage_monitor import UsageMonitor
+except ImportError:
+    from config import Config
+    from data_reader import extract_tokens_from_entry
+    from transcript_index import get_index
+    from usage_monitor import UsageMonitor
+
+
+def use_scratch_dir(scratch_dir: Path):
+    """
+    Point every path the pipeline reads or writes into a scratch directory.
+
+    Args:
+        scratch_dir: Directory that will hold projects/ and monitor state
+    """
+    Config.CLAUDE_PROJECTS_DIR = scratch_dir / "projects"
+    Config.CLAUDE_PROJECTS_DIRS = []  # the user's extra roots must not leak in
+    Config.CONFIG_DIR = scratch_dir / "monitor"
+    Config.POSITION_FILE = Config.CONFIG_DIR / "position.json"
+    Config.INDEX_DIR = Config.CONFIG_DIR / "index"
+    Config.PROJECT_CATALOG_FILE = Config.CONFIG_DIR / "projects.json"
+    Config.COST_LEDGER_FILE = Config.CONFIG_DIR / "costs.json"
+
+
+def _line_info(line: bytes) -> tuple[Optional[float], Optional[int]]:
+    """Get (timestamp in seconds, usage tokens) of a raw transcript line."""
+    try:
+        entry = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None, None
+    if not isinstance(entry, dict):
+        return None, None
+    timestamp = None
+    if isinstance(entry.get("timestamp"), str):
+        try:
+            timestamp = datetime.fromisoformat(entry["timestamp"].replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    tokens = extract_tokens_from_entry(entry)
+    return timestamp, tokens if tokens > 0 else None
+
+
+def _percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+class ReplayDriver:
+    """Appends a recorded transcript to a scratch copy and measures the pipeline"""
+
+    def __init__(self, source: Path, scratch_dir: Path, speed: float = 0.0,
+                 max_gap_s: float = 5.0):
+        """
+        Initialize driver.
+
+        Args:
+            source: Recorded session JSONL file
+            scratch_dir: Directory used as the replay's Claude home
+            speed: Replay rate multiplier (1 = real time, 0 = unthrottled)
+            max_gap_s: Longest pause honoured between two lines (before the
+                speed multiplier), so idle periods do not stall the replay
+        """
+        self.source = Path(source)
+        self.speed = speed
+        self.max_gap_s = max_gap_s
+        use_scratch_dir(scratch_dir)
+        project_dir = Config.CLAUDE_PROJECTS_DIR / (self.source.parent.name or "-replay")
+        project_dir.mkdir(parents=True, exist_ok=True)
+        self.target = project_dir / self.source.name
+        self.target.write_bytes(b"")
+
+        # Usage lines appended: (append time, end offset, tokens)
+        self.appends = []
+        self.appended_bytes = 0
+        self.writer_done = threading.Event()
+        self._lock = threading.Lock()
+
+        # Pipeline observations
+        self.poll_durations = []
+        self.latencies = []
+        self.coalesced = 0
+        self.unchanged = 0  # processed usage lines that left the snapshot as it was
+        self.renders = 0
+        self._next_unseen = 0  # index into self.appends of first unprocessed line
+        self._cpu_start = 0.0
+        self._pipeline_cpu = 0.0
+
+    def _write_lines(self):
+        """Writer thread: append source lines to the target at the replay rate."""
+        start = time.monotonic()
+        virtual = 0.0
+        previous_ts = None
+        try:
+            with open(self.source, "rb") as src, open(self.target, "ab") as dst:
+                for line in src:
+                    timestamp, tokens = _line_info(line)
+                    if self.speed > 0 and timestamp is not None:
+                        if previous_ts is not None:
+                            virtual += min(max(timestamp - previous_ts, 0.0), self.max_gap_s) / self.speed
+                        previous_ts = timestamp
+                        delay = start + virtual - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                    if not line.endswith(b"\n"):
+                        line += b"\n"
+                    dst.write(line)
+                    dst.flush()
+                    self.appended_bytes += len(line)
+                    if tokens is not None:
+                        with self._lock:
+                            self.appends.append((time.monotonic(), self.appended_bytes, tokens))
+        finally:
+            self.writer_done.set()
+
+    def start(self):
+        """Start appending in a background thread."""
+        self._cpu_start = time.process_time()
+        threading.Thread(target=self._write_lines, name="replay-writer", daemon=True).start()
+
+    def _take_processed(self) -> list[tuple[float, int, int]]:
+        """Appended usage lines the index has read since the last call."""
+        processed = get_index(self.target).scanned_offset
+        with self._lock:
+            pending = self.appends[self._next_unseen:]
+        covered = [a for a in pending if a[1] <= processed]
+        self._next_unseen += len(covered)
+        return covered
+
+    def on_snapshot(self, _snapshot: dict):
+        """
+        Record the delivery of a changed snapshot (subscribe this to the
+        monitor, or call it once the widget has repainted).
+        """
+        now = time.monotonic()
+        self.renders += 1
+        covered = self._take_processed()
+        for appended_at, _, _ in covered:
+            self.latencies.append(now - appended_at)
+        # Distinct values that arrived together: only the last one is shown
+        distinct = []
+        for _, _, tokens in covered:
+            if not distinct or distinct[-1] != tokens:
+                distinct.append(tokens)
+        self.coalesced += max(len(distinct) - 1, 0)
+
+    def observe_poll(self, started: float, cpu_used: float):
+        """
+        Record one pipeline refresh that has just finished.
+
+        Args:
+            started: time.monotonic() when the refresh began
+            cpu_used: Thread CPU seconds the refresh consumed
+        """
+        self.poll_durations.append(time.monotonic() - started)
+        self._pipeline_cpu += cpu_used
+        # Read but not delivered: the snapshot did not change
+        self.unchanged += len(self._take_processed())
+
+    def report(self) -> dict:
+        """
+        Summarize the run.
+
+        Returns:
+            Dictionary of measurements (times in milliseconds)
+        """
+        total_cpu = time.process_time() - self._cpu_start
+        mb = self.appended_bytes / (1024 * 1024)
+        latencies_ms = [lat * 1000 for lat in self.latencies]
+        polls_ms = [d * 1000 for d in self.poll_durations]
+        return {
+            "appended_mb": round(mb, 3),
+            "usage_lines": len(self.appends),
+            "renders": self.renders,
+            "polls": len(self.poll_durations),
+            "coalesced_updates": self.coalesced,
+            "unchanged_updates": self.unchanged,
+            "dropped_updates": len(self.appends) - self._next_unseen,
+            "latency_ms_p50": round(_percentile(latencies_ms, 50), 1),
+            "latency_ms_p95": round(_percentile(latencies_ms, 95), 1),
+            "latency_ms_max": round(max(latencies_ms, default=0.0), 1),
+            "poll_ms_p50": round(_percentile(polls_ms, 50), 2),
+            "poll_ms_max": round(max(polls_ms, default=0.0), 2),
+            "pipeline_cpu_s_per_mb": round(self._pipeline_cpu / mb, 4) if mb else 0.0,
+            "process_cpu_s_per_mb": round(total_cpu / mb, 4) if mb else 0.0,
+        }
+
+
+def run_headless(driver: ReplayDriver, monitor: UsageMonitor, poll_ms: int):
+    """Drive the headless pipeline until the replay has been fully processed."""
+    monitor.subscribe(driver.on_snapshot)
+
+    driver.start()
+    while True:
+        finished = driver.writer_done.is_set()
+        started = time.monotonic()
+        cpu = time.thread_time()
+        monitor.poll()
+        driver.observe_poll(started, time.thread_time() - cpu)
+        if finished:
+            break
+        time.sleep(poll_ms / 1000)
+
+
+def run_gui(driver: ReplayDriver, monitor: UsageMonitor, poll_ms: int):
+    """Drive a real OdometerWidget until the replay has been fully processed."""
+    import tkinter as tk
+    try:
+        from .ui_widget import OdometerWidget
+    except ImportError:
+        from ui_widget import OdometerWidget
+
+    root = tk.Tk()
+    widget = OdometerWidget(root, monitor)
+
+    def tick():
+        finished = driver.writer_done.is_set()
+        started = time.monotonic()
+        cpu = time.thread_time()
+        snapshot = monitor.poll()
+        if snapshot is not None:
+            widget.render(snapshot)
+            root.update_idletasks()  # include the repaint in the measurement
+            driver.on_snapshot(snapshot)
+        driver.observe_poll(started, time.thread_time() - cpu)
+        if finished:
+            root.quit()
+        else:
+            root.after(poll_ms, tick)
+
+    driver.start()
+    root.after(poll_ms, tick)
+    root.mainloop()
+    root.destroy()
+
+
+def main(argv=None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Replay a transcript through the monitor pipeline")
+    parser.add_argument("source", type=Path, help="recorded session JSONL file")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="1 = real time, N = N times faster, 0 = as fast as possible (default)")
+    parser.add_argument("--max-gap", type=float, default=5.0,
+                        help="longest pause between lines in seconds before scaling (default: 5)")
+    parser.add_argument("--poll-ms", type=int, default=Config.REFRESH_INTERVAL_MS,
+                        help="pipeline refresh interval (default: Config.REFRESH_INTERVAL_MS)")
+    parser.add_argument("--gui", action="store_true", help="attach a real OdometerWidget")
+    parser.add_argument("--scratch", type=Path, help="scratch directory (default: temporary)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not args.source.is_file():
+        print(f"Error: {args.source} not found", file=sys.stderr)
+        return 1
+
+    scratch = args.scratch or Path(tempfile.mkdtemp(prefix="cc-replay-"))
+    try:
+        driver = ReplayDriver(args.source, scratch, args.speed, args.max_gap)
+        monitor = UsageMonitor()
+        if args.gui:
+            run_gui(driver, monitor, args.poll_ms)
+        else:
+            run_headless(driver, monitor, args.poll_ms)
+        report = driver.report()
+    finally:
+        if args.scratch is None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"{key:24} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
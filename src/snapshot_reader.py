@@ -0,0 +1,166 @@
+"""Lock-free reader for the monitor's shared-memory usage snapshot
+
+Standalone: imports only the standard library and nothing from this package,
+so prompt renderers and editor plugins can copy or import it directly.
+
+    from snapshot_reader import SnapshotReader
+    reader = SnapshotReader()           # maps the segment once
+    snap = reader.read()                # no syscalls, no locks
+    if snap and snap["active"]:
+        print(f"{snap['percentage']:.0f}%")
+
+Command line (e.g. in a shell prompt):
+
+    python -S src/snapshot_reader.py --format "{percentage:.0f}% {project}"
+
+Segment layout (little-endian, SEGMENT_SIZE bytes):
+
+    0   4s  magic b"CCMS"
+    4   H   layout version
+    6   H   body size
+    8   Q   sequence number (odd while the monitor is writing)
+    16      body (BODY struct); the first field is the CRC32 of the rest
+
+Readers copy the body between two reads of the sequence number and retry
+if it was odd or changed; the CRC rejects any copy torn despite that.
+"""
+import mmap
+import os
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Optional
+
+MAGIC = b"CCMS"
+LAYOUT_VERSION = 1
+SEGMENT_SIZE = 512
+HEADER = struct.Struct("<4sHHQ")
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+BODY_OFFSET = HEADER.size
+# crc, pid, flags, compactions, updated_at, tokens, plan_limit, percentage,
+# cost_session, cost_today, color, project, model_id, model_name, session_id
+BODY = struct.Struct("<IIIIdQQddd8s64s64s64s64s")
+
+FLAG_ACTIVE = 1
+FLAG_STOPPED = 2  # the monitor exited; values are its last snapshot
+FLAG_COSTS = 4
+
+_RETRIES = 100
+
+
+def default_segment_path() -> Path:
+    """Segment location shared by the monitor and readers."""
+    shm = Path("/dev/shm")
+    if shm.is_dir():
+        return shm / f"claude-monitor-{os.getuid()}.snapshot"
+    return Path.home() / ".claude-monitor" / "snapshot.shm"
+
+
+def _text(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("utf-8", errors="ignore")
+
+
+def decode_body(body: bytes) -> Optional[dict]:
+    """
+    Decode a body copy.
+
+    Returns:
+        Snapshot dict, or None if the CRC does not match
+    """
+    fields = BODY.unpack(body)
+    if fields[0] != zlib.crc32(body[4:]):
+        return None
+    (_, pid, flags, compactions, updated_at, tokens, plan_limit, percentage,
+     cost_session, cost_today, color, project, model_id, model_name, session_id) = fields
+    return {
+        "active": bool(flags & FLAG_ACTIVE),
+        "stopped": bool(flags & FLAG_STOPPED),
+        "pid": pid,
+        "updated_at": updated_at,
+        "tokens": tokens,
+        "plan_limit": plan_limit,
+        "percentage": percentage,
+        "color": _text(color),
+        "project": _text(project),
+        "model_id": _text(model_id),
+        "model_name": _text(model_name),
+        "session_id": _text(session_id),
+        "compactions": compactions,
+        "costs": {"session": cost_session, "today": cost_today} if flags & FLAG_COSTS else None,
+    }
+
+
+class SnapshotReader:
+    """Maps the snapshot segment read-only and returns consistent copies"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Map the segment.
+
+        Args:
+            path: Segment file (default: default_segment_path())
+
+        Raises:
+            OSError: If the monitor has not created the segment
+        """
+        self.path = Path(path) if path else default_segment_path()
+        with open(self.path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), SEGMENT_SIZE, access=mmap.ACCESS_READ)
+            except ValueError:  # shorter than SEGMENT_SIZE: not initialized yet
+                raise OSError(f"{self.path}: not a snapshot segment")
+
+    def close(self):
+        self._mm.close()
+
+    def read(self) -> Optional[dict]:
+        """
+        Copy the current snapshot.
+
+        Returns:
+            Snapshot dict (see decode_body), or None if the segment has no
+            valid snapshot (wrong layout, never written, or a writer that
+            kept it busy for every retry)
+        """
+        mm = self._mm
+        magic, version, size, _ = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION or size != BODY.size:
+            return None
+        for _ in range(_RETRIES):
+            before = SEQ.unpack_from(mm, SEQ_OFFSET)[0]
+            if before == 0:
+                return None  # created but never published
+            if before & 1:
+                continue
+            body = mm[BODY_OFFSET:BODY_OFFSET + BODY.size]
+            if SEQ.unpack_from(mm, SEQ_OFFSET)[0] != before:
+                continue
+            snapshot = decode_body(body)
+            if snapshot is not None:
+                snapshot["sequence"] = before
+                return snapshot
+        return None
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Print the monitor's latest usage snapshot")
+    parser.add_argument("--format", default="{project} {percentage:.1f}% {tokens:,}/{plan_limit:,}",
+                        help="str.format template over the snapshot fields")
+    parser.add_argument("--path", type=Path, help=f"segment file (default: {default_segment_path()})")
+    args = parser.parse_args(argv)
+    try:
+        reader = SnapshotReader(args.path)
+    except OSError:
+        return 1  # monitor not running: print nothing
+    snapshot = reader.read()
+    if snapshot is None or not snapshot["active"] or snapshot["stopped"]:
+        return 1
+    print(args.format.format(**snapshot))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Publishes usage snapshots into a shared-memory segment
+
+The segment is a SEGMENT_SIZE-byte file mapped into memory (under /dev/shm
+on Linux, so it never touches disk); its layout and the lock-free reader are
+in snapshot_reader.py. Each publish is a seqlock write: the sequence number
+is made odd, the body (with its CRC) is copied in, and the sequence number is
+made even again.
+
+Only one monitor publishes at a time: a second one (say the GUI plus a
+--headless or --tui instance) refuses to take over a segment whose last
+writer is still running.
+"""
+import mmap
+import os
+import stat
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    from .config import Config
+    from .jsonl_scanner import transcript_stem
+    from .snapshot_reader import (
+        BODY, BODY_OFFSET, FLAG_ACTIVE, FLAG_COSTS, FLAG_STOPPED, HEADER, LAYOUT_VERSION,
+        MAGIC, SEGMENT_SIZE, SEQ, SEQ_OFFSET, decode_body, default_segment_path,
+    )
+except ImportError:
+    from config import Config
+    from jsonl_scanner import transcript_stem
+    from snapshot_reader import (
+        BODY, BODY_OFFSET, FLAG_ACTIVE, FLAG_COSTS, FLAG_STOPPED, HEADER, LAYOUT_VERSION,
+        MAGIC, SEGMENT_SIZE, SEQ, SEQ_OFFSET, decode_body, default_segment_path,
+    )
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process id belongs to a running process (False if unknown)."""
+    if pid <= 0:
+        return False
+    if PSUTIL_AVAILABLE:
+        return psutil.pid_exists(pid)
+    if os.name == "nt":
+        return False  # os.kill() would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _field(text: Optional[str], size: int) -> bytes:
+    """UTF-8 text cut to a fixed-size field on a character boundary."""
+    raw = (text or "").encode("utf-8")[:size]
+    return raw.decode("utf-8", errors="ignore").encode("utf-8")
+
+
+def encode_body(snapshot: dict, flags: int = 0) -> bytes:
+    """
+    Pack a UsageMonitor snapshot into the BODY layout, CRC included.
+
+    Args:
+        snapshot: Snapshot dict
+        flags: Extra FLAG_* bits
+
+    Returns:
+        BODY.size bytes
+    """
+    if snapshot["active"]:
+        flags |= FLAG_ACTIVE
+    costs = snapshot.get("costs")
+    if costs:
+        flags |= FLAG_COSTS
+    session_path = snapshot.get("session_path")
+    body = bytearray(BODY.pack(
+        0, os.getpid(), flags, len(snapshot.get("compactions") or ()), time.time(),
+        snapshot["tokens"], snapshot["plan_limit"], snapshot["percentage"],
+        costs["session"] if costs else 0.0, costs["today"] if costs else 0.0,
+        _field(snapshot.get("color"), 8), _field(snapshot.get("project"), 64),
+        _field(snapshot.get("model_id"), 64), _field(snapshot.get("model_name"), 64),
+        _field(transcript_stem(Path(session_path)) if session_path else "", 64),
+    ))
+    body[0:4] = zlib.crc32(body[4:]).to_bytes(4, "little")
+    return bytes(body)
+
+
+class SnapshotPublisher:
+    """Writer side of the shared-memory snapshot segment"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Create (or take over) and map the segment.
+
+        Args:
+            path: Segment file (default: Config.SNAPSHOT_SHM_PATH or
+                snapshot_reader.default_segment_path())
+
+        Raises:
+            OSError: If the segment cannot be created or mapped, is a
+                symlink, not a regular file or owned by another user, or
+                another running monitor is publishing to it
+        """
+        self.path = Path(path or Config.SNAPSHOT_SHM_PATH or default_segment_path())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # /dev/shm is world-writable: never follow a planted symlink or
+        # write into someone else's file
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+        try:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode):
+                raise OSError(f"{self.path}: not a regular file")
+            if hasattr(os, "getuid") and st.st_uid != os.getuid():
+                raise OSError(f"{self.path}: owned by uid {st.st_uid}")
+            if st.st_size != SEGMENT_SIZE:
+                os.ftruncate(fd, SEGMENT_SIZE)
+            self._mm = mmap.mmap(fd, SEGMENT_SIZE, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        magic, version, _, seq = HEADER.unpack_from(self._mm, 0)
+        owner = self._live_writer() if magic == MAGIC and version == LAYOUT_VERSION else None
+        if owner is not None:
+            self._mm.close()
+            raise OSError(f"{self.path}: already published by running monitor (pid {owner})")
+        # Continue a previous writer's sequence so readers never see it go back
+        self._seq = seq + (seq & 1) if magic == MAGIC and version == LAYOUT_VERSION else 0
+        HEADER.pack_into(self._mm, 0, MAGIC, LAYOUT_VERSION, BODY.size, self._seq)
+        self._last = None
+
+    def _live_writer(self) -> Optional[int]:
+        """Pid of another running monitor still publishing here, if any."""
+        body = self._mm[BODY_OFFSET:BODY_OFFSET + BODY.size]
+        if SEQ.unpack_from(self._mm, SEQ_OFFSET)[0] == 0 or not any(body):
+            return None
+        snapshot = decode_body(body)
+        if snapshot is None or snapshot["stopped"] or snapshot["pid"] == os.getpid():
+            return None
+        return snapshot["pid"] if _process_alive(snapshot["pid"]) else None
+
+    def publish(self, snapshot: dict, flags: int = 0):
+        """
+        Write a snapshot (subscribe this to UsageMonitor).
+
+        Args:
+            snapshot: Snapshot dict
+            flags: Extra FLAG_* bits
+        """
+        body = encode_body(snapshot, flags)
+        mm = self._mm
+        self._seq += 1
+        SEQ.pack_into(mm, SEQ_OFFSET, self._seq)  # odd: write in progress
+        mm[BODY_OFFSET:BODY_OFFSET + BODY.size] = body
+        self._seq += 1
+        SEQ.pack_into(mm, SEQ_OFFSET, self._seq)
+        self._last = snapshot
+
+    def close(self):
+        """Mark the segment stopped (readers keep the last values) and unmap it."""
+        if self._mm.closed:
+            return
+        if self._last is not None:
+            self.publish(self._last, FLAG_STOPPED)
+        self._mm.close()
+
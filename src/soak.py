@@ -0,0 +1,412 @@
+"""Soak test: run the refresh loop for many simulated hours and check budgets
+
+Usage:
+    python src/soak.py [--source SESSION.jsonl | --real] [--ticks N] [--gui] [--json]
+
+Ticks run back to back, so 10,000 ticks at the default 2 s refresh interval
+simulate about 5.5 hours. Between ticks a feeder appends transcript lines
+(replayed from --source, or synthetic ones including oversized tool
+results) to a scratch projects dir and rotates to a fresh session every
+--rotate-lines lines, like a user starting new conversations. --real polls
+the real ~/.claude/projects read-only instead.
+
+Every --sample-every ticks a tracemalloc snapshot and an RSS sample are
+taken. The first sample after --warmup ticks is the baseline. CPU per tick
+is measured afterwards over --cpu-ticks further ticks with tracing off,
+since tracemalloc slows allocation-heavy code severalfold. The run fails
+(exit code 1) if traced memory or RSS grew by more than the configured
+budgets, or if the mean CPU per tick exceeds Config.SOAK_MAX_CPU_PCT of the
+refresh interval. The report lists the allocation sites that grew most.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    from .config import Config
+    from .replay import use_scratch_dir, _percentile
+    from .usage_monitor import UsageMonitor
+except ImportError:
+    from config import Config
+    from replay import use_scratch_dir, _percentile
+    from usage_monitor import UsageMonitor
+
+
+def rss_mb() -> Optional[float]:
+    """
+    Current resident set size of this process in MB.
+
+    Uses psutil when installed, /proc on Linux, and the peak RSS from the
+    resource module as a last resort.
+
+    Returns:
+        RSS in MB, or None if it cannot be measured
+    """
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+
+def _line(entry: dict) -> bytes:
+    return json.dumps(entry).encode("utf-8") + b"\n"
+
+
+def _synthetic_lines(session_id: str, big_payload: str):
+    """Endless synthetic transcript: user turns, tool results and growing assistant usage."""
+    context = 20000
+    n = 0
+    while True:
+        n += 1
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        yield _line({"type": "user", "sessionId": session_id, "timestamp": timestamp,
+                     "cwd": "/soak/project", "message": {"role": "user", "content": f"step {n}"}})
+        if n % 50 == 0:
+            # Oversized tool result: exercises the streaming path of the scanner
+            yield _line({"type": "user", "sessionId": session_id, "timestamp": timestamp,
+                         "message": {"role": "user", "content": [
+                             {"type": "tool_result", "content": big_payload}]}})
+        context += 1500
+        yield _line({
+            "type": "assistant", "sessionId": session_id, "timestamp": timestamp,
+            "message": {"id": f"msg_soak_{session_id}_{n}", "model": "claude-sonnet-4-6",
+                        "role": "assistant", "content": [{"type": "text", "text": "ok"}],
+                        "usage": {"input_tokens": 10, "output_tokens": 200,
+                                  "cache_read_input_tokens": context,
+                                  "cache_creation": {"ephemeral_5m_input_tokens": 1200}}},
+        })
+
+
+class TranscriptFeeder:
+    """Appends lines to a scratch session between ticks, rotating sessions"""
+
+    def __init__(self, project_dir: Path, source: Optional[Path] = None,
+                 lines_per_tick: int = 3, rotate_lines: int = 2000):
+        """
+        Initialize feeder.
+
+        Args:
+            project_dir: Scratch project directory to write sessions into
+            source: Recorded transcript to cycle through (default: synthetic)
+            lines_per_tick: Lines appended before each tick
+            rotate_lines: Lines per session before starting a new one (the
+                previous session file is deleted)
+        """
+        self.project_dir = project_dir
+        self.source = source
+        self.lines_per_tick = lines_per_tick
+        self.rotate_lines = rotate_lines
+        self.sessions = 0
+        self.appended_bytes = 0
+        self.path = None
+        self._file = None
+        self._lines = None
+        self._written = 0
+        # Built once, before tracing starts, so it never shows up as growth
+        self._big_payload = "x" * (Config.MAX_LINE_BYTES + 1024)
+        self.project_dir.mkdir(parents=True, exist_ok=True)
+        self._rotate()
+
+    def _source_lines(self):
+        while True:
+            with open(self.source, "rb") as f:
+                for line in f:
+                    yield line if line.endswith(b"\n") else line + b"\n"
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+            self.path.unlink()
+        self.sessions += 1
+        session_id = f"soak-{self.sessions:05d}"
+        self.path = self.project_dir / f"{session_id}.jsonl"
+        self._file = open(self.path, "ab")
+        self._written = 0
+        if self.source is not None:
+            if self._lines is None:
+                self._lines = self._source_lines()
+        else:
+            self._lines = _synthetic_lines(session_id, self._big_payload)
+
+    def feed(self):
+        """Append the next lines_per_tick lines."""
+        for _ in range(self.lines_per_tick):
+            if self._written >= self.rotate_lines:
+                self._rotate()
+            line = next(self._lines)
+            self._file.write(line)
+            self.appended_bytes += len(line)
+            self._written += 1
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def check_budgets(report: dict, budgets: dict) -> list[str]:
+    """
+    Compare a soak report against budgets.
+
+    Args:
+        report: Result of SoakRunner.run()
+        budgets: Dict with keys traced_growth_mb, rss_growth_mb, cpu_pct
+            (None or 0 disables a budget)
+
+    Returns:
+        Human-readable budget violations (empty if within budget)
+    """
+    checks = (
+        ("traced_growth_mb", "traced memory grew {value:.2f} MB (budget {budget} MB)"),
+        ("rss_growth_mb", "RSS grew {value:.2f} MB (budget {budget} MB)"),
+        ("cpu_pct", "mean CPU per tick is {value:.2f}% of the refresh interval (budget {budget}%)"),
+    )
+    violations = []
+    for key, message in checks:
+        budget = budgets.get(key)
+        value = report.get(key)
+        if budget and value is not None and value > budget:
+            violations.append(message.format(value=value, budget=budget))
+    return violations
+
+
+class SoakRunner:
+    """Runs a tick function many times while sampling memory and CPU"""
+
+    def __init__(self, tick: Callable[[], None], feed: Optional[Callable[[], None]] = None,
+                 sample_every: int = 500, warmup: int = 200, top_sites: int = 10,
+                 cpu_ticks: int = 1000):
+        """
+        Initialize runner.
+
+        Args:
+            tick: One refresh of the pipeline under test
+            feed: Called before each tick to grow the workload (not measured)
+            sample_every: Ticks between memory samples
+            warmup: Ticks before the baseline sample (caches fill up)
+            top_sites: Allocation sites listed in the report
+            cpu_ticks: Untraced ticks timed after the memory phase (at
+                most as many as the memory phase runs)
+        """
+        self.tick = tick
+        self.feed = feed
+        self.sample_every = sample_every
+        self.warmup = warmup
+        self.top_sites = top_sites
+        self.cpu_ticks = cpu_ticks
+        self.samples = []
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        # Drop the harness's own allocations (samples, feeder lines) so they
+        # never count as growth of the code under test
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def _time_ticks(self, ticks: int) -> array:
+        tick_cpu = array("d")
+        for _ in range(ticks):
+            if self.feed is not None:
+                self.feed()
+            cpu = time.thread_time()
+            self.tick()
+            tick_cpu.append(time.thread_time() - cpu)
+        return tick_cpu
+
+    def run(self, ticks: int, progress: Optional[Callable[[str], None]] = None) -> dict:
+        """
+        Run the soak.
+
+        Args:
+            ticks: Number of refreshes
+            progress: Optional callback receiving one line per sample
+
+        Returns:
+            Report dict (memory in MB, CPU in ms)
+        """
+        baseline = None
+        baseline_rss = None
+        last = None
+        tracemalloc.start(10)
+        try:
+            for n in range(1, ticks + 1):
+                if self.feed is not None:
+                    self.feed()
+                self.tick()
+
+                if n == self.warmup or (n > self.warmup and (n - self.warmup) % self.sample_every == 0) \
+                        or n == ticks:
+                    snapshot = self._snapshot()
+                    traced = sum(trace.size for trace in snapshot.traces) / (1024 * 1024)
+                    rss = rss_mb()
+                    self.samples.append({"tick": n, "traced_mb": round(traced, 3),
+                                         "rss_mb": None if rss is None else round(rss, 2)})
+                    if baseline is None and n >= min(self.warmup, ticks):
+                        baseline, baseline_rss = snapshot, rss
+                    last = snapshot
+                    if progress:
+                        progress(f"tick {n:>7}: traced {traced:.2f} MB, rss {rss if rss is None else round(rss, 1)} MB")
+        finally:
+            tracemalloc.stop()
+
+        tick_cpu = self._time_ticks(min(self.cpu_ticks, ticks))
+
+        growth_sites = []
+        if baseline is not None and last is not None and last is not baseline:
+            for stat in last.compare_to(baseline, "lineno")[:self.top_sites]:
+                if stat.size_diff <= 0:
+                    continue
+                frame = stat.traceback[0]
+                growth_sites.append({"site": f"{frame.filename}:{frame.lineno}",
+                                     "size_diff_kb": round(stat.size_diff / 1024, 1),
+                                     "count_diff": stat.count_diff})
+
+        first = next(s for s in self.samples if s["tick"] >= min(self.warmup, ticks))
+        final = self.samples[-1]
+        cpu_ms = [c * 1000 for c in tick_cpu]
+        mean_cpu_ms = sum(cpu_ms) / len(cpu_ms) if cpu_ms else 0.0
+        rss_growth = None
+        if baseline_rss is not None and final["rss_mb"] is not None:
+            rss_growth = round(final["rss_mb"] - baseline_rss, 2)
+        return {
+            "ticks": ticks,
+            "simulated_hours": round(ticks * Config.REFRESH_INTERVAL_MS / 3_600_000, 2),
+            "traced_mb_baseline": first["traced_mb"],
+            "traced_mb_final": final["traced_mb"],
+            "traced_growth_mb": round(final["traced_mb"] - first["traced_mb"], 3),
+            "rss_mb_final": final["rss_mb"],
+            "rss_growth_mb": rss_growth,
+            "cpu_ticks": len(cpu_ms),
+            "tick_cpu_ms_mean": round(mean_cpu_ms, 3),
+            "tick_cpu_ms_p95": round(_percentile(cpu_ms, 95), 3),
+            "tick_cpu_ms_max": round(max(cpu_ms, default=0.0), 3),
+            "cpu_pct": round(mean_cpu_ms / Config.REFRESH_INTERVAL_MS * 100, 3),
+            "growth_sites": growth_sites,
+            "samples": self.samples,
+        }
+
+
+def default_budgets() -> dict:
+    """Budgets from Config.SOAK_*."""
+    return {
+        "traced_growth_mb": Config.SOAK_MAX_TRACED_GROWTH_MB,
+        "rss_growth_mb": Config.SOAK_MAX_RSS_GROWTH_MB,
+        "cpu_pct": Config.SOAK_MAX_CPU_PCT,
+    }
+
+
+def main(argv=None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Soak-test the monitor refresh loop")
+    workload = parser.add_mutually_exclusive_group()
+    workload.add_argument("--source", type=Path, help="recorded transcript to replay in a loop")
+    workload.add_argument("--real", action="store_true", help="poll the real projects dir read-only")
+    parser.add_argument("--ticks", type=int, default=10000, help="refreshes to run (default: 10000)")
+    parser.add_argument("--lines-per-tick", type=int, default=3)
+    parser.add_argument("--rotate-lines", type=int, default=2000,
+                        help="lines per scratch session before starting a new one")
+    parser.add_argument("--sample-every", type=int, default=500, help="ticks between memory samples")
+    parser.add_argument("--warmup", type=int, default=200, help="ticks before the baseline sample")
+    parser.add_argument("--cpu-ticks", type=int, default=1000,
+                        help="untraced ticks timed after the memory phase (default: 1000)")
+    parser.add_argument("--max-traced-growth-mb", type=float, default=Config.SOAK_MAX_TRACED_GROWTH_MB)
+    parser.add_argument("--max-rss-growth-mb", type=float, default=Config.SOAK_MAX_RSS_GROWTH_MB)
+    parser.add_argument("--max-cpu-pct", type=float, default=Config.SOAK_MAX_CPU_PCT,
+                        help="mean tick CPU as a percentage of the refresh interval")
+    parser.add_argument("--gui", action="store_true", help="include a real OdometerWidget in each tick")
+    parser.add_argument("--scratch", type=Path, help="scratch directory (default: temporary)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.source is not None and not args.source.is_file():
+        print(f"Error: {args.source} not found", file=sys.stderr)
+        return 1
+
+    scratch = None
+    feeder = None
+    root = None
+    if not args.real:
+        scratch = args.scratch or Path(tempfile.mkdtemp(prefix="cc-soak-"))
+        use_scratch_dir(scratch)
+        feeder = TranscriptFeeder(Config.CLAUDE_PROJECTS_DIR / "-soak-project", args.source,
+                                  args.lines_per_tick, args.rotate_lines)
+
+    try:
+        monitor = UsageMonitor()
+        if args.gui:
+            import tkinter as tk
+            try:
+                from .ui_widget import OdometerWidget
+            except ImportError:
+                from ui_widget import OdometerWidget
+            root = tk.Tk()
+            widget = OdometerWidget(root, monitor)
+
+            def tick():
+                widget.update_display()
+                root.update()  # process pending redraws and events
+        else:
+            def tick():
+                monitor.poll()
+
+        runner = SoakRunner(tick, feeder.feed if feeder else None, args.sample_every, args.warmup,
+                            cpu_ticks=args.cpu_ticks)
+        report = runner.run(args.ticks, None if args.json else print)
+    finally:
+        if root is not None:
+            root.destroy()
+        if feeder is not None:
+            feeder.close()
+        if scratch is not None and args.scratch is None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    budgets = {"traced_growth_mb": args.max_traced_growth_mb,
+               "rss_growth_mb": args.max_rss_growth_mb,
+               "cpu_pct": args.max_cpu_pct}
+    violations = check_budgets(report, budgets)
+    report["budgets"] = budgets
+    report["violations"] = violations
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print()
+        for key, value in report.items():
+            if key not in ("samples", "growth_sites", "violations", "budgets"):
+                print(f"{key:22} {value}")
+        print("\nTop growing allocation sites:")
+        for site in report["growth_sites"]:
+            print(f"  +{site['size_diff_kb']:>8} KB  {site['count_diff']:>+7}  {site['site']}")
+        print()
+        print("\n".join(f"FAIL: {v}" for v in violations) or "PASS: within budgets")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,30 @@
 """Token calculation and percentage logic"""
+from array import array
+from bisect import bisect_right
+from typing import Optional, Sequence, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 try:
     from .config import Config
 except ImportError:
     from config import Config
 
 
+# Lower bounds (percent) of the warning, danger and critical color bands;
+# bucket i covers [COLOR_THRESHOLDS[i-1], COLOR_THRESHOLDS[i])
+COLOR_THRESHOLDS = (70.0, 90.0, 95.0)
+
+
+def color_buckets() -> list[str]:
+    """Colors for buckets 0-3 (safe, warning, danger, critical)."""
+    return [Config.COLOR_SAFE, Config.COLOR_WARNING, Config.COLOR_DANGER, Config.COLOR_CRITICAL]
+
+
 class TokenCalculator:
     """Handles token usage calculations and color determination"""
 
@@ -46,11 +66,11 @@ class TokenCalculator:
         Returns:
             Hex color code string
         """
-        if pct < 70:
+        if pct < COLOR_THRESHOLDS[0]:
             return Config.COLOR_SAFE
-        elif pct < 90:
+        elif pct < COLOR_THRESHOLDS[1]:
             return Config.COLOR_WARNING
-        elif pct < 95:
+        elif pct < COLOR_THRESHOLDS[2]:
             return Config.COLOR_DANGER
         else:
             return Config.COLOR_CRITICAL
@@ -88,3 +108,75 @@ class TokenCalculator:
             "compress_enabled": compress_enabled,
             "plan_limit": self.plan_limit,
         }
+
+    def get_usage_data_batch(
+        self,
+        tokens: Sequence[int],
+        limits: Optional[Union[int, Sequence[int]]] = None,
+        use_numpy: Optional[bool] = None,
+    ) -> dict:
+        """
+        Compute usage data for many samples in one call.
+
+        Results match calculate_usage(), get_color_for_percentage() and
+        should_enable_compress() element by element. NumPy is used when
+        available; otherwise the stdlib array/bisect fallback runs.
+
+        Args:
+            tokens: Token counts, one per sample
+            limits: Per-sample plan limits, a single limit, or None for
+                self.plan_limit
+            use_numpy: Force (True) or disable (False) the NumPy backend;
+                None picks it when installed
+
+        Returns:
+            Dictionary with keys:
+            - percentage: float sequence
+            - bucket: color bucket per sample (0=safe ... 3=critical)
+            - color: list of hex color codes
+            - compress_enabled: bool sequence
+            - crossings: list of (index, previous_bucket, bucket) for every
+              sample whose bucket differs from the sample before it
+        """
+        if limits is None:
+            limits = self.plan_limit
+        if use_numpy is None:
+            use_numpy = NUMPY_AVAILABLE
+        if use_numpy and not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy backend requested but numpy is not installed")
+
+        colors = color_buckets()
+
+        if use_numpy:
+            token_arr = np.asarray(tokens, dtype=np.float64)
+            limit_arr = np.broadcast_to(np.asarray(limits, dtype=np.float64), token_arr.shape)
+            pct = (token_arr / limit_arr) * 100
+            buckets = np.searchsorted(np.asarray(COLOR_THRESHOLDS), pct, side="right")
+            changed = np.flatnonzero(buckets[1:] != buckets[:-1]) + 1
+            return {
+                "percentage": pct,
+                "bucket": buckets,
+                "color": np.asarray(colors, dtype=object)[buckets].tolist(),
+                "compress_enabled": pct >= Config.COMPRESS_THRESHOLD,
+                "crossings": [(int(i), int(buckets[i - 1]), int(buckets[i])) for i in changed],
+            }
+
+        if isinstance(limits, (int, float)):
+            pct = array("d", ((t / limits) * 100 for t in tokens))
+        else:
+            if len(limits) != len(tokens):
+                raise ValueError("tokens and limits must have the same length")
+            pct = array("d", ((t / lim) * 100 for t, lim in zip(tokens, limits)))
+        buckets = array("b", (bisect_right(COLOR_THRESHOLDS, p) for p in pct))
+        threshold = Config.COMPRESS_THRESHOLD
+        return {
+            "percentage": pct,
+            "bucket": buckets,
+            "color": [colors[b] for b in buckets],
+            "compress_enabled": [p >= threshold for p in pct],
+            "crossings": [
+                (i, buckets[i - 1], buckets[i])
+                for i in range(1, len(buckets))
+                if buckets[i] != buckets[i - 1]
+            ],
+        }
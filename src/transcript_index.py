@@ -0,0 +1,671 @@
+"""Sidecar byte-offset index for Claude Code transcripts"""
+import hashlib
+import os
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+try:
+    from .config import Config
+    from .jsonl_scanner import LineScanner
+except ImportError:
+    from config import Config
+    from jsonl_scanner import LineScanner
+
+
+# Index file layout: MAGIC, one version byte, then a stream of records.
+# Every record starts with a varint tag. Offsets are delta-encoded against
+# the previous entry/boundary record so typical records take 4-6 bytes.
+# Records only take effect once a CHECKPOINT follows them, so a torn write
+# at the end of the file is simply ignored on load (and cut off by the next
+# writer). Updates append under a short-lived "<index>.lock" file and only
+# if the sidecar is still the size this process last saw; otherwise another
+# monitor has written it and its records are adopted instead. The file is
+# rewritten whole (temp file + rename) only when it is new, from an older
+# version, torn, or the transcript was rewritten.
+INDEX_MAGIC = b"CCIX"
+INDEX_VERSION = 4
+
+_TAG_CHECKPOINT = 1  # scanned_offset, byte length, utf-8 id of the last
+                     # main-thread message (length 0 = none)
+_TAG_ENTRY = 2       # offset delta, tokens, model id (0 = none), input,
+                     # cache read, cache write, continues previous message (0/1)
+_TAG_BOUNDARY = 3    # offset delta, pre-compaction tokens
+_TAG_MODEL = 4       # byte length, utf-8 model id; gets the next model id
+_TAG_SIDECHAIN = 5   # offset delta, tokens, model id, agent id (subagent entry)
+_TAG_AGENT = 6       # byte length, utf-8 agent id; gets the next agent id
+
+# Lines worth decoding while indexing
+_INDEX_NEEDLES = (b'"assistant"', b'"compact_boundary"')
+
+# Lock and temp files older than this were left behind by a dead writer
+_STALE_S = 30.0
+_LOCK_ATTEMPTS = 20
+_LOCK_WAIT_S = 0.005
+
+
+def encode_varint(value: int, out: bytearray):
+    """
+    Append an unsigned LEB128 varint to a buffer.
+
+    Args:
+        value: Non-negative integer
+        out: Buffer to append to
+    """
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    """
+    Decode an unsigned LEB128 varint.
+
+    Args:
+        buf: Encoded bytes
+        pos: Position of the first varint byte
+
+    Returns:
+        Tuple of (value, position after the varint)
+
+    Raises:
+        IndexError: If the buffer ends mid-varint
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def index_path_for(transcript_path: Path) -> Path:
+    """
+    Get the sidecar index location for a transcript.
+
+    Indexes live under Config.INDEX_DIR (never next to Claude Code's own
+    files), keyed by a hash of the transcript's absolute path.
+
+    Args:
+        transcript_path: Path to the session JSONL file
+
+    Returns:
+        Path to the index file
+    """
+    key = hashlib.sha1(str(Path(transcript_path).absolute()).encode("utf-8")).hexdigest()
+    return Config.INDEX_DIR / f"{key[:16]}.idx"
+
+
+class TranscriptIndex:
+    """
+    Incrementally maintained offsets of usage entries and compaction boundaries
+
+    The entry_* arrays hold the main thread only. Sidechain (subagent)
+    entries are kept as one stream per agent id (see sidechains()), so a
+    subagent's small context never shows up as the session's latest usage.
+    """
+
+    def __init__(self, transcript_path: Path, index_path: Optional[Path] = None):
+        """
+        Initialize index for one transcript.
+
+        Args:
+            transcript_path: Path to the session JSONL file
+            index_path: Sidecar file location (default: index_path_for())
+        """
+        self.transcript_path = Path(transcript_path)
+        self.index_path = index_path or index_path_for(self.transcript_path)
+        self._lock_path = self.index_path.with_name(self.index_path.name + ".lock")
+        self._loaded = False
+        # Sidecar size as last read or written; None while the sidecar does not
+        # hold this index's records, which are then all kept in _unwritten
+        self._file_size = None
+        self._reset()
+
+    def _reset(self):
+        """Drop all indexed state."""
+        self.scanned_offset = 0
+        self.entry_offsets = array("Q")
+        self.entry_tokens = array("Q")
+        self.entry_models = array("I")
+        # Input side of each entry, for prompt-cache statistics
+        self.entry_input = array("Q")
+        self.entry_cache_read = array("Q")
+        self.entry_cache_write = array("Q")
+        self.entry_continues = array("B")  # 1 = same message id as the previous entry
+        # Session totals with each message counted once
+        self.input_total = 0
+        self.cache_read_total = 0
+        self.cache_write_total = 0
+        self.boundary_offsets = array("Q")
+        self.boundary_pre_tokens = array("Q")
+        self.boundary_entry_index = array("Q")  # first entry after each boundary
+        self.models = [None]
+        self._model_ids = {}
+        # Inline sidechain (subagent) entries, one stream per agent id; they
+        # never affect the main-thread arrays above
+        self.agents = [None]
+        self._agent_ids = {}
+        self.sidechain_offsets = {}  # agent id -> array of entry offsets
+        self.sidechain_latest = {}   # agent id -> (tokens, model id)
+        self.usage_offsets = array("Q")  # every usage entry, main and sidechain
+        self._last_offset = 0
+        self._last_message_id = None
+        self._unwritten = bytearray()  # checkpointed records not yet in the sidecar
+
+    # -- Persistence -------------------------------------------------------
+
+    def load(self) -> bool:
+        """
+        Load committed records from the sidecar file.
+
+        Returns:
+            True if an index was loaded, False if starting from scratch
+        """
+        self._loaded = True
+        self._reset()
+        self._file_size = None
+        self._remove_stale_files()
+        try:
+            data = self.index_path.read_bytes()
+        except OSError:
+            return False
+        if data[:4] != INDEX_MAGIC or data[4:5] != bytes([INDEX_VERSION]):
+            return False
+
+        pending = []
+        pos = committed = 5
+        try:
+            while pos < len(data):
+                tag, pos = decode_varint(data, pos)
+                if tag == _TAG_CHECKPOINT:
+                    offset, pos = decode_varint(data, pos)
+                    length, pos = decode_varint(data, pos)
+                    if pos + length > len(data):
+                        break
+                    message_id = data[pos:pos + length].decode("utf-8", errors="replace")
+                    pos += length
+                    for record in pending:
+                        self._apply(*record)
+                    pending = []
+                    self.scanned_offset = offset
+                    self._last_message_id = message_id or None
+                    committed = pos
+                elif tag == _TAG_ENTRY:
+                    delta, pos = decode_varint(data, pos)
+                    tokens, pos = decode_varint(data, pos)
+                    fields = []
+                    for _ in range(5):  # model id, input, cache read, cache write, continues
+                        value, pos = decode_varint(data, pos)
+                        fields.append(value)
+                    pending.append((tag, delta, tokens, tuple(fields)))
+                elif tag == _TAG_BOUNDARY:
+                    delta, pos = decode_varint(data, pos)
+                    pre_tokens, pos = decode_varint(data, pos)
+                    pending.append((tag, delta, pre_tokens, 0))
+                elif tag == _TAG_SIDECHAIN:
+                    delta, pos = decode_varint(data, pos)
+                    tokens, pos = decode_varint(data, pos)
+                    model_id, pos = decode_varint(data, pos)
+                    agent_id, pos = decode_varint(data, pos)
+                    pending.append((tag, delta, tokens, (model_id, agent_id)))
+                elif tag in (_TAG_MODEL, _TAG_AGENT):
+                    length, pos = decode_varint(data, pos)
+                    if pos + length > len(data):
+                        break
+                    name = data[pos:pos + length].decode("utf-8", errors="replace")
+                    pos += length
+                    pending.append((tag, 0, 0, name))
+                else:
+                    break
+        except IndexError:
+            pass  # Torn trailing record; uncommitted records are dropped
+        if committed == len(data):
+            self._file_size = len(data)
+        else:
+            self._unwritten = bytearray(data[5:committed])
+            self._rewrite(expected_size=len(data))
+        return True
+
+    def _apply(self, tag: int, delta: int, value: int, extra):
+        """Apply one decoded record to the in-memory arrays."""
+        if tag == _TAG_MODEL:
+            self._model_ids[extra] = len(self.models)
+            self.models.append(extra)
+            return
+        if tag == _TAG_AGENT:
+            self._agent_ids[extra] = len(self.agents)
+            self.agents.append(extra)
+            return
+        offset = self._last_offset + delta
+        self._last_offset = offset
+        if tag == _TAG_SIDECHAIN:
+            model_id, agent_id = extra
+            self.sidechain_offsets.setdefault(agent_id, array("Q")).append(offset)
+            self.sidechain_latest[agent_id] = (value, model_id)
+            self.usage_offsets.append(offset)
+        elif tag == _TAG_ENTRY:
+            model_id, input_tokens, cache_read, cache_write, continues = extra
+            if continues and self.entry_offsets:
+                # Same message as the previous line: its usage is superseded
+                self.input_total -= self.entry_input[-1]
+                self.cache_read_total -= self.entry_cache_read[-1]
+                self.cache_write_total -= self.entry_cache_write[-1]
+            self.entry_offsets.append(offset)
+            self.entry_tokens.append(value)
+            self.entry_models.append(model_id)
+            self.entry_input.append(input_tokens)
+            self.entry_cache_read.append(cache_read)
+            self.entry_cache_write.append(cache_write)
+            self.entry_continues.append(1 if continues else 0)
+            self.usage_offsets.append(offset)
+            self.input_total += input_tokens
+            self.cache_read_total += cache_read
+            self.cache_write_total += cache_write
+        else:
+            self.boundary_offsets.append(offset)
+            self.boundary_pre_tokens.append(value)
+            self.boundary_entry_index.append(len(self.entry_offsets))
+
+    def _remove_stale_files(self):
+        """Delete temp and lock files a crashed writer left for this index."""
+        cutoff = time.time() - _STALE_S
+        try:
+            stale = list(self.index_path.parent.glob(f"{self.index_path.name}.*.tmp"))
+        except OSError:
+            return
+        for path in [*stale, self._lock_path]:
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def _acquire_lock(self) -> bool:
+        """Create the lock file, waiting briefly for another writer."""
+        for _ in range(_LOCK_ATTEMPTS):
+            try:
+                os.close(os.open(self._lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+                return True
+            except FileExistsError:
+                try:
+                    if self._lock_path.stat().st_mtime < time.time() - _STALE_S:
+                        self._lock_path.unlink()  # holder died mid-write
+                        continue
+                except OSError:
+                    continue
+                time.sleep(_LOCK_WAIT_S)
+            except OSError:
+                return False
+        return False
+
+    def _release_lock(self):
+        try:
+            self._lock_path.unlink()
+        except OSError:
+            pass
+
+    def _rewrite(self, expected_size: Optional[int] = None):
+        """
+        Replace the sidecar with a file holding every record (best effort).
+
+        Only valid while _file_size is None, i.e. _unwritten holds the whole
+        record stream; it is kept for the next attempt if this one fails.
+
+        Args:
+            expected_size: Only replace the sidecar if it still has this size
+        """
+        tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return
+        if not self._acquire_lock():
+            return
+        try:
+            if expected_size is not None and self.index_path.stat().st_size != expected_size:
+                return  # another writer got there first; retried on the next update
+            with open(tmp, "wb") as f:
+                f.write(INDEX_MAGIC + bytes([INDEX_VERSION]))
+                f.write(self._unwritten)
+            os.replace(tmp, self.index_path)
+            self._file_size = 5 + len(self._unwritten)
+            self._unwritten.clear()
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass  # Index stays valid in memory
+        finally:
+            self._release_lock()
+
+    def _append(self, records: bytearray) -> bool:
+        """
+        Append checkpointed records to the sidecar (best effort).
+
+        Records that cannot be written yet (lock busy) are kept and go out
+        with the next append.
+
+        Returns:
+            False if another writer changed the sidecar since this index last
+            read or wrote it (appending would corrupt the delta chain)
+        """
+        self._unwritten.extend(records)
+        if not self.index_path.exists():
+            # Removed (e.g. archived): do not resurrect a partial sidecar
+            self._unwritten.clear()
+            return True
+        if not self._acquire_lock():
+            return True
+        try:
+            with open(self.index_path, "ab") as f:
+                if os.fstat(f.fileno()).st_size != self._file_size:
+                    return False
+                f.write(self._unwritten)
+            self._file_size += len(self._unwritten)
+            self._unwritten.clear()
+        except OSError:
+            pass  # A partial write changes the size: the file is adopted next time
+        finally:
+            self._release_lock()
+        return True
+
+    # -- Incremental update ------------------------------------------------
+
+    def _model_id(self, model: Optional[str], records: bytearray) -> int:
+        """Get (registering if needed) the id of a model string."""
+        if not model:
+            return 0
+        model_id = self._model_ids.get(model)
+        if model_id is None:
+            encoded = model.encode("utf-8")
+            encode_varint(_TAG_MODEL, records)
+            encode_varint(len(encoded), records)
+            records.extend(encoded)
+            self._apply(_TAG_MODEL, 0, 0, model)
+            model_id = self._model_ids[model]
+        return model_id
+
+    def _agent_id(self, agent: str, records: bytearray) -> int:
+        """Get (registering if needed) the id of a sidechain agent string."""
+        agent_id = self._agent_ids.get(agent)
+        if agent_id is None:
+            encoded = agent.encode("utf-8")
+            encode_varint(_TAG_AGENT, records)
+            encode_varint(len(encoded), records)
+            records.extend(encoded)
+            self._apply(_TAG_AGENT, 0, 0, agent)
+            agent_id = self._agent_ids[agent]
+        return agent_id
+
+    def update(self, on_entry: Optional[Callable[[int, dict], None]] = None,
+               _adopted: bool = False) -> int:
+        """
+        Index any bytes appended to the transcript since the last update.
+
+        Args:
+            on_entry: Optional callback invoked as on_entry(offset, entry) for
+                every newly indexed assistant usage entry (sidechain entries
+                included)
+
+        Returns:
+            Number of new usage entries indexed
+        """
+        try:
+            from .data_reader import extract_usage_breakdown
+        except ImportError:
+            from data_reader import extract_usage_breakdown
+
+        if not self._loaded:
+            self.load()
+
+        try:
+            size = self.transcript_path.stat().st_size
+        except OSError:
+            return 0
+
+        truncate = False
+        if size < self.scanned_offset:
+            # Transcript was rewritten or replaced; rebuild from scratch
+            self._reset()
+            self._file_size = None
+            truncate = True
+        if size == self.scanned_offset and not truncate:
+            return 0
+
+        records = bytearray()
+        added = 0
+        scanner = LineScanner(needles=_INDEX_NEEDLES)
+        try:
+            with open(self.transcript_path, "rb") as f:
+                for offset, entry in scanner.scan(f, self.scanned_offset):
+                    if offset >= scanner.end_offset:
+                        break  # Line still being written
+
+                    if entry.get("type") == "system" and entry.get("subtype") == "compact_boundary":
+                        metadata = entry.get("compactMetadata") or {}
+                        pre_tokens = metadata.get("preTokens") or self.latest_tokens
+                        encode_varint(_TAG_BOUNDARY, records)
+                        encode_varint(offset - self._last_offset, records)
+                        encode_varint(pre_tokens, records)
+                        self._apply(_TAG_BOUNDARY, offset - self._last_offset, pre_tokens, 0)
+                        continue
+
+                    breakdown = extract_usage_breakdown(entry)
+                    tokens = sum(breakdown.values())
+                    if tokens <= 0:
+                        continue
+                    message = entry.get("message", {})
+                    if entry.get("isSidechain"):
+                        fields = (
+                            self._model_id(message.get("model"), records),
+                            self._agent_id(str(entry.get("agentId") or "sidechain"), records),
+                        )
+                        encode_varint(_TAG_SIDECHAIN, records)
+                        encode_varint(offset - self._last_offset, records)
+                        encode_varint(tokens, records)
+                        for value in fields:
+                            encode_varint(value, records)
+                        self._apply(_TAG_SIDECHAIN, offset - self._last_offset, tokens, fields)
+                        added += 1
+                        if on_entry is not None:
+                            on_entry(offset, entry)
+                        continue
+                    message_id = message.get("id")
+                    continues = message_id is not None and message_id == self._last_message_id
+                    self._last_message_id = message_id
+                    fields = (
+                        self._model_id(message.get("model"), records),
+                        breakdown["input"],
+                        breakdown["cache_read"],
+                        breakdown["cache_write_5m"] + breakdown["cache_write_1h"],
+                        int(continues),
+                    )
+                    encode_varint(_TAG_ENTRY, records)
+                    encode_varint(offset - self._last_offset, records)
+                    encode_varint(tokens, records)
+                    for value in fields:
+                        encode_varint(value, records)
+                    self._apply(_TAG_ENTRY, offset - self._last_offset, tokens, fields)
+                    added += 1
+                    if on_entry is not None:
+                        on_entry(offset, entry)
+        except OSError:
+            return added
+
+        if scanner.end_offset == self.scanned_offset and not records and not truncate:
+            return added
+        self.scanned_offset = scanner.end_offset
+        # The message id lets a message split across this checkpoint be
+        # recognised as continued after a reload
+        last_id = self._last_message_id
+        message_id = ("" if last_id is None else str(last_id)).encode("utf-8")
+        encode_varint(_TAG_CHECKPOINT, records)
+        encode_varint(self.scanned_offset, records)
+        encode_varint(len(message_id), records)
+        records.extend(message_id)
+        if self._file_size is None:
+            self._unwritten.extend(records)
+            self._rewrite()
+        elif not self._append(records) and not _adopted:
+            # Another monitor has written the sidecar since we read it:
+            # take over its records and index what it has not reached yet
+            self.load()
+            added += self.update(on_entry, _adopted=True)
+        return added
+
+    # -- Queries -----------------------------------------------------------
+
+    @property
+    def latest_tokens(self) -> int:
+        """Token count of the most recent main-thread usage entry (0 if none)."""
+        return self.entry_tokens[-1] if self.entry_tokens else 0
+
+    @property
+    def latest_model(self) -> Optional[str]:
+        """Model of the most recent main-thread usage entry that recorded one."""
+        for model_id in reversed(self.entry_models):
+            if model_id:
+                return self.models[model_id]
+        return None
+
+    @property
+    def latest_entry_offset(self) -> Optional[int]:
+        """Byte offset of the most recent main-thread usage entry."""
+        return self.entry_offsets[-1] if self.entry_offsets else None
+
+    @property
+    def latest_boundary_offset(self) -> Optional[int]:
+        """Byte offset of the most recent compaction boundary."""
+        return self.boundary_offsets[-1] if self.boundary_offsets else None
+
+    def sidechains(self) -> list[dict]:
+        """
+        Latest usage of each inline sidechain stream.
+
+        Returns:
+            Dicts with keys: agent, tokens, model, entries, latest_offset,
+            active (written after the main thread's latest entry); most
+            recently written first
+        """
+        main_offset = self.latest_entry_offset or 0
+        result = []
+        for agent_id, offsets in self.sidechain_offsets.items():
+            tokens, model_id = self.sidechain_latest[agent_id]
+            result.append({
+                "agent": self.agents[agent_id],
+                "tokens": tokens,
+                "model": self.models[model_id],
+                "entries": len(offsets),
+                "latest_offset": offsets[-1],
+                "active": offsets[-1] > main_offset,
+            })
+        result.sort(key=lambda stream: stream["latest_offset"], reverse=True)
+        return result
+
+    def cache_stats(self, window: int) -> dict:
+        """
+        Prompt-cache efficiency of the session.
+
+        The hit ratio is cache reads over all input-side tokens (uncached
+        input + cache reads + cache writes).
+
+        Args:
+            window: Number of most recent messages for the rolling ratio
+
+        Returns:
+            Dict with keys: hit_ratio (rolling, None before the first turn),
+            session_hit_ratio, cache_write_tokens, cache_read_tokens,
+            window_turns
+        """
+        read = prompt = turns = 0
+        i = len(self.entry_offsets) - 1
+        while i >= 0 and turns < window:
+            read += self.entry_cache_read[i]
+            prompt += self.entry_input[i] + self.entry_cache_read[i] + self.entry_cache_write[i]
+            turns += 1
+            # Skip the earlier lines of the same message
+            while i > 0 and self.entry_continues[i]:
+                i -= 1
+            i -= 1
+        session_prompt = self.input_total + self.cache_read_total + self.cache_write_total
+        return {
+            "hit_ratio": read / prompt if prompt else None,
+            "session_hit_ratio": self.cache_read_total / session_prompt if session_prompt else None,
+            "cache_write_tokens": self.cache_write_total,
+            "cache_read_tokens": self.cache_read_total,
+            "window_turns": turns,
+        }
+
+    def compactions(self) -> list[dict]:
+        """
+        Describe every compaction recorded in the transcript.
+
+        Returns:
+            List of dicts with keys: offset, pre_tokens, post_tokens, reclaimed
+            (post_tokens/reclaimed are None until the first turn after it)
+        """
+        result = []
+        for offset, pre_tokens, entry_index in zip(
+            self.boundary_offsets, self.boundary_pre_tokens, self.boundary_entry_index
+        ):
+            post_tokens = None
+            if entry_index < len(self.entry_tokens):
+                post_tokens = self.entry_tokens[entry_index]
+            result.append({
+                "offset": offset,
+                "pre_tokens": pre_tokens,
+                "post_tokens": post_tokens,
+                "reclaimed": None if post_tokens is None else max(pre_tokens - post_tokens, 0),
+            })
+        return result
+
+
+def read_entry_at(transcript_path: Path, offset: int) -> Optional[dict]:
+    """
+    Read the single transcript entry starting at a byte offset.
+
+    Args:
+        transcript_path: Path to the session JSONL file
+        offset: Line start offset, e.g. TranscriptIndex.latest_entry_offset
+
+    Returns:
+        Parsed entry, or None if unreadable
+    """
+    scanner = LineScanner()
+    try:
+        with open(transcript_path, "rb") as f:
+            for _, entry in scanner.scan(f, offset):
+                return entry
+    except OSError:
+        pass
+    return None
+
+
+# In-memory indexes, most recently used last
+_indexes: "OrderedDict[Path, TranscriptIndex]" = OrderedDict()
+
+
+def get_index(transcript_path: Path) -> TranscriptIndex:
+    """
+    Get the cached index for a transcript, loading it on first use.
+
+    Args:
+        transcript_path: Path to the session JSONL file
+
+    Returns:
+        TranscriptIndex (not yet updated)
+    """
+    path = Path(transcript_path)
+    index = _indexes.pop(path, None)
+    if index is None:
+        index = TranscriptIndex(path)
+    _indexes[path] = index
+    while len(_indexes) > Config.INDEX_CACHE_SIZE:
+        _indexes.popitem(last=False)
+    return index
@@ -0,0 +1,278 @@
+"""Full-screen terminal UI (curses) with cell-diff redraws
+
+Shows the same data as OdometerWidget for SSH sessions without a display.
+Frames are built as a grid of (character, style) cells; on every snapshot
+change only the runs of cells that differ from the previous frame are
+written, and nothing at all happens on ticks where the snapshot is unchanged.
+
+Keys: q quit, s toggle the live session list.
+"""
+import locale
+import sys
+import time
+from typing import Optional
+
+try:
+    import curses
+    CURSES_AVAILABLE = True
+except ImportError:  # Windows without windows-curses
+    CURSES_AVAILABLE = False
+
+try:
+    from .config import Config
+    from .usage_monitor import (
+        UsageMonitor, format_compactions, format_cache, cache_hit_low, format_subagents,
+    )
+except ImportError:
+    from config import Config
+    from usage_monitor import (
+        UsageMonitor, format_compactions, format_cache, cache_hit_low, format_subagents,
+    )
+
+
+# Snapshot color -> style name
+_COLOR_STYLES = {
+    Config.COLOR_SAFE: "safe",
+    Config.COLOR_WARNING: "warning",
+    Config.COLOR_DANGER: "danger",
+    Config.COLOR_CRITICAL: "critical",
+}
+
+
+def _bar_chars() -> tuple[str, str]:
+    """Filled/empty progress bar characters the terminal can display."""
+    encoding = (sys.stdout.encoding or "").lower()
+    return ("█", "·") if "utf" in encoding else ("#", "-")
+
+
+def build_frame(snapshot: dict, width: int, height: int,
+                show_sessions: bool = False, bar_chars: Optional[tuple] = None) -> list[list[tuple]]:
+    """
+    Lay out a snapshot as a grid of cells.
+
+    Args:
+        snapshot: Snapshot dict from UsageMonitor
+        width: Columns available
+        height: Rows available
+        show_sessions: Append the live session list
+        bar_chars: (filled, empty) progress bar characters
+
+    Returns:
+        height rows of width (character, style) cells
+    """
+    filled_char, empty_char = bar_chars or _bar_chars()
+    lines = []  # list of [(text, style), ...]
+
+    def add(*segments):
+        lines.append(list(segments))
+
+    add(("Context Monitor", "dim"))
+    if not snapshot["active"]:
+        add(("No active session", "dim"))
+        add(("", "normal"))
+        add(("--", "bold"))
+        add(("", "normal"))
+        add(("Waiting for Claude Code...", "dim"))
+    else:
+        style = _COLOR_STYLES.get(snapshot["color"], "normal")
+        pct = snapshot["percentage"]
+        add((f"Project: {snapshot['project']}", "dim"))
+        add(("", "normal"))
+        add((f"{pct:.1f}%", style + "_bold"))
+        bar_w = max(width - 2, 1)
+        fill = min(int(pct / 100 * bar_w), bar_w)
+        add((filled_char * fill, style), (empty_char * (bar_w - fill), "dim"))
+        add((f"{snapshot['tokens']:,} / {snapshot['plan_limit']:,} tokens", "normal"))
+        add((f"[{snapshot['model_name']}]", "dim"))
+        compactions = format_compactions(snapshot["compactions"])
+        if compactions:
+            add((compactions, "dim"))
+        cache = format_cache(snapshot["cache"])
+        if cache:
+            add((cache, "warning" if cache_hit_low(snapshot["cache"]) else "dim"))
+        subagents = format_subagents(snapshot["subagents"])
+        if subagents:
+            add((subagents, "dim"))
+        costs = snapshot["costs"]
+        if costs:
+            add((f"${costs['session']:.2f} session - ${costs['today']:.2f} today", "dim"))
+
+    if show_sessions:
+        add(("", "normal"))
+        add(("Live sessions", "bold"))
+        for session in snapshot["sessions"] or []:
+            session_style = "safe"
+            for threshold, name in ((95, "critical"), (90, "danger"), (70, "warning")):
+                if session["percentage"] >= threshold:
+                    session_style = name
+                    break
+            marker = "*" if session["session_path"] == snapshot["session_path"] else " "
+            add((f"{marker} {session['project'][:24]:<24} ", "normal"),
+                (f"{session['percentage']:5.1f}%", session_style),
+                (f"  {session['tokens']:>9,}", "dim"))
+        if not snapshot["sessions"]:
+            add(("  (none)", "dim"))
+
+    # Footer on the last row
+    footer = [("q quit  s sessions", "dim")]
+    body = lines[:max(height - 1, 0)]
+    body += [[("", "normal")]] * (height - 1 - len(body))
+    if height > 0:
+        body.append(footer)
+
+    frame = []
+    for segments in body:
+        row = []
+        for text, style in segments:
+            row.extend((ch, style) for ch in text)
+        row = row[:width]
+        row.extend([(" ", "normal")] * (width - len(row)))
+        frame.append(row)
+    return frame
+
+
+def diff_frames(previous: Optional[list], current: list) -> list[tuple[int, int, str, str]]:
+    """
+    Find the runs of cells that changed between two frames.
+
+    Args:
+        previous: Previous frame (None or a different size = redraw all)
+        current: New frame
+
+    Returns:
+        List of (row, column, text, style) runs to write
+    """
+    full = (previous is None or len(previous) != len(current)
+            or (current and len(previous[0]) != len(current[0])))
+    runs = []
+    for y, row in enumerate(current):
+        old = None if full else previous[y]
+        x = 0
+        width = len(row)
+        while x < width:
+            if old is not None and old[x] == row[x]:
+                x += 1
+                continue
+            # Start of a changed run: extend while changed and same style
+            style = row[x][1]
+            start = x
+            chars = []
+            while x < width and row[x][1] == style and (old is None or old[x] != row[x]):
+                chars.append(row[x][0])
+                x += 1
+            runs.append((y, start, "".join(chars), style))
+    return runs
+
+
+class TerminalUI:
+    """Curses front-end subscribed to a UsageMonitor"""
+
+    def __init__(self, stdscr, monitor: UsageMonitor):
+        self.stdscr = stdscr
+        self.monitor = monitor
+        self.show_sessions = monitor.track_sessions
+        self.frame = None
+        self.cells_written = 0
+        self._styles = self._init_styles()
+        monitor.subscribe(self.render)
+
+    def _init_styles(self) -> dict:
+        """Map style names to curses attributes."""
+        colors = {}
+        if curses.has_colors():
+            curses.start_color()
+            try:
+                curses.use_default_colors()
+                background = -1
+            except curses.error:
+                background = curses.COLOR_BLACK
+            for pair, (name, color) in enumerate((
+                ("safe", curses.COLOR_GREEN), ("warning", curses.COLOR_YELLOW),
+                ("danger", curses.COLOR_MAGENTA), ("critical", curses.COLOR_RED),
+            ), start=1):
+                curses.init_pair(pair, color, background)
+                colors[name] = curses.color_pair(pair)
+        styles = {"normal": curses.A_NORMAL, "dim": curses.A_DIM, "bold": curses.A_BOLD}
+        for name in ("safe", "warning", "danger", "critical"):
+            attr = colors.get(name, curses.A_NORMAL)
+            styles[name] = attr
+            styles[name + "_bold"] = attr | curses.A_BOLD
+        return styles
+
+    def render(self, snapshot: dict):
+        """Write the cells that changed since the last frame."""
+        height, width = self.stdscr.getmaxyx()
+        frame = build_frame(snapshot, width, height, self.show_sessions)
+        for y, x, text, style in diff_frames(self.frame, frame):
+            try:
+                self.stdscr.addstr(y, x, text, self._styles.get(style, curses.A_NORMAL))
+            except curses.error:
+                pass  # writing the bottom-right cell moves the cursor off-screen
+            self.cells_written += len(text)
+        self.frame = frame
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+
+    def toggle_sessions(self):
+        """Show or hide the live session list."""
+        self.show_sessions = not self.show_sessions
+        if self.show_sessions:
+            self.monitor.track_sessions = True  # left on: alert rules may rely on it
+            self.monitor.poll()
+        self.render(self.monitor.snapshot)
+
+    def run(self, before_poll=None):
+        """
+        Poll and handle keys until 'q'.
+
+        Args:
+            before_poll: Optional callable run before each poll (e.g. config reload)
+        """
+        curses.curs_set(0)
+        receiver = self.monitor.hook_receiver
+        # With hooks, wake often enough to handle a pushed event promptly
+        self.stdscr.timeout(Config.HOOK_CHECK_INTERVAL_MS if receiver else Config.REFRESH_INTERVAL_MS)
+        self.render(self.monitor.snapshot)
+        next_poll = 0.0
+        while True:
+            if time.monotonic() >= next_poll or (receiver is not None and receiver.pending):
+                if before_poll is not None:
+                    before_poll()
+                self.monitor.poll()
+                next_poll = time.monotonic() + Config.REFRESH_INTERVAL_MS / 1000
+            key = self.stdscr.getch()
+            if key in (ord("q"), ord("Q")):
+                return
+            if key in (ord("s"), ord("S")):
+                self.toggle_sessions()
+            elif key == curses.KEY_RESIZE:
+                self.frame = None
+                self.stdscr.erase()
+                self.render(self.monitor.snapshot)
+
+
+def run_tui(monitor: UsageMonitor, before_poll=None) -> int:
+    """
+    Run the terminal UI until the user quits.
+
+    Args:
+        monitor: Usage snapshot feed
+        before_poll: Optional callable run before each poll
+
+    Returns:
+        Exit code (1 if curses is unavailable)
+    """
+    if not CURSES_AVAILABLE:
+        print("Error: curses is not available (on Windows: pip install windows-curses)",
+              file=sys.stderr)
+        return 1
+    locale.setlocale(locale.LC_ALL, "")
+
+    def _main(stdscr):
+        TerminalUI(stdscr, monitor).run(before_poll)
+
+    try:
+        curses.wrapper(_main)
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -1,13 +1,23 @@
 """Odometer UI widget using tkinter"""
 import tkinter as tk
+from pathlib import Path
+from typing import Optional
 try:
-    from .config import Config, MODEL_INFO
-    from .data_reader import get_current_usage, extract_project_name
-    from .token_calculator import TokenCalculator
+    from .config import Config
+    from .usage_monitor import (
+        UsageMonitor, format_compactions, format_cache, cache_hit_low, format_subagents,
+    )
+    from .config_loader import get_reloader
+    from .discovery_roots import get_root_manager
+    from .heavy_turns import TurnScanner, TopTurns, format_turn
 except ImportError:
-    from config import Config, MODEL_INFO
-    from data_reader import get_current_usage, extract_project_name
-    from token_calculator import TokenCalculator
+    from config import Config
+    from usage_monitor import (
+        UsageMonitor, format_compactions, format_cache, cache_hit_low, format_subagents,
+    )
+    from config_loader import get_reloader
+    from discovery_roots import get_root_manager
+    from heavy_turns import TurnScanner, TopTurns, format_turn
 
 
 # Base sizes — the reference dimensions fonts were designed for
@@ -18,9 +28,9 @@ BASE_HEIGHT = 160
 class OdometerWidget:
     """Floating odometer widget displaying token usage"""
 
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, monitor: Optional[UsageMonitor] = None):
         self.root = root
-        self.calculator = TokenCalculator()
+        self.monitor = monitor or UsageMonitor()
 
         # Configure root window
         self.root.title("Context Monitor")
@@ -38,6 +48,11 @@ class OdometerWidget:
         self._last_height = Config.WINDOW_HEIGHT
         self.root.bind("<Configure>", self._on_resize)
 
+        # Debug view (right-click or F12)
+        self.debug_view = None
+        self.root.bind("<Button-3>", lambda _event: self.open_debug_view())
+        self.root.bind("<F12>", lambda _event: self.open_debug_view())
+
         # Create UI elements
         self._create_widgets()
 
@@ -68,6 +83,10 @@ class OdometerWidget:
         self.percentage_label.config(font=("Arial", max(int(36 * factor), 10), "bold"))
         self.token_label.config(font=("Arial", max(int(10 * factor), 6)))
         self.plan_label.config(font=("Arial", max(int(9 * factor), 6)))
+        self.compaction_label.config(font=("Arial", max(int(8 * factor), 6)))
+        self.cache_label.config(font=("Arial", max(int(8 * factor), 6)))
+        self.subagent_label.config(font=("Arial", max(int(8 * factor), 6)))
+        self.cost_label.config(font=("Arial", max(int(8 * factor), 6)))
         # Resize progress bar
         bar_w = w - 20
         bar_h = max(int(20 * factor), 8)
@@ -160,6 +179,45 @@ class OdometerWidget:
         )
         self.plan_label.pack(pady=(0, 5))
 
+        # Compaction history label (empty until the first /compact)
+        self.compaction_label = tk.Label(
+            self.root,
+            text="",
+            font=("Arial", 8),
+            bg=Config.BG_COLOR,
+            fg=Config.TEXT_SECONDARY,
+        )
+        self.compaction_label.pack()
+
+        # Prompt-cache label (rolling hit ratio and cache-write volume)
+        self.cache_label = tk.Label(
+            self.root,
+            text="",
+            font=("Arial", 8),
+            bg=Config.BG_COLOR,
+            fg=Config.TEXT_SECONDARY,
+        )
+        self.cache_label.pack()
+
+        # Subagent label (active subagents, when Config.SHOW_SUBAGENTS is set)
+        self.subagent_label = tk.Label(
+            self.root,
+            text="",
+            font=("Arial", 8),
+            bg=Config.BG_COLOR,
+            fg=Config.TEXT_SECONDARY,
+        )
+        self.subagent_label.pack()
+
+        # Cost label (only filled in when cost tracking is enabled)
+        self.cost_label = tk.Label(
+            self.root,
+            text="",
+            font=("Arial", 8),
+            bg=Config.BG_COLOR,
+            fg=Config.TEXT_SECONDARY,
+        )
+        self.cost_label.pack()
 
     def _on_drag_start(self, event):
         """Handle drag start event"""
@@ -172,32 +230,39 @@ class OdometerWidget:
         y = self.root.winfo_y() + (event.y - self._drag_data["y"])
         self.root.geometry(f"+{x}+{y}")
 
-    def update_display(self):
-        """Update display with current token usage"""
-        total_tokens, session_path, model_id = get_current_usage()
+    def open_debug_view(self):
+        """Open the debug view, or raise it if already open"""
+        if self.debug_view is not None and self.debug_view.window.winfo_exists():
+            self.debug_view.window.lift()
+            return
+        self.debug_view = DebugView(self.root, self.monitor)
 
-        if session_path is None:
+    def update_display(self):
+        """Poll for current token usage and redraw if anything changed"""
+        snapshot = self.monitor.poll()
+        if snapshot is not None:
+            self.render(snapshot)
+
+    def render(self, snapshot: dict):
+        """
+        Draw a usage snapshot.
+
+        Args:
+            snapshot: Snapshot dict from UsageMonitor
+        """
+        if not snapshot["active"]:
             self._show_no_session()
             return
 
-        # Update model info dynamically
-        if model_id and model_id in MODEL_INFO:
-            info = MODEL_INFO[model_id]
-            self.calculator.plan_limit = info["limit"]
-            self.plan_label.config(text=f"[{info['name']}]")
-        elif model_id:
-            self.plan_label.config(text=f"[{model_id}]")
+        # Update model info
+        self.plan_label.config(text=f"[{snapshot['model_name']}]")
 
-        # Extract and display project name
-        project_name = extract_project_name(session_path)
-        self.project_label.config(text=f"📁 {project_name}")
-
-        # Get usage data
-        usage_data = self.calculator.get_usage_data(total_tokens)
+        # Display project name
+        self.project_label.config(text=f"📁 {snapshot['project']}")
 
         # Update percentage label
-        pct = usage_data["percentage"]
-        color = usage_data["color"]
+        pct = snapshot["percentage"]
+        color = snapshot["color"]
         self.percentage_label.config(
             text=f"{pct:.1f}%",
             fg=color
@@ -217,13 +282,36 @@ class OdometerWidget:
         self.progress_canvas.itemconfig(self.progress_fg, fill=color)
 
         # Update token count label
-        tokens = usage_data["tokens"]
-        limit = usage_data["plan_limit"]
+        tokens = snapshot["tokens"]
+        limit = snapshot["plan_limit"]
         self.token_label.config(
             text=f"{tokens:,} / {limit:,} tokens",
             fg=Config.TEXT_COLOR
         )
 
+        # Update compaction history
+        self.compaction_label.config(text=format_compactions(snapshot["compactions"]))
+
+        # Update prompt-cache line (highlighted when the hit ratio is low)
+        cache = snapshot["cache"]
+        self.cache_label.config(
+            text=format_cache(cache),
+            fg=Config.COLOR_WARNING if cache_hit_low(cache) else Config.TEXT_SECONDARY,
+        )
+
+        # Update subagent line (main-thread usage above is never mixed with it)
+        self.subagent_label.config(text=format_subagents(snapshot["subagents"]))
+
+        # Update cost line
+        costs = snapshot["costs"]
+        if costs:
+            self.cost_label.config(
+                text=f"${costs['session']:.2f} session · ${costs['today']:.2f} today"
+            )
+        else:
+            # Cost tracking switched off (e.g. by a config reload)
+            self.cost_label.config(text="")
+
     def _show_no_session(self):
         """Show 'No active session' state"""
         self.project_label.config(text="No active session")
@@ -241,3 +329,77 @@ class OdometerWidget:
             fg=Config.TEXT_SECONDARY
         )
 
+        self.compaction_label.config(text="")
+        self.cache_label.config(text="")
+        self.subagent_label.config(text="")
+        self.cost_label.config(text="")
+
+
+
+class DebugView:
+    """Window showing the effective configuration and monitor state"""
+
+    def __init__(self, root: tk.Tk, monitor: UsageMonitor):
+        self.monitor = monitor
+        self.window = tk.Toplevel(root)
+        self.window.title("Context Monitor - Debug")
+        self.window.configure(bg=Config.BG_COLOR)
+        self.text = tk.Text(
+            self.window,
+            width=72,
+            height=30,
+            font=("Consolas", 9),
+            bg=Config.BG_COLOR,
+            fg=Config.TEXT_COLOR,
+            borderwidth=0,
+        )
+        self.text.pack(fill="both", expand=True, padx=5, pady=5)
+        self.turn_scanner = None
+        self.top_turns = None
+        self.refresh()
+
+    def describe(self) -> str:
+        """Text shown in the view"""
+        snapshot = self.monitor.snapshot
+        lines = [
+            get_reloader().format_effective_config(),
+            "",
+            "# monitor",
+            f"session_path = {snapshot['session_path']}",
+            f"model_id     = {snapshot['model_id']}",
+            f"tokens       = {snapshot['tokens']:,} / {snapshot['plan_limit']:,}",
+        ]
+        lines += self._heavy_turn_lines(snapshot["session_path"])
+        if Config.CLAUDE_PROJECTS_DIRS:
+            lines += ["", "# extra projects roots"]
+            lines += [scanner.describe() for scanner in get_root_manager().scanners.values()]
+        return "\n".join(lines)
+
+    def _heavy_turn_lines(self, session_path) -> list[str]:
+        """Largest context jumps of the active session, read incrementally"""
+        if session_path is None:
+            return []
+        session_path = Path(session_path)  # snapshots store it as a string
+        if self.turn_scanner is None or self.turn_scanner.path != session_path:
+            self.turn_scanner = TurnScanner(session_path)
+            self.top_turns = TopTurns()
+        try:
+            self.turn_scanner.feed(self.top_turns.add)
+        except OSError:
+            pass
+        lines = ["", "# heaviest turns (delta, context, after tool, timestamp, offset)"]
+        turns = self.top_turns.results([self.turn_scanner.peek()])
+        lines += [format_turn(turn) for turn in turns] or ["(none yet)"]
+        return lines
+
+    def refresh(self):
+        """Redraw, then reschedule while the window is open"""
+        if not self.window.winfo_exists():
+            return
+        text = self.describe()
+        if text != self.text.get("1.0", "end-1c"):
+            self.text.config(state="normal")
+            self.text.delete("1.0", "end")
+            self.text.insert("1.0", text)
+            self.text.config(state="disabled")
+        self.window.after(Config.REFRESH_INTERVAL_MS, self.refresh)
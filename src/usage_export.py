@@ -0,0 +1,330 @@
+"""Streaming columnar export of per-turn usage records
+
+Usage:
+    python src/usage_export.py -o usage.parquet [--since 2026-01-01|7d] [--project NAME]
+                               [--format auto|parquet|arrow|csv] [--chunk-rows N]
+
+Records are gathered into typed, array-backed column chunks of --chunk-rows
+rows and written out chunk by chunk, so memory is bounded by the chunk size
+rather than the number of transcripts. Parquet/Arrow IPC output needs
+pyarrow (pip install -r requirements-export.txt); without it (or with
+--format csv) chunked CSV is written.
+"""
+import argparse
+import csv
+import gzip
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from .data_reader import (
+        iter_all_session_paths, extract_usage_breakdown, extract_tokens_from_entry,
+    )
+    from .jsonl_scanner import LineScanner, open_transcript, transcript_stem
+    from .project_catalog import get_catalog
+except ImportError:
+    from data_reader import (
+        iter_all_session_paths, extract_usage_breakdown, extract_tokens_from_entry,
+    )
+    from jsonl_scanner import LineScanner, open_transcript, transcript_stem
+    from project_catalog import get_catalog
+
+
+DEFAULT_CHUNK_ROWS = 65536
+
+# (column name, array typecode); typecode None = dictionary-encoded string
+COLUMNS = (
+    ("timestamp_ms", "q"),
+    ("project", None),
+    ("session", None),
+    ("model", None),
+    ("offset", "q"),
+    ("input", "q"),
+    ("output", "q"),
+    ("cache_read", "q"),
+    ("cache_write_5m", "q"),
+    ("cache_write_1h", "q"),
+    ("total", "q"),
+)
+
+
+def parse_since(value: str) -> float:
+    """
+    Parse a --since value.
+
+    Args:
+        value: ISO date/datetime, or a relative age such as "7d" or "12h"
+
+    Returns:
+        Epoch seconds
+
+    Raises:
+        argparse.ArgumentTypeError: If the value cannot be parsed
+    """
+    units = {"d": "days", "h": "hours", "m": "minutes"}
+    if value[-1:] in units and value[:-1].isdigit():
+        return time.time() - timedelta(**{units[value[-1]]: int(value[:-1])}).total_seconds()
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid --since value: {value!r}")
+
+
+def _timestamp_ms(entry: dict) -> int:
+    """Entry timestamp as epoch milliseconds (0 if missing)."""
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, str):
+        try:
+            return int(datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp() * 1000)
+        except ValueError:
+            pass
+    return 0
+
+
+def iter_usage_records(since: Optional[float] = None,
+                       project: Optional[str] = None) -> Iterator[tuple]:
+    """
+    Stream one usage record per assistant turn across all transcripts of
+    every configured projects root, archived (compressed) ones included.
+
+    Claude Code writes one line per content block with the same message id;
+    only the last line of each message (which carries the final usage) is
+    emitted.
+
+    Args:
+        since: Epoch seconds; older files and records are skipped
+        project: Project filter (see iter_session_files)
+
+    Yields:
+        Tuples ordered like COLUMNS
+    """
+    since_ms = int(since * 1000) if since is not None else None
+    catalog = get_catalog()
+    for path in iter_all_session_paths(since, project, include_archived=True):
+        project_name = catalog.project_name(path)
+        session = transcript_stem(path)
+        pending = None
+        pending_id = None
+        scanner = LineScanner(needles=(b'"assistant"',))
+        try:
+            with open_transcript(path) as f:
+                for offset, entry in scanner.scan(f):
+                    total = extract_tokens_from_entry(entry)
+                    if total <= 0:
+                        continue
+                    message = entry.get("message", {})
+                    message_id = message.get("id")
+                    if pending is not None and (message_id is None or message_id != pending_id):
+                        yield pending
+                    timestamp_ms = _timestamp_ms(entry)
+                    if since_ms is not None and timestamp_ms and timestamp_ms < since_ms:
+                        pending = None
+                        continue
+                    b = extract_usage_breakdown(entry)
+                    pending = (timestamp_ms, project_name, session, message.get("model") or "",
+                               offset, b["input"], b["output"], b["cache_read"],
+                               b["cache_write_5m"], b["cache_write_1h"], total)
+                    pending_id = message_id
+        except OSError:
+            continue
+        if pending is not None:
+            yield pending
+
+
+class ColumnChunk:
+    """
+    A bounded batch of records stored column-wise in typed arrays
+
+    String dictionaries only ever grow: clear() keeps them, so every chunk's
+    dictionary extends the previous one and an Arrow IPC file can carry it
+    as deltas instead of (unsupported) replacements. They hold one entry per
+    distinct project, session and model.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.dictionaries = {name: [] for name, typecode in COLUMNS if typecode is None}
+        self._codes = {name: {} for name in self.dictionaries}
+        self.clear()
+
+    def clear(self):
+        """Drop all rows (dictionaries are kept)."""
+        for name, typecode in COLUMNS:
+            self.columns[name] = array(typecode or "I")
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp_ms"])
+
+    def append(self, record: tuple):
+        """Append one record ordered like COLUMNS."""
+        for (name, typecode), value in zip(COLUMNS, record):
+            if typecode is None:
+                codes = self._codes[name]
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(self.dictionaries[name])
+                    self.dictionaries[name].append(value)
+                value = code
+            self.columns[name].append(value)
+
+    def column_values(self, name: str) -> list:
+        """Decoded values of one column."""
+        if name in self.dictionaries:
+            dictionary = self.dictionaries[name]
+            return [dictionary[code] for code in self.columns[name]]
+        return self.columns[name].tolist()
+
+
+class CsvChunkWriter:
+    """Writes chunks to a CSV file (gzip-compressed if the name ends in .gz)"""
+
+    def __init__(self, path: Path):
+        opener = gzip.open if path.suffix == ".gz" else open
+        self._file = opener(path, "wt", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, _ in COLUMNS])
+
+    def write_chunk(self, chunk: ColumnChunk):
+        columns = [chunk.column_values(name) for name, _ in COLUMNS]
+        self._writer.writerows(zip(*columns))
+
+    def close(self):
+        self._file.close()
+
+
+class ArrowChunkWriter:
+    """Writes chunks as Arrow record batches to a Parquet or Arrow IPC file"""
+
+    def __init__(self, path: Path, parquet: bool):
+        fields = []
+        for name, typecode in COLUMNS:
+            arrow_type = pa.dictionary(pa.int32(), pa.string()) if typecode is None else pa.int64()
+            fields.append(pa.field(name, arrow_type))
+        self.schema = pa.schema(fields)
+        if parquet:
+            self._writer = pq.ParquetWriter(str(path), self.schema)
+        else:
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(str(path), self.schema, options=options)
+        self._parquet = parquet
+
+    def write_chunk(self, chunk: ColumnChunk):
+        arrays = []
+        n = len(chunk)
+        for name, typecode in COLUMNS:
+            column = chunk.columns[name]
+            if typecode is None:
+                indices = pa.array(column, type=pa.int32())
+                arrays.append(pa.DictionaryArray.from_arrays(indices, chunk.dictionaries[name]))
+            else:
+                # Zero-copy view of the array's buffer
+                arrays.append(pa.Array.from_buffers(pa.int64(), n, [None, pa.py_buffer(column)]))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        if self._parquet:
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+
+def resolve_format(fmt: str, output: Path) -> str:
+    """
+    Pick the output format.
+
+    Args:
+        fmt: Requested format (auto, parquet, arrow or csv)
+        output: Output path (its suffix guides 'auto')
+
+    Returns:
+        One of parquet, arrow, csv
+
+    Raises:
+        RuntimeError: If a pyarrow format is requested without pyarrow
+    """
+    if fmt == "auto":
+        if not PYARROW_AVAILABLE or output.suffix in (".csv", ".gz"):
+            return "csv"
+        return "arrow" if output.suffix in (".arrow", ".feather", ".ipc") else "parquet"
+    if fmt in ("parquet", "arrow") and not PYARROW_AVAILABLE:
+        raise RuntimeError(f"--format {fmt} requires pyarrow (pip install -r requirements-export.txt)")
+    return fmt
+
+
+def export_usage(output: Path, fmt: str = "auto", since: Optional[float] = None,
+                 project: Optional[str] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """
+    Export usage records to a columnar file.
+
+    Args:
+        output: Output file path
+        fmt: auto, parquet, arrow or csv
+        since: Epoch seconds filter
+        project: Project filter
+        chunk_rows: Rows per column chunk (bounds memory)
+
+    Returns:
+        Number of records written
+
+    Raises:
+        RuntimeError: If a pyarrow format is requested without pyarrow
+        OSError: On I/O errors (a partial output file is removed)
+    """
+    fmt = resolve_format(fmt, output)
+    writer = CsvChunkWriter(output) if fmt == "csv" else ArrowChunkWriter(output, fmt == "parquet")
+    chunk = ColumnChunk()
+    written = 0
+    try:
+        try:
+            for record in iter_usage_records(since, project):
+                chunk.append(record)
+                if len(chunk) >= chunk_rows:
+                    writer.write_chunk(chunk)
+                    written += len(chunk)
+                    chunk.clear()
+            if len(chunk):
+                writer.write_chunk(chunk)
+                written += len(chunk)
+        finally:
+            writer.close()
+    except BaseException:
+        output.unlink(missing_ok=True)
+        raise
+    return written
+
+
+def main(argv=None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Export per-turn usage records")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="output file")
+    parser.add_argument("--format", default="auto", choices=("auto", "parquet", "arrow", "csv"))
+    parser.add_argument("--since", type=parse_since, help="ISO date/datetime or age such as 7d")
+    parser.add_argument("--project", help="project name or path to include")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"rows per column chunk (default: {DEFAULT_CHUNK_ROWS})")
+    args = parser.parse_args(argv)
+
+    try:
+        count = export_usage(args.output, args.format, args.since, args.project, args.chunk_rows)
+    except (RuntimeError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Exported {count:,} usage records to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""Usage snapshot feed shared by the widget and headless front-ends"""
+import time
+from pathlib import Path
+from typing import Callable, Optional
+try:
+    from .config import Config, MODEL_INFO
+    from .data_reader import (
+        find_active_session, extract_project_name, get_compaction_history,
+        get_cache_stats, get_live_sessions, get_subagents, read_session_tokens,
+    )
+    from .transcript_index import TranscriptIndex, get_index
+    from .token_calculator import TokenCalculator
+    from .cost_ledger import get_session_costs
+except ImportError:
+    from config import Config, MODEL_INFO
+    from data_reader import (
+        find_active_session, extract_project_name, get_compaction_history,
+        get_cache_stats, get_live_sessions, get_subagents, read_session_tokens,
+    )
+    from transcript_index import TranscriptIndex, get_index
+    from token_calculator import TokenCalculator
+    from cost_ledger import get_session_costs
+
+
+def empty_snapshot() -> dict:
+    """Snapshot describing the 'no active session' state."""
+    return {
+        "active": False,
+        "session_path": None,
+        "project": None,
+        "model_id": None,
+        "model_name": None,
+        "tokens": 0,
+        "percentage": 0.0,
+        "color": Config.COLOR_INACTIVE,
+        "compress_enabled": False,
+        "plan_limit": Config.PLAN_LIMIT,
+        "compactions": [],
+        "cache": None,
+        "costs": None,
+        "sessions": [],
+        "subagents": [],
+    }
+
+
+class UsageMonitor:
+    """
+    Polls the data layer and publishes a usage snapshot.
+
+    A snapshot is a plain dict (see empty_snapshot() for the keys).
+    Subscribers are only called when the snapshot differs from the previous
+    one, so front-ends do no work on idle ticks.
+
+    With a hook receiver attached, the transcript named by the latest hook
+    event is read directly ("pinned") for Config.HOOK_PIN_TTL_S after that
+    event, and the mtime-based discovery pass drops to once every
+    Config.HOOK_DISCOVERY_INTERVAL_S.
+    """
+
+    def __init__(self, track_sessions: Optional[bool] = None):
+        """
+        Initialize monitor.
+
+        Args:
+            track_sessions: Include every live session in snapshots
+                (default: Config.TRACK_LIVE_SESSIONS)
+        """
+        self.calculator = TokenCalculator()
+        self.snapshot = empty_snapshot()
+        self.track_sessions = Config.TRACK_LIVE_SESSIONS if track_sessions is None else track_sessions
+        self._subscribers = []
+        self._model_name = Config.PLAN_NAME
+        self.hook_receiver = None  # HookReceiver, set by the front-end
+        self.pinned_session = None
+        self._pinned_at = 0.0
+        self._next_discovery = 0.0
+
+    def subscribe(self, callback: Callable[[dict], None]):
+        """
+        Register a callback invoked with every changed snapshot.
+
+        Args:
+            callback: Function taking the new snapshot dict
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[dict], None]):
+        """Remove a previously registered callback."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def build_snapshot(self) -> dict:
+        """
+        Read current usage and build a snapshot without publishing it.
+
+        The session's index is updated once and shared by every reader.
+
+        Returns:
+            Snapshot dict
+        """
+        session_path = self._pinned_path() or find_active_session()
+        if session_path is None:
+            return empty_snapshot()
+        index = get_index(session_path)
+        index.update()
+        total_tokens, model_id = read_session_tokens(session_path, index)
+
+        # Update model info dynamically (an unknown model keeps the last limit)
+        if model_id and model_id in MODEL_INFO:
+            info = MODEL_INFO[model_id]
+            self.calculator.plan_limit = info["limit"]
+            self._model_name = info["name"]
+        elif model_id:
+            self._model_name = model_id
+
+        snapshot = self.calculator.get_usage_data(total_tokens)
+        snapshot.update({
+            "active": True,
+            "session_path": str(session_path),
+            "project": extract_project_name(session_path),
+            "model_id": model_id,
+            "model_name": self._model_name,
+            "compactions": get_compaction_history(session_path, index),
+            "cache": get_cache_stats(session_path, index),
+            "costs": (get_session_costs(session_path, get_live_sessions(), index)
+                      if Config.COST_TRACKING_ENABLED else None),
+            "sessions": self._live_sessions(session_path, index) if self.track_sessions else [],
+            "subagents": self._subagents(session_path, index) if Config.SHOW_SUBAGENTS else [],
+        })
+        return snapshot
+
+    def push(self, event: dict):
+        """
+        Pin the session named by a hook event.
+
+        Args:
+            event: Event from HookReceiver.take()
+        """
+        self.pinned_session = event["transcript_path"]
+        self._pinned_at = event.get("received_at", time.monotonic())
+
+    def _pinned_path(self) -> Optional[Path]:
+        """Pinned session if still valid, running discovery only when it is due."""
+        now = time.monotonic()
+        path = self.pinned_session
+        if path is not None and now - self._pinned_at < Config.HOOK_PIN_TTL_S and path.is_file():
+            if now >= self._next_discovery:
+                find_active_session()  # keeps the catalog and live sessions current
+                self._next_discovery = now + Config.HOOK_DISCOVERY_INTERVAL_S
+            return path
+        self.pinned_session = None
+        return None
+
+    def _live_sessions(self, session_path: Path, index: TranscriptIndex) -> list[dict]:
+        """Summaries of every live session, most recently active first."""
+        sessions = []
+        for path in get_live_sessions():
+            tokens, model_id = read_session_tokens(path, index if path == session_path else None)
+            limit = MODEL_INFO.get(model_id, {}).get("limit", Config.PLAN_LIMIT)
+            sessions.append({
+                "session_path": str(path),
+                "project": extract_project_name(path),
+                "model_id": model_id,
+                "tokens": tokens,
+                "percentage": (tokens / limit) * 100,
+            })
+        return sessions
+
+    def _subagents(self, session_path: Path, index: TranscriptIndex) -> list[dict]:
+        """Summaries of the session's active subagents (see get_subagents())."""
+        subagents = []
+        for subagent in get_subagents(session_path, index):
+            limit = MODEL_INFO.get(subagent["model_id"], {}).get("limit", Config.PLAN_LIMIT)
+            subagents.append(dict(subagent, percentage=(subagent["tokens"] / limit) * 100))
+        return subagents
+
+    def poll(self) -> Optional[dict]:
+        """
+        Refresh the snapshot and notify subscribers if it changed.
+
+        Returns:
+            The new snapshot if it changed, otherwise None
+        """
+        if self.hook_receiver is not None:
+            event = self.hook_receiver.take()
+            if event is not None:
+                self.push(event)
+        snapshot = self.build_snapshot()
+        if snapshot == self.snapshot:
+            return None
+        self.snapshot = snapshot
+        for callback in list(self._subscribers):
+            callback(snapshot)
+        return snapshot
+
+
+def format_compactions(compactions: list[dict]) -> str:
+    """
+    Format compaction history for the compaction label.
+
+    Args:
+        compactions: List from TranscriptIndex.compactions()
+
+    Returns:
+        e.g. "2 compactions: -118k, -96k" (empty string if none)
+    """
+    if not compactions:
+        return ""
+    reclaimed = [
+        "..." if c["reclaimed"] is None else f"-{c['reclaimed'] / 1000:.0f}k"
+        for c in compactions[-3:]
+    ]
+    noun = "compaction" if len(compactions) == 1 else "compactions"
+    return f"{len(compactions)} {noun}: {', '.join(reclaimed)}"
+
+
+def format_cache(cache: Optional[dict]) -> str:
+    """
+    Format prompt-cache statistics for the cache label.
+
+    Args:
+        cache: Dict from TranscriptIndex.cache_stats() (or None)
+
+    Returns:
+        e.g. "cache 94% hit, 1.2M written" (empty string before the first turn)
+    """
+    if not cache or cache["hit_ratio"] is None:
+        return ""
+    written = cache["cache_write_tokens"]
+    volume = f"{written / 1e6:.1f}M" if written >= 1e6 else f"{written / 1e3:.0f}k"
+    return f"cache {cache['hit_ratio'] * 100:.0f}% hit, {volume} written"
+
+
+def cache_hit_low(cache: Optional[dict]) -> bool:
+    """Whether the rolling hit ratio is below Config.CACHE_HIT_WARN_PCT."""
+    return bool(cache) and cache["hit_ratio"] is not None and cache["hit_ratio"] * 100 < Config.CACHE_HIT_WARN_PCT
+
+
+def format_subagents(subagents: list[dict]) -> str:
+    """
+    Format active subagents for the subagent label.
+
+    Args:
+        subagents: Snapshot "subagents" list
+
+    Returns:
+        e.g. "2 subagents: 31k, 12k" (empty string if none)
+    """
+    if not subagents:
+        return ""
+    sizes = [f"{s['tokens'] / 1000:.0f}k" for s in subagents[:3]]
+    if len(subagents) > 3:
+        sizes.append("...")
+    noun = "subagent" if len(subagents) == 1 else "subagents"
+    return f"{len(subagents)} {noun}: {', '.join(sizes)}"
+
+
+def format_snapshot(snapshot: dict) -> str:
+    """
+    Format a snapshot as a single status line for headless output.
+
+    Args:
+        snapshot: Snapshot dict
+
+    Returns:
+        e.g. "my-app  42.3%  84,600 / 200,000 tokens  [Opus 4.6]"
+    """
+    if not snapshot["active"]:
+        return "No active session"
+    line = (
+        f"{snapshot['project']}  {snapshot['percentage']:.1f}%  "
+        f"{snapshot['tokens']:,} / {snapshot['plan_limit']:,} tokens  "
+        f"[{snapshot['model_name']}]"
+    )
+    if snapshot["compactions"]:
+        line += f"  compactions={len(snapshot['compactions'])}"
+    cache = snapshot["cache"]
+    if cache and cache["hit_ratio"] is not None:
+        line += f"  cache={cache['hit_ratio'] * 100:.0f}% write={cache['cache_write_tokens']:,}"
+    if snapshot["subagents"]:
+        line += f"  subagents={len(snapshot['subagents'])}"
+    if snapshot["costs"]:
+        line += f"  ${snapshot['costs']['session']:.2f}"
+    return line
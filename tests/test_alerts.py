@@ -0,0 +1,164 @@
+"""Unit tests for alerts module"""
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from alerts import AlertEngine, BurnRateRule, ThresholdRule, WebhookSink, build_rules, is_local_url
+from usage_monitor import empty_snapshot
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _snapshot(percentage: float, tokens: int = 0, path: str = "/p/s1.jsonl") -> dict:
+    snapshot = empty_snapshot()
+    snapshot.update({"active": True, "session_path": path, "project": "app",
+                     "percentage": percentage, "tokens": tokens})
+    return snapshot
+
+
+def test_threshold_hysteresis():
+    """Test that a threshold fires once while usage hovers around it"""
+    clock = FakeClock()
+    fired = []
+    engine = AlertEngine([ThresholdRule([80], hysteresis=3.0)], [fired.append],
+                         cooldown_s=0, clock=clock)
+
+    for pct in (79.0, 80.5, 79.5, 80.2, 78.0, 81.0):
+        engine.evaluate(_snapshot(pct))
+    assert len(fired) == 1, f"Expected 1 alert, got {len(fired)}"
+
+    engine.evaluate(_snapshot(76.0))  # below 80 - 3: re-armed
+    engine.evaluate(_snapshot(82.0))
+    assert len(fired) == 2, f"Expected 2 alerts, got {len(fired)}"
+    print("[PASS] test_threshold_hysteresis passed")
+
+
+def test_cooldown_suppresses_repeats():
+    """Test that the same alert key is suppressed during the cooldown"""
+    clock = FakeClock()
+    fired = []
+    engine = AlertEngine([ThresholdRule([80], hysteresis=3.0)], [fired.append],
+                         cooldown_s=300, clock=clock)
+
+    engine.evaluate(_snapshot(85.0))
+    engine.evaluate(_snapshot(70.0))
+    engine.evaluate(_snapshot(85.0))
+    assert len(fired) == 1, "Re-armed alert should be held back by the cooldown"
+
+    clock.now += 301
+    engine.evaluate(_snapshot(70.0))
+    engine.evaluate(_snapshot(85.0))
+    assert len(fired) == 2
+    print("[PASS] test_cooldown_suppresses_repeats passed")
+
+
+def test_any_session_rule_watches_all_sessions():
+    """Test that any_session rules evaluate each live session separately"""
+    engine = AlertEngine([ThresholdRule([90], any_session=True)], [], cooldown_s=0)
+    snapshot = _snapshot(10.0)
+    snapshot["sessions"] = [
+        {"session_path": "/p/a.jsonl", "project": "a", "tokens": 1, "percentage": 95.0},
+        {"session_path": "/p/b.jsonl", "project": "b", "tokens": 1, "percentage": 50.0},
+    ]
+    alerts = engine.evaluate(snapshot)
+    assert [a["key"] for a in alerts] == ["threshold:any:/p/a.jsonl:90"], alerts
+    assert engine.needs_all_sessions
+    print("[PASS] test_any_session_rule_watches_all_sessions passed")
+
+
+def test_burn_rate():
+    """Test burn rate detection over the measurement window"""
+    clock = FakeClock()
+    engine = AlertEngine([BurnRateRule(10000, window_s=60, hysteresis=10.0)], [],
+                         cooldown_s=0, clock=clock)
+
+    assert engine.evaluate(_snapshot(1.0, tokens=0)) == []
+    clock.now += 30
+    alerts = engine.evaluate(_snapshot(5.0, tokens=6000))  # 12,000 tokens/min
+    assert len(alerts) == 1 and alerts[0]["key"].startswith("burn_rate:")
+
+    clock.now += 30
+    assert engine.evaluate(_snapshot(6.0, tokens=10000)) == []  # still disarmed
+    print("[PASS] test_burn_rate passed")
+
+
+def test_ended_sessions_forgotten():
+    """Test that rule and cooldown state of sessions no longer live is dropped"""
+    clock = FakeClock()
+    threshold = ThresholdRule([90], any_session=True)
+    burn = BurnRateRule(10000, window_s=60)
+    engine = AlertEngine([threshold, burn], [], cooldown_s=300, clock=clock)
+
+    snapshot = _snapshot(10.0, path="/p/a.jsonl")
+    snapshot["sessions"] = [
+        {"session_path": "/p/a.jsonl", "project": "a", "tokens": 1, "percentage": 95.0},
+        {"session_path": "/p/b.jsonl", "project": "b", "tokens": 1, "percentage": 96.0},
+    ]
+    assert len(engine.evaluate(snapshot)) == 2
+    assert len(threshold._fired) == 2 and len(engine._last_fired) == 2
+
+    clock.now += 10
+    snapshot = _snapshot(10.0, path="/p/c.jsonl")
+    snapshot["sessions"] = [
+        {"session_path": "/p/c.jsonl", "project": "c", "tokens": 1, "percentage": 20.0},
+    ]
+    engine.evaluate(snapshot)
+    assert threshold._fired == set(), threshold._fired
+    assert engine._last_fired == {}, engine._last_fired
+    assert burn._session == "/p/c.jsonl" and len(burn._samples) == 1
+
+    engine.evaluate(empty_snapshot())
+    assert burn._session is None and not burn._samples
+    print("[PASS] test_ended_sessions_forgotten passed")
+
+
+def test_rule_and_webhook_validation():
+    """Test that invalid rules and non-local webhooks are rejected"""
+    assert len(build_rules([{"type": "percentage", "thresholds": [80]}])) == 1
+    for spec in ({"type": "bogus"}, {"type": "percentage", "thresholds": []},
+                 {"type": "burn_rate", "tokens_per_min": -1}):
+        try:
+            build_rules([spec])
+            raise AssertionError(f"Expected ValueError for {spec}")
+        except ValueError:
+            pass
+
+    assert is_local_url("http://127.0.0.1:8765/hook")
+    assert is_local_url("http://localhost/hook")
+    assert is_local_url("http://[::1]:80/")
+    assert not is_local_url("https://example.com/hook")
+    assert not is_local_url("file:///tmp/x")
+    try:
+        WebhookSink("http://10.0.0.5/hook")
+        raise AssertionError("Expected ValueError for remote webhook")
+    except ValueError:
+        pass
+    print("[PASS] test_rule_and_webhook_validation passed")
+
+
+if __name__ == "__main__":
+    print("Running alerts tests...\n")
+
+    try:
+        test_threshold_hysteresis()
+        test_cooldown_suppresses_repeats()
+        test_any_session_rule_watches_all_sessions()
+        test_burn_rate()
+        test_ended_sessions_forgotten()
+        test_rule_and_webhook_validation()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
@@ -0,0 +1,213 @@
+"""Unit tests for archiver module"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import project_catalog
+from archiver import SUMMARY_TOP_TURNS, archive_transcript, find_cold_transcripts, read_summary
+from config import Config
+from data_reader import find_active_session, iter_all_session_paths
+from heavy_turns import find_heavy_turns
+from jsonl_scanner import LZMA_AVAILABLE, open_transcript, transcript_stem
+from project_catalog import ProjectCatalog
+from usage_export import iter_usage_records
+
+
+def _assistant(message_id: str, context: int, output: int = 5) -> str:
+    return json.dumps({
+        "type": "assistant",
+        "cwd": "/work/app",
+        "timestamp": f"2026-01-01T00:00:{len(message_id):02d}Z",
+        "message": {"id": message_id, "model": "claude-opus-4-6",
+                    "usage": {"input_tokens": context - output, "output_tokens": output}},
+    }) + "\n"
+
+
+def _with_projects_dir(test):
+    """Run a test against a temporary CLAUDE_PROJECTS_DIR, catalog and index dir"""
+    def wrapper():
+        saved = (Config.CLAUDE_PROJECTS_DIR, Config.INDEX_DIR, project_catalog._catalog)
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            Config.CLAUDE_PROJECTS_DIR = tmp / "projects"
+            Config.INDEX_DIR = tmp / "index"
+            project_catalog._catalog = ProjectCatalog(tmp / "projects.json")
+            try:
+                test(tmp)
+            finally:
+                Config.CLAUDE_PROJECTS_DIR, Config.INDEX_DIR, project_catalog._catalog = saved
+    wrapper.__name__ = test.__name__
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+
+def _cold_transcript(tmp: Path, name: str = "s1.jsonl") -> Path:
+    path = Config.CLAUDE_PROJECTS_DIR / "-work-app" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(_assistant("m1", 1000, 5) + _assistant("m1", 1000, 20) + _assistant("m22", 4000))
+    old = time.time() - 40 * 86400
+    os.utime(path, (old, old))
+    return path
+
+
+@_with_projects_dir
+def test_archive_roundtrip(tmp: Path):
+    """Test that archiving keeps the content, mtime and a correct summary"""
+    path = _cold_transcript(tmp)
+    original = path.read_bytes()
+    mtime = path.stat().st_mtime
+
+    assert find_cold_transcripts(30) == [path]
+    assert find_cold_transcripts(60) == []
+    archive = archive_transcript(path, "gzip")
+
+    assert archive.name == "s1.jsonl.gz" and not path.exists()
+    assert abs(archive.stat().st_mtime - mtime) < 1
+    assert transcript_stem(archive) == "s1"
+    with open_transcript(archive) as f:
+        assert f.read() == original
+
+    summary = read_summary(archive)
+    assert summary["turns"] == 2 and summary["context_tokens"] == 4000
+    assert summary["tokens"]["output"] == 25  # last line of m1 counted once
+    assert summary["cwd"] == "/work/app" and summary["codec"] == "gzip"
+    assert summary["original_bytes"] == len(original)
+    print("[PASS] test_archive_roundtrip passed")
+
+
+@_with_projects_dir
+def test_archives_skipped_by_discovery_read_by_reports(tmp: Path):
+    """Test that archives never become the active session but reports read them"""
+    archive_transcript(_cold_transcript(tmp), "gzip")
+
+    assert find_active_session() is None
+    records = list(iter_usage_records())
+    assert [(r[2], r[-1]) for r in records] == [("s1", 1000), ("s1", 4000)]
+    turns = find_heavy_turns(iter_all_session_paths(include_archived=True))
+    assert [turn["delta"] for turn in turns] == [3000]
+    print("[PASS] test_archives_skipped_by_discovery_read_by_reports passed")
+
+
+@_with_projects_dir
+def test_interrupted_archive_not_double_counted(tmp: Path):
+    """Test that an archive next to its original is ignored, and xz works"""
+    path = _cold_transcript(tmp)
+    content = path.read_bytes()
+    codec = "xz" if LZMA_AVAILABLE else "gzip"
+    archive = archive_transcript(path, codec)
+    path.write_bytes(content)  # as if the original had not been removed yet
+
+    assert list(iter_all_session_paths(include_archived=True)) == [path]
+    with open_transcript(archive) as f:
+        assert f.read() == content
+    print("[PASS] test_interrupted_archive_not_double_counted passed")
+
+
+@_with_projects_dir
+def test_heavy_turns_read_from_summary(tmp: Path):
+    """Test that heavy_turns takes an archive's turns from its summary"""
+    archive = archive_transcript(_cold_transcript(tmp), "gzip")
+    summary = read_summary(archive)
+    assert [turn["delta"] for turn in summary["top_turns"]] == [3000]
+    assert summary["top_turns_n"] == SUMMARY_TOP_TURNS
+
+    with gzip.open(archive, "wb"):
+        pass  # empty the archive: only the summary still knows the turns
+    turns = find_heavy_turns([archive], n=3)
+    assert [turn["delta"] for turn in turns] == [3000]
+    assert turns[0]["session_path"] == archive
+    assert find_heavy_turns([archive], n=SUMMARY_TOP_TURNS + 1) == [], "Larger -n must scan the archive"
+    print("[PASS] test_heavy_turns_read_from_summary passed")
+
+
+def _rename_then(action):
+    """Patch os.rename to run action() right after the original is moved aside"""
+    real_rename = os.rename
+
+    def rename(src, dst):
+        real_rename(src, dst)
+        if str(dst).endswith(".archiving"):
+            action()
+    return real_rename, rename
+
+
+@_with_projects_dir
+def test_writes_during_archive_not_lost(tmp: Path):
+    """Test that a write after the change check is neither deleted nor archived over"""
+    path = _cold_transcript(tmp)
+    original = path.read_bytes()
+    late = _assistant("m333", 5000)
+
+    # Writer holding the file open: the moved file changes, so the original is restored
+    handle = open(path, "a")
+    real_rename, os.rename = _rename_then(lambda: (handle.write(late), handle.flush()))
+    try:
+        archive_transcript(path, "gzip")
+        assert False, "Expected RuntimeError"
+    except RuntimeError:
+        pass
+    finally:
+        os.rename = real_rename
+        handle.close()
+    assert path.read_bytes() == original + late.encode()
+    assert not path.with_name("s1.jsonl.gz").exists()
+    assert not path.with_name("s1.jsonl.archiving").exists()
+
+    # Writer reopening by path: it gets a fresh transcript next to the archive
+    path.write_bytes(original)
+    real_rename, os.rename = _rename_then(lambda: path.write_text(late))
+    try:
+        archive = archive_transcript(path, "gzip")
+    finally:
+        os.rename = real_rename
+    assert path.read_text() == late
+    with open_transcript(archive) as f:
+        assert f.read() == original
+
+    # Both at once: the check fails but the path is taken, so the original is reported
+    archive.unlink()
+    path.write_bytes(original)
+    handle = open(path, "a")
+
+    def write_both():
+        handle.write(late)
+        handle.flush()
+        path.write_text(late)
+    real_rename, os.rename = _rename_then(write_both)
+    held = path.with_name("s1.jsonl.archiving")
+    try:
+        archive_transcript(path, "gzip")
+        assert False, "Expected RuntimeError"
+    except RuntimeError as e:
+        assert str(held) in str(e), e
+    finally:
+        os.rename = real_rename
+        handle.close()
+    assert held.read_bytes() == original + late.encode() and path.read_text() == late
+    print("[PASS] test_writes_during_archive_not_lost passed")
+
+
+if __name__ == "__main__":
+    print("Running archiver tests...\n")
+
+    try:
+        test_archive_roundtrip()
+        test_archives_skipped_by_discovery_read_by_reports()
+        test_interrupted_archive_not_double_counted()
+        test_heavy_turns_read_from_summary()
+        test_writes_during_archive_not_lost()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
@@ -0,0 +1,150 @@
+"""Unit tests for config_loader module"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import Config, MODEL_INFO
+from config_loader import ConfigReloader, validate_value
+
+
+def _write(path: Path, data: dict, bump: int):
+    """Write a JSON config file with a distinct mtime so check() notices it."""
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(bump * 10**9, bump * 10**9))
+
+
+def test_validate_value():
+    """Test type and range checks for tunables"""
+    assert validate_value("REFRESH_INTERVAL_MS", 500) == 500
+    assert validate_value("COMPRESS_THRESHOLD", 80) == 80.0
+    assert validate_value("JSON_BACKEND", "json") == "json"
+    for name, value in (("REFRESH_INTERVAL_MS", 10), ("REFRESH_INTERVAL_MS", "fast"),
+                        ("DISCOVERY_WORKERS", True), ("JSON_BACKEND", "simdjson"),
+                        ("AUTO_CLOSE_ENABLED", 1)):
+        try:
+            validate_value(name, value)
+            raise AssertionError(f"Expected ValueError for {name}={value!r}")
+        except ValueError:
+            pass
+    print("[PASS] test_validate_value passed")
+
+
+def test_reload_applies_and_reverts():
+    """Test that changes apply live and removed settings revert to defaults"""
+    default_refresh = Config.REFRESH_INTERVAL_MS
+    default_limit = MODEL_INFO["claude-sonnet-4-6"]["limit"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "config.json"
+        reloader = ConfigReloader(Path(tmp))
+        try:
+            assert reloader.check() == []
+
+            _write(path, {"refresh_interval_ms": 750,
+                          "models": {"claude-sonnet-4-6": {"limit": 1000000}}}, 1)
+            changed = reloader.check()
+            assert set(changed) == {"REFRESH_INTERVAL_MS", "MODEL_INFO"}, changed
+            assert Config.REFRESH_INTERVAL_MS == 750
+            assert MODEL_INFO["claude-sonnet-4-6"]["limit"] == 1000000
+            assert reloader.check() == [], "Unchanged file must not reload"
+
+            _write(path, {"discovery_workers": 2}, 2)
+            assert set(reloader.check()) == {"REFRESH_INTERVAL_MS", "MODEL_INFO", "DISCOVERY_WORKERS"}
+            assert Config.REFRESH_INTERVAL_MS == default_refresh
+            assert MODEL_INFO["claude-sonnet-4-6"]["limit"] == default_limit
+            assert ("discovery_workers", 2, "file") in reloader.effective_config()
+        finally:
+            reloader.apply({}, {})
+    print("[PASS] test_reload_applies_and_reverts passed")
+
+
+def test_invalid_file_keeps_previous_values():
+    """Test that a bad file is rejected as a whole and reported"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "config.json"
+        reloader = ConfigReloader(Path(tmp))
+        try:
+            _write(path, {"refresh_interval_ms": 900}, 1)
+            reloader.check()
+
+            _write(path, {"refresh_interval_ms": 1200, "index_cache_size": -5}, 2)
+            assert reloader.check() == []
+            assert Config.REFRESH_INTERVAL_MS == 900
+            assert "index_cache_size" in reloader.error
+
+            _write(path, {"no_such_setting": 1}, 3)
+            reloader.check()
+            assert "unknown setting" in reloader.error
+
+            path.write_text("{not json")
+            os.utime(path, ns=(4 * 10**9, 4 * 10**9))
+            reloader.check()
+            assert Config.REFRESH_INTERVAL_MS == 900
+            assert "ERROR" in reloader.format_effective_config()
+        finally:
+            reloader.apply({}, {})
+    print("[PASS] test_invalid_file_keeps_previous_values passed")
+
+
+def test_config_file_enables_alerts():
+    """Test that alerts can be switched on and configured from the config file"""
+    from main import attach_alerts
+    from usage_monitor import UsageMonitor
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "config.json"
+        reloader = ConfigReloader(Path(tmp))
+        try:
+            _write(path, {
+                "alerts_enabled": True,
+                "alert_rules": [{"type": "percentage", "thresholds": [50]},
+                                {"type": "any_session", "thresholds": [90]}],
+                "alert_sinks": ["stdout"],
+                "alert_cooldown_s": 60,
+                "track_live_sessions": True,
+            }, 1)
+            changed = reloader.check()
+            assert reloader.error is None, reloader.error
+            assert {"ALERTS_ENABLED", "ALERT_RULES", "ALERT_SINKS", "ALERT_COOLDOWN_S"} <= set(changed)
+            assert Config.ALERTS_ENABLED and Config.ALERT_SINKS == ["stdout"]
+
+            monitor = UsageMonitor()
+            attach_alerts(monitor)
+            engine = monitor._subscribers[-1].__self__
+            assert len(engine.rules) == 2 and engine.cooldown_s == 60
+            assert monitor.track_sessions
+
+            for bad in ({"alert_rules": [{"type": "percentage", "thresholds": [-1]}]},
+                        {"alert_rules": [{"type": "sms"}]},
+                        {"alert_sinks": ["email"]},
+                        {"alert_webhook_url": "http://example.com/hook"}):
+                _write(path, bad, 2 + len(str(bad)))
+                assert reloader.check() == []
+                assert reloader.error, f"Expected {bad} to be rejected"
+            assert Config.ALERTS_ENABLED, "Rejected files keep the previous values"
+        finally:
+            reloader.apply({}, {})
+    assert not Config.ALERTS_ENABLED
+    print("[PASS] test_config_file_enables_alerts passed")
+
+
+if __name__ == "__main__":
+    print("Running config_loader tests...\n")
+
+    try:
+        test_validate_value()
+        test_reload_applies_and_reverts()
+        test_invalid_file_keeps_previous_values()
+        test_config_file_enables_alerts()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
@@ -0,0 +1,211 @@
+"""Unit tests for cost_ledger module"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import cost_ledger
+from config import Config
+from cost_ledger import CostLedger, entry_cost, get_session_costs
+from data_reader import extract_usage_breakdown
+from transcript_index import TranscriptIndex
+
+
+def _assistant(message_id: str, output: int, model: str = "claude-sonnet-4-6") -> dict:
+    return {
+        "type": "assistant",
+        "timestamp": "2026-03-01T12:00:00Z",
+        "message": {
+            "id": message_id,
+            "model": model,
+            "usage": {
+                "input_tokens": 1000,
+                "output_tokens": output,
+                "cache_read_input_tokens": 10000,
+                "cache_creation": {"ephemeral_5m_input_tokens": 2000},
+            },
+        },
+    }
+
+
+def test_entry_cost_uses_pricing_table():
+    """Test per-field pricing for a known model"""
+    cost = entry_cost("claude-sonnet-4-6", extract_usage_breakdown(_assistant("m", 500)))
+    expected = (1000 * 3.00 + 500 * 15.00 + 10000 * 0.30 + 2000 * 3.75) / 1_000_000
+
+    assert abs(cost - expected) < 1e-12, f"Expected {expected}, got {cost}"
+    assert entry_cost("unknown-model", extract_usage_breakdown(_assistant("m", 1))) is None
+    print("[PASS] test_entry_cost_uses_pricing_table passed")
+
+
+def test_repeated_message_id_not_double_counted():
+    """Test that split lines of one API response are priced once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = CostLedger(Path(tmp) / "costs.json")
+        ledger.record("s", "proj", 10, _assistant("msg_1", 10))
+        ledger.record("s", "proj", 20, _assistant("msg_1", 500))
+        ledger.record("s", "proj", 20, _assistant("msg_1", 500))  # replayed offset
+
+        single = entry_cost("claude-sonnet-4-6", extract_usage_breakdown(_assistant("m", 500)))
+        assert abs(ledger.sessions["s"]["cost"] - single) < 1e-12
+        assert abs(ledger.project_cost("proj") - single) < 1e-12
+        assert abs(sum(ledger.days.values()) - single) < 1e-12
+    print("[PASS] test_repeated_message_id_not_double_counted passed")
+
+
+def test_interleaved_sidechain_lines_not_double_counted():
+    """Test that a subagent line between two lines of one main message does not split it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = CostLedger(Path(tmp) / "costs.json")
+        sidechain = dict(_assistant("msg_sub", 40), isSidechain=True, agentId="a1")
+        ledger.record("s", "proj", 10, _assistant("msg_1", 10))
+        ledger.record("s", "proj", 20, sidechain)
+        ledger.record("s", "proj", 30, _assistant("msg_1", 500))
+        ledger.record("s", "proj", 40, dict(sidechain, message=_assistant("msg_sub", 80)["message"]))
+
+        def cost(output):
+            return entry_cost("claude-sonnet-4-6", extract_usage_breakdown(_assistant("m", output)))
+        expected = cost(500) + cost(80)
+        assert abs(ledger.session_cost("s") - expected) < 1e-12, ledger.session_cost("s")
+        assert abs(sum(ledger.days.values()) - expected) < 1e-12
+        assert set(ledger.sessions["s"]["streams"]) == {"", "a1"}
+    print("[PASS] test_interleaved_sidechain_lines_not_double_counted passed")
+
+
+def test_update_is_incremental_and_persisted():
+    """Test that update() prices only new entries and totals survive reload"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "-work-app" / "s1.jsonl"
+        transcript.parent.mkdir()
+        transcript.write_text(json.dumps(_assistant("msg_1", 100)) + "\n")
+        index = TranscriptIndex(transcript, Path(tmp) / "s1.idx")
+        ledger = CostLedger(Path(tmp) / "costs.json")
+
+        index.update()
+        assert ledger.update(transcript, index) == 1
+        assert ledger.update(transcript, index) == 0
+
+        with open(transcript, "a") as f:
+            f.write(json.dumps(_assistant("msg_2", 100)) + "\n")
+        index.update()
+        assert ledger.update(transcript, index) == 1
+        ledger.save(force=True)
+
+        reloaded = CostLedger(Path(tmp) / "costs.json")
+        assert abs(reloaded.session_cost(transcript) - ledger.session_cost(transcript)) < 1e-12
+        assert abs(sum(reloaded.days.values()) - reloaded.session_cost(transcript)) < 1e-12
+    print("[PASS] test_update_is_incremental_and_persisted passed")
+
+
+def test_same_folder_name_projects_kept_apart():
+    """Test that projects are keyed by their encoded directory, not the basename"""
+    saved = Config.CLAUDE_PROJECTS_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.CLAUDE_PROJECTS_DIR = Path(tmp) / "projects"
+        try:
+            ledger = CostLedger(Path(tmp) / "costs.json")
+            for i, project in enumerate(("-home-a-app", "-home-b-app")):
+                transcript = Config.CLAUDE_PROJECTS_DIR / project / "s.jsonl"
+                transcript.parent.mkdir(parents=True)
+                transcript.write_text(json.dumps(_assistant("m", 100 * (i + 1))) + "\n")
+                index = TranscriptIndex(transcript, Path(tmp) / f"{i}.idx")
+                index.update()
+                ledger.update(transcript, index)
+
+            assert set(ledger.projects) == {"-home-a-app", "-home-b-app"}
+            assert ledger.project_cost("-home-a-app") < ledger.project_cost("-home-b-app")
+            assert ledger.project_names["-home-a-app"] == ledger.project_names["-home-b-app"]
+        finally:
+            Config.CLAUDE_PROJECTS_DIR = saved
+    print("[PASS] test_same_folder_name_projects_kept_apart passed")
+
+
+def test_rewritten_transcript_repriced():
+    """Test that a truncated transcript replaces its old contribution instead of adding to it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "-work-app" / "s1.jsonl"
+        transcript.parent.mkdir()
+        transcript.write_text(json.dumps(_assistant("msg_1", 100)) + "\n"
+                              + json.dumps(_assistant("msg_2", 100)) + "\n")
+        index = TranscriptIndex(transcript, Path(tmp) / "s1.idx")
+        ledger = CostLedger(Path(tmp) / "costs.json")
+        index.update()
+        assert ledger.update(transcript, index) == 2
+
+        transcript.write_text(json.dumps(_assistant("msg_9", 100)) + "\n")
+        index.update()
+        assert ledger.update(transcript, index) == 1, "Stale offset must be reset"
+        single = entry_cost("claude-sonnet-4-6", extract_usage_breakdown(_assistant("m", 100)))
+        assert abs(ledger.session_cost(transcript) - single) < 1e-12
+        assert abs(sum(ledger.days.values()) - single) < 1e-12
+        assert abs(sum(ledger.projects.values()) - single) < 1e-12
+    print("[PASS] test_rewritten_transcript_repriced passed")
+
+
+def test_live_sessions_priced():
+    """Test that concurrent sessions count towards today's total"""
+    saved = (Config.INDEX_DIR, cost_ledger._ledger)
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.INDEX_DIR = Path(tmp) / "index"
+        cost_ledger._ledger = CostLedger(Path(tmp) / "costs.json")
+        try:
+            shown = Path(tmp) / "-work-app" / "shown.jsonl"
+            other = Path(tmp) / "-work-lib" / "other.jsonl"
+            for path in (shown, other):
+                path.parent.mkdir()
+                path.write_text(json.dumps(_assistant(path.stem, 100)) + "\n")
+
+            costs = get_session_costs(shown, [shown, other])
+            assert cost_ledger._ledger.session_cost(other) == costs["session"] > 0
+            assert abs(sum(cost_ledger._ledger.days.values()) - 2 * costs["session"]) < 1e-12
+        finally:
+            Config.INDEX_DIR, cost_ledger._ledger = saved
+    print("[PASS] test_live_sessions_priced passed")
+
+
+def test_version_1_ledger_regrouped():
+    """Test that project totals keyed by display name are rebuilt from the sessions"""
+    saved = Config.CLAUDE_PROJECTS_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.CLAUDE_PROJECTS_DIR = Path(tmp) / "projects"
+        ledger_file = Path(tmp) / "costs.json"
+        ledger_file.write_text(json.dumps({
+            "sessions": {
+                str(Config.CLAUDE_PROJECTS_DIR / "-home-a-app" / "s1.jsonl"): {"cost": 1.0, "offset": 5, "project": "app"},
+                str(Config.CLAUDE_PROJECTS_DIR / "-home-b-app" / "s2.jsonl"): {"cost": 2.0, "offset": 5, "project": "app"},
+            },
+            "projects": {"app": 3.0},
+            "days": {},
+        }))
+        try:
+            ledger = CostLedger(ledger_file)
+            assert ledger.projects == {"-home-a-app": 1.0, "-home-b-app": 2.0}
+            assert ledger.project_names["-home-b-app"] == "app"
+        finally:
+            Config.CLAUDE_PROJECTS_DIR = saved
+    print("[PASS] test_version_1_ledger_regrouped passed")
+
+
+if __name__ == "__main__":
+    print("Running cost_ledger tests...\n")
+
+    try:
+        test_entry_cost_uses_pricing_table()
+        test_repeated_message_id_not_double_counted()
+        test_interleaved_sidechain_lines_not_double_counted()
+        test_update_is_incremental_and_persisted()
+        test_same_folder_name_projects_kept_apart()
+        test_rewritten_transcript_repriced()
+        test_live_sessions_priced()
+        test_version_1_ledger_regrouped()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
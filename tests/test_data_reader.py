@@ -104,6 +104,30 @@ def test_token_extraction_cache_only():
     print("[PASS] test_token_extraction_cache_only passed")
 
 
+def test_token_extraction_all_cache_writes():
+    """Test that 1-hour and flat cache writes are counted"""
+    entry = {
+        "type": "assistant",
+        "message": {
+            "usage": {
+                "input_tokens": 10,
+                "output_tokens": 20,
+                "cache_read_input_tokens": 300,
+                "cache_creation_input_tokens": 700,
+                "cache_creation": {
+                    "ephemeral_5m_input_tokens": 200,
+                    "ephemeral_1h_input_tokens": 500
+                }
+            }
+        }
+    }
+    assert extract_tokens_from_entry(entry) == 10 + 20 + 300 + 700
+
+    flat_only = {"type": "assistant", "message": {"usage": {"cache_creation_input_tokens": 400}}}
+    assert extract_tokens_from_entry(flat_only) == 400
+    print("[PASS] test_token_extraction_all_cache_writes passed")
+
+
 if __name__ == "__main__":
     print("Running data_reader tests...\n")
 
@@ -113,6 +137,7 @@ if __name__ == "__main__":
         test_token_extraction_non_assistant()
         test_token_extraction_missing_fields()
         test_token_extraction_cache_only()
+        test_token_extraction_all_cache_writes()
 
         print("\n[PASS] All tests passed!")
     except AssertionError as e:
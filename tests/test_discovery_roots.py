@@ -0,0 +1,152 @@
+"""Unit tests for discovery_roots module"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import discovery_roots
+import project_catalog
+from config import Config
+from data_reader import find_active_session, extract_project_name, get_live_sessions, get_subagents
+from discovery_roots import RootManager, RootScanner, normalize_root_spec
+from project_catalog import ProjectCatalog, project_key
+
+
+def _transcript(path: Path, cwd: str, mtime: float):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"type": "user", "cwd": cwd}) + "\n")
+    os.utime(path, (mtime, mtime))
+
+
+def test_normalize_root_spec():
+    """Test defaults and validation of extra root entries"""
+    spec = normalize_root_spec("/mnt/nfs/.claude/projects")
+    assert spec["label"] == "/mnt/nfs/.claude/projects"
+    assert spec["interval_s"] == Config.ROOT_SCAN_INTERVAL_S
+    assert normalize_root_spec({"path": "/x", "label": "wsl", "timeout_s": 3})["timeout_s"] == 3
+    for bad in ({}, {"path": "/x", "interval_s": 0}, {"path": "/x", "bogus": 1}, 42):
+        try:
+            normalize_root_spec(bad)
+            raise AssertionError(f"Expected ValueError for {bad!r}")
+        except ValueError:
+            pass
+    print("[PASS] test_normalize_root_spec passed")
+
+
+def test_root_scanner_status():
+    """Test scan results, cwd discovery, errors and the timeout state"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "projects"
+        _transcript(root / "-work-app" / "s1.jsonl", "/work/app", time.time())
+
+        scanner = RootScanner(normalize_root_spec({"path": str(root), "label": "dev", "timeout_s": 5}))
+        assert scanner.status == "pending" and scanner.results() == []
+        scanner.scan_once()
+        assert scanner.status == "ok"
+        assert [r[1] for r in scanner.results()] == ["s1.jsonl"]
+        assert scanner.cwds == {"-work-app": "/work/app"}
+
+        scanner._scan_started = time.monotonic() - 60  # a scan stuck on a dead mount
+        assert scanner.status == "timeout" and scanner.results() == []
+
+        missing = RootScanner(normalize_root_spec(str(Path(tmp) / "missing")))
+        missing.scan_once()
+        assert missing.status == "error" and missing.results() == []
+    print("[PASS] test_root_scanner_status passed")
+
+
+def test_merged_active_session():
+    """Test that extra roots feed the active-session view and catalog keys"""
+    saved = (Config.CLAUDE_PROJECTS_DIR, Config.CLAUDE_PROJECTS_DIRS,
+             project_catalog._catalog, discovery_roots._manager)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        now = time.time()
+        local = tmp / "local" / "-work-app" / "a.jsonl"
+        remote = tmp / "wsl" / "-work-app" / "b.jsonl"
+        _transcript(local, "/work/app", now - 60)
+        _transcript(remote, "/home/me/app-in-wsl", now)
+
+        Config.CLAUDE_PROJECTS_DIR = tmp / "local"
+        Config.CLAUDE_PROJECTS_DIRS = [{"path": str(tmp / "wsl"), "label": "wsl", "interval_s": 3600}]
+        project_catalog._catalog = ProjectCatalog(tmp / "projects.json")
+        discovery_roots._manager = RootManager()
+        try:
+            # Install the scanner without its thread so the test is deterministic
+            scanner = RootScanner(normalize_root_spec(Config.CLAUDE_PROJECTS_DIRS[0]))
+            discovery_roots._manager.scanners = {"wsl": scanner}
+            discovery_roots._manager._specs = list(Config.CLAUDE_PROJECTS_DIRS)
+            scanner.scan_once()
+
+            assert find_active_session() == remote
+            assert project_key(remote) == "wsl:-work-app"
+            assert project_key(local) == "-work-app"
+            assert extract_project_name(remote) == "app-in-wsl"
+            assert extract_project_name(local) == "app"
+
+            # An unreachable root keeps its catalog entries and drops out of the view
+            scanner._scan_started = time.monotonic() - 3600
+            assert find_active_session() == local
+            assert "b.jsonl" in project_catalog._catalog.projects["wsl:-work-app"]["sessions"]
+        finally:
+            discovery_roots._manager.stop_all()
+            (Config.CLAUDE_PROJECTS_DIR, Config.CLAUDE_PROJECTS_DIRS,
+             project_catalog._catalog, discovery_roots._manager) = saved
+    print("[PASS] test_merged_active_session passed")
+
+
+def test_subagent_transcripts():
+    """Test that subagent transcripts are never selected and are listed under their session"""
+    saved = (Config.CLAUDE_PROJECTS_DIR, Config.CLAUDE_PROJECTS_DIRS, Config.INDEX_DIR,
+             project_catalog._catalog)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        now = time.time()
+        session = tmp / "projects" / "-work-app" / "abc.jsonl"
+        idle = session.parent / "abc" / "subagents" / "agent-old.jsonl"
+        agent = session.parent / "abc" / "subagents" / "agent-x1.jsonl"
+        _transcript(session, "/work/app", now - 30)
+        _transcript(idle, "/work/app", now - 3600)
+        agent.write_text(json.dumps({
+            "type": "assistant", "isSidechain": True, "agentId": "x1",
+            "message": {"model": "claude-haiku-4-5", "usage": {"input_tokens": 5000}},
+        }) + "\n")
+
+        Config.CLAUDE_PROJECTS_DIR = tmp / "projects"
+        Config.CLAUDE_PROJECTS_DIRS = []
+        Config.INDEX_DIR = tmp / "index"
+        project_catalog._catalog = ProjectCatalog(tmp / "projects.json")
+        try:
+            assert find_active_session() == session, "A newer subagent file must not take over"
+            assert get_live_sessions() == [session]
+            subagents = get_subagents(session)
+            assert [s["agent"] for s in subagents] == ["x1"], subagents
+            assert subagents[0]["tokens"] == 5000
+            assert subagents[0]["model_id"] == "claude-haiku-4-5"
+        finally:
+            (Config.CLAUDE_PROJECTS_DIR, Config.CLAUDE_PROJECTS_DIRS, Config.INDEX_DIR,
+             project_catalog._catalog) = saved
+    print("[PASS] test_subagent_transcripts passed")
+
+
+if __name__ == "__main__":
+    print("Running discovery_roots tests...\n")
+
+    try:
+        test_normalize_root_spec()
+        test_root_scanner_status()
+        test_merged_active_session()
+        test_subagent_transcripts()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
@@ -0,0 +1,121 @@
+"""Unit tests for heavy_turns module"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from heavy_turns import TopTurns, TurnScanner, find_heavy_turns, format_turn
+
+
+def _assistant(message_id: str, context: int, tools=(), sidechain=False) -> str:
+    content = [{"type": "tool_use", "name": name, "input": {}} for name in tools]
+    return json.dumps({
+        "type": "assistant",
+        "isSidechain": sidechain,
+        "timestamp": f"2026-03-01T10:00:{len(message_id):02d}Z",
+        "message": {"id": message_id, "content": content,
+                    "usage": {"input_tokens": 10, "output_tokens": 0,
+                              "cache_read_input_tokens": context - 10}},
+    }) + "\n"
+
+
+def test_top_turns_bounded():
+    """Test that only the N largest positive deltas are kept"""
+    top = TopTurns(3)
+    for delta in (5, -100, 40, 1, 30, 0, 50, 2):
+        top.add({"delta": delta})
+    assert [turn["delta"] for turn in top.results()] == [50, 40, 30]
+    assert len(top._heap) == 3
+    print("[PASS] test_top_turns_bounded passed")
+
+
+def test_deltas_and_tool_attribution():
+    """Test deltas, previous-turn tool names, split messages and sidechains"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "s.jsonl"
+        lines = [
+            _assistant("m1", 20000, tools=("Read",)),
+            _assistant("m1", 20000, tools=("Grep",)),       # same message, second block
+            json.dumps({"type": "user", "message": {"content": "tool result"}}) + "\n",
+            _assistant("m22", 65000, tools=("Bash",)),      # +45000 after Read/Grep
+            _assistant("sub", 900000, sidechain=True),       # subagent: ignored
+            _assistant("m333", 70000),                       # +5000 after Bash
+            _assistant("m4444", 30000),                      # compaction: not a jump
+            _assistant("m55555", 42000),                     # +12000 after a plain reply
+        ]
+        path.write_text("".join(lines))
+        offsets = [0]
+        for line in lines:
+            offsets.append(offsets[-1] + len(line.encode()))
+
+        turns = find_heavy_turns([path], n=2)
+        assert [turn["delta"] for turn in turns] == [45000, 12000], turns
+        assert turns[0]["tool"] == "Read, Grep"
+        assert turns[0]["offset"] == offsets[3]
+        assert turns[0]["tokens"] == 65000
+        assert turns[1]["tool"] is None
+    print("[PASS] test_deltas_and_tool_attribution passed")
+
+
+def test_incremental_feed():
+    """Test that appended lines are picked up without rereading the file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "s.jsonl"
+        path.write_text(_assistant("a", 1000, tools=("Read",)) + _assistant("bb", 9000))
+        scanner = TurnScanner(path)
+        top = TopTurns(5)
+        scanner.feed(top.add)
+        assert top.results() == []
+        assert scanner.peek()["delta"] == 8000  # in progress, shown but not committed
+
+        with open(path, "a") as f:
+            f.write(_assistant("ccc", 10000))
+        offset = scanner.offset
+        scanner.feed(top.add)
+        assert scanner.offset > offset
+        assert [turn["delta"] for turn in top.results([scanner.peek()])] == [8000, 1000]
+    print("[PASS] test_incremental_feed passed")
+
+
+def test_debug_view_str_session_path():
+    """Test the debug view's heavy-turn lines with the str path a snapshot carries"""
+    from types import SimpleNamespace
+    from ui_widget import DebugView
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "s.jsonl"
+        path.write_text(_assistant("a", 1000) + _assistant("bb", 9000) + _assistant("ccc", 9500))
+        view = SimpleNamespace(turn_scanner=None, top_turns=None)
+        lines = DebugView._heavy_turn_lines(view, str(path))
+        assert isinstance(view.turn_scanner.path, Path)
+        assert any("s.jsonl@" in line for line in lines), lines
+
+        scanner = view.turn_scanner
+        DebugView._heavy_turn_lines(view, str(path))
+        assert view.turn_scanner is scanner, "Same session must keep its scanner"
+
+        top = TopTurns(5)
+        TurnScanner(str(path)).feed(top.add, final=True)
+        assert format_turn(top.results()[0]).endswith(f"s.jsonl@{top.results()[0]['offset']}")
+    print("[PASS] test_debug_view_str_session_path passed")
+
+
+if __name__ == "__main__":
+    print("Running heavy_turns tests...\n")
+
+    try:
+        test_top_turns_bounded()
+        test_deltas_and_tool_attribution()
+        test_incremental_feed()
+        test_debug_view_str_session_path()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
@@ -0,0 +1,153 @@
+"""Unit tests for hook_client and hook_receiver modules"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import cost_ledger
+import project_catalog
+from config import Config
+from hook_client import build_message
+from hook_receiver import HookReceiver, parse_event
+from project_catalog import ProjectCatalog
+from usage_monitor import UsageMonitor
+
+CLIENT = Path(__file__).parent.parent / "src" / "hook_client.py"
+
+
+def _transcript(path: Path, tokens: int, mtime: float):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "type": "assistant",
+        "message": {"model": "claude-sonnet-4-5-20250929",
+                    "usage": {"input_tokens": tokens, "output_tokens": 0}},
+    }) + "\n")
+    os.utime(path, (mtime, mtime))
+
+
+def test_parse_event():
+    """Test that only well-formed hook events are accepted"""
+    inside = str(Config.CLAUDE_PROJECTS_DIR / "-p" / "s.jsonl")
+    message = build_message({"hook_event_name": "PostToolUse", "session_id": "s",
+                             "transcript_path": inside, "tool_response": "x" * 10000})
+    assert len(message) < 400  # tool payloads are not forwarded
+    event = parse_event(message)
+    assert event["transcript_path"] == Path(inside)
+    assert parse_event(b"not json") is None
+    assert parse_event(build_message({"hook_event_name": "Bogus", "transcript_path": inside})) is None
+    assert parse_event(build_message({"hook_event_name": "Stop", "transcript_path": "/etc/passwd"})) is None
+    print("[PASS] test_parse_event passed")
+
+
+def test_parse_event_outside_roots():
+    """Test that transcripts outside the projects roots are rejected"""
+    saved = (Config.CLAUDE_PROJECTS_DIR, Config.CLAUDE_PROJECTS_DIRS)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        Config.CLAUDE_PROJECTS_DIR = tmp / "projects"
+        Config.CLAUDE_PROJECTS_DIRS = [{"path": str(tmp / "wsl"), "label": "wsl"}]
+        outside = tmp / "elsewhere" / "s.jsonl"
+        _transcript(outside, 100, time.time())
+        link = tmp / "projects" / "-work" / "link.jsonl"
+        link.parent.mkdir(parents=True)
+        try:
+            link.symlink_to(outside)
+        except OSError:
+            link = None  # no symlink permission (Windows)
+
+        def accepted(path) -> bool:
+            return parse_event(build_message({"hook_event_name": "Stop", "transcript_path": str(path)})) is not None
+
+        try:
+            assert accepted(tmp / "projects" / "-work" / "s.jsonl")
+            assert accepted(tmp / "wsl" / "-work" / "s.jsonl"), "Extra roots are allowed"
+            assert not accepted(outside)
+            assert not accepted(tmp / "projects" / ".." / "elsewhere" / "s.jsonl")
+            if link is not None:
+                assert not accepted(link), "A symlink out of the root must not be followed"
+        finally:
+            Config.CLAUDE_PROJECTS_DIR, Config.CLAUDE_PROJECTS_DIRS = saved
+    print("[PASS] test_parse_event_outside_roots passed")
+
+
+def test_client_to_receiver():
+    """Test that the hook client's datagram reaches the receiver"""
+    receiver = HookReceiver(port=0)
+    assert receiver.start()
+    try:
+        stdin = json.dumps({"hook_event_name": "Stop", "session_id": "abc",
+                            "transcript_path": str(Config.CLAUDE_PROJECTS_DIR / "-work" / "abc.jsonl"),
+                            "cwd": "/work"})
+        result = subprocess.run(
+            [sys.executable, "-S", str(CLIENT)], input=stdin, capture_output=True, text=True,
+            env={**os.environ, "CLAUDE_MONITOR_HOOK_PORT": str(receiver.port)}, timeout=30,
+        )
+        assert result.returncode == 0 and result.stdout == ""
+        assert receiver.wait(5)
+        event = receiver.take()
+        assert event["session_id"] == "abc" and event["cwd"] == "/work"
+        assert receiver.take() is None and not receiver.pending
+
+        # Garbage on stdin must not fail the hook
+        result = subprocess.run([sys.executable, "-S", str(CLIENT)], input="{", capture_output=True,
+                                text=True, timeout=30)
+        assert result.returncode == 0
+    finally:
+        receiver.stop()
+    print("[PASS] test_client_to_receiver passed")
+
+
+def test_monitor_pins_pushed_session():
+    """Test that a pushed session is read even when another file is newer"""
+    saved = (Config.CLAUDE_PROJECTS_DIR, Config.INDEX_DIR, Config.COST_LEDGER_FILE,
+             project_catalog._catalog, cost_ledger._ledger)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        now = time.time()
+        hooked = tmp / "projects" / "-work-a" / "a.jsonl"
+        newer = tmp / "projects" / "-work-b" / "b.jsonl"
+        _transcript(hooked, 1000, now - 30)
+        _transcript(newer, 5000, now)
+        Config.CLAUDE_PROJECTS_DIR = tmp / "projects"
+        Config.INDEX_DIR = tmp / "index"
+        Config.COST_LEDGER_FILE = tmp / "costs.json"
+        project_catalog._catalog = ProjectCatalog(tmp / "projects.json")
+        cost_ledger._ledger = None
+        try:
+            monitor = UsageMonitor()
+            assert monitor.poll()["tokens"] == 5000  # mtime guess
+
+            monitor.push(parse_event(build_message({"hook_event_name": "PostToolUse",
+                                                    "transcript_path": str(hooked)})))
+            assert monitor.poll()["tokens"] == 1000
+
+            monitor._pinned_at -= Config.HOOK_PIN_TTL_S  # pin expired: back to mtime
+            assert monitor.poll()["tokens"] == 5000 and monitor.pinned_session is None
+        finally:
+            (Config.CLAUDE_PROJECTS_DIR, Config.INDEX_DIR, Config.COST_LEDGER_FILE,
+             project_catalog._catalog, cost_ledger._ledger) = saved
+    print("[PASS] test_monitor_pins_pushed_session passed")
+
+
+if __name__ == "__main__":
+    print("Running hook tests...\n")
+
+    try:
+        test_parse_event()
+        test_parse_event_outside_roots()
+        test_client_to_receiver()
+        test_monitor_pins_pushed_session()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
@@ -0,0 +1,128 @@
+"""Unit tests for jsonl_scanner module"""
+import io
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from jsonl_scanner import LineScanner
+
+
+def _assistant_line(tokens: int, filler: str = "") -> bytes:
+    """Build an assistant transcript line in Claude Code's key order"""
+    entry = {
+        "parentUuid": "p",
+        "isSidechain": False,
+        "sessionId": "s1",
+        "message": {
+            "id": "msg_1",
+            "type": "message",
+            "role": "assistant",
+            "model": "claude-sonnet-4-6",
+            "content": [{"type": "tool_use", "id": "t1", "name": "Write",
+                         "input": {"content": filler}}],
+            "usage": {"input_tokens": tokens, "output_tokens": 0},
+        },
+        "type": "assistant",
+        "timestamp": "2026-01-01T00:00:00Z",
+    }
+    return json.dumps(entry, separators=(",", ":")).encode() + b"\n"
+
+
+def _user_line(filler: str) -> bytes:
+    """Build a user tool-result line"""
+    entry = {
+        "message": {"role": "user", "content": [
+            {"type": "tool_result", "content": filler}]},
+        "type": "user",
+    }
+    return json.dumps(entry, separators=(",", ":")).encode() + b"\n"
+
+
+def test_small_lines_parsed():
+    """Test that lines under the ceiling are decoded normally"""
+    data = _user_line("hi") + _assistant_line(100)
+    scanner = LineScanner(max_line_bytes=4096, chunk_size=16)
+    entries = list(scanner.scan(io.BytesIO(data)))
+
+    assert [e["type"] for _, e in entries] == ["user", "assistant"]
+    assert entries[1][0] == len(_user_line("hi")), "Offset should point at line start"
+    assert scanner.end_offset == len(data)
+    print("[PASS] test_small_lines_parsed passed")
+
+
+def test_oversized_assistant_usage_recovered():
+    """Test that usage is pulled out of an oversized assistant line"""
+    data = _assistant_line(1234, "x" * 200_000)
+    scanner = LineScanner(max_line_bytes=1024, chunk_size=4096)
+    entries = list(scanner.scan(io.BytesIO(data)))
+
+    assert len(entries) == 1
+    entry = entries[0][1]
+    assert entry["message"]["usage"]["input_tokens"] == 1234
+    assert entry["message"]["model"] == "claude-sonnet-4-6"
+    assert entry["message"]["content"][0]["name"] == "Write"
+    assert entry["timestamp"] == "2026-01-01T00:00:00Z"
+    assert scanner.oversized_lines == 1
+    print("[PASS] test_oversized_assistant_usage_recovered passed")
+
+
+def test_oversized_user_line_skipped():
+    """Test that oversized non-assistant lines are streamed past"""
+    data = _user_line("y" * 200_000) + _assistant_line(50)
+    scanner = LineScanner(max_line_bytes=1024, chunk_size=4096)
+    entries = list(scanner.scan(io.BytesIO(data)))
+
+    assert len(entries) == 1
+    assert entries[0][1]["message"]["usage"]["input_tokens"] == 50
+    print("[PASS] test_oversized_user_line_skipped passed")
+
+
+def test_partial_last_line_not_committed():
+    """Test that an unterminated trailing line does not advance end_offset"""
+    complete = _assistant_line(10)
+    data = complete + _assistant_line(20)[:30]
+    scanner = LineScanner()
+    entries = list(scanner.scan(io.BytesIO(data)))
+
+    assert len(entries) == 1
+    assert scanner.end_offset == len(complete)
+    print("[PASS] test_partial_last_line_not_committed passed")
+
+
+def test_peak_memory_bounded():
+    """Test that peak allocation does not scale with line size"""
+    data = _user_line("z" * 8_000_000) + _assistant_line(7, "w" * 8_000_000)
+    f = io.BytesIO(data)
+    scanner = LineScanner(max_line_bytes=64 * 1024, chunk_size=64 * 1024)
+
+    tracemalloc.start()
+    entries = list(scanner.scan(f))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert entries[-1][1]["message"]["usage"]["input_tokens"] == 7
+    assert peak < 1_000_000, f"Peak {peak} bytes should stay well under line size"
+    print("[PASS] test_peak_memory_bounded passed")
+
+
+if __name__ == "__main__":
+    print("Running jsonl_scanner tests...\n")
+
+    try:
+        test_small_lines_parsed()
+        test_oversized_assistant_usage_recovered()
+        test_oversized_user_line_skipped()
+        test_partial_last_line_not_committed()
+        test_peak_memory_bounded()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
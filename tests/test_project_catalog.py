@@ -0,0 +1,129 @@
+"""Unit tests for project_catalog module"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import project_catalog
+from project_catalog import (
+    ProjectCatalog, decode_project_dir, encode_project_path, project_display_name,
+    search_transcript_cwd, _resolve_on_disk,
+)
+
+
+def test_display_name_cross_platform():
+    """Test last-component extraction for POSIX and Windows paths"""
+    assert project_display_name("/home/user/my_repo") == "my_repo"
+    assert project_display_name("E:\\10_CLAUDE_CODE\\12_Monitor") == "12_Monitor"
+    print("[PASS] test_display_name_cross_platform passed")
+
+
+def test_decode_fallbacks():
+    """Test decoding when the path does not exist locally"""
+    assert decode_project_dir("-nonexistent-root-repo") == "/nonexistent/root/repo"
+    # C:\projects\app encodes to C--projects-app: one '-' per separator
+    assert encode_project_path("C:\\projects\\app") == "C--projects-app"
+    assert decode_project_dir("C--projects-app") == "C:\\projects\\app"
+    print("[PASS] test_decode_fallbacks passed")
+
+
+def test_resolve_on_disk_handles_dashes():
+    """Test that real directories with '-', '_' and '.' are recovered"""
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "my_repo" / "sub-dir.v2"
+        target.mkdir(parents=True)
+        rest = encode_project_path("my_repo/sub-dir.v2")
+
+        assert _resolve_on_disk(tmp, rest) == str(target)
+    print("[PASS] test_resolve_on_disk_handles_dashes passed")
+
+
+def test_cwd_preferred_and_totals_incremental():
+    """Test cwd decoding plus incremental session/byte bookkeeping"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp) / "-work-my-app"
+        project_dir.mkdir()
+        session = project_dir / "s1.jsonl"
+        session.write_text(json.dumps({"type": "user", "cwd": "/work/my-app"}) + "\n")
+
+        catalog = ProjectCatalog(Path(tmp) / "projects.json")
+        catalog.observe("-work-my-app", "s1.jsonl", session, session.stat())
+        catalog.finish_pass()
+        project = catalog.projects["-work-my-app"]
+
+        assert catalog.project_name(session) == "my-app"
+        assert project["session_count"] == 1
+        assert project["total_bytes"] == session.stat().st_size
+
+        with open(session, "a") as f:
+            f.write("{}\n")
+        catalog.observe("-work-my-app", "s1.jsonl", session, session.stat())
+        catalog.finish_pass()
+        assert project["total_bytes"] == session.stat().st_size
+
+        catalog.finish_pass()  # Session no longer observed
+        assert project["session_count"] == 0
+        assert project["total_bytes"] == 0
+
+        reloaded = ProjectCatalog(Path(tmp) / "projects.json")
+        assert reloaded.projects["-work-my-app"]["path"] == "/work/my-app"
+    print("[PASS] test_cwd_preferred_and_totals_incremental passed")
+
+
+def test_cwd_search_bounded_and_cached():
+    """Test that the cwd search reads a bounded prefix once and resumes on growth"""
+    saved = project_catalog._CWD_SEARCH_BYTES
+    project_catalog._CWD_SEARCH_BYTES = 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            big = Path(tmp) / "-work-big" / "s1.jsonl"
+            big.parent.mkdir()
+            big.write_text((json.dumps({"type": "user", "text": "x" * 40}) + "\n") * 200)
+            assert search_transcript_cwd(big) == (None, 1024)
+            assert search_transcript_cwd(big, 1024) == (None, 1024), "Nothing left to search"
+
+            catalog = ProjectCatalog(Path(tmp) / "projects.json")
+            catalog.observe("-work-big", "s1.jsonl", big, big.stat())
+            assert catalog._cwd_searched[str(big)] == 1024
+
+            small = Path(tmp) / "-work-small" / "s2.jsonl"
+            small.parent.mkdir()
+            small.write_text(json.dumps({"type": "user"}) + "\n")
+            catalog.observe("-work-small", "s2.jsonl", small, small.stat())
+            assert catalog._cwd_searched[str(small)] == small.stat().st_size
+
+            with open(small, "a") as f:
+                f.write(json.dumps({"type": "user", "cwd": "/work/small"}) + "\n")
+            catalog.observe("-work-small", "s2.jsonl", small, small.stat())
+            assert catalog.projects["-work-small"]["path"] == "/work/small"
+            assert str(small) not in catalog._cwd_searched
+
+            catalog.finish_pass()
+            big.unlink()
+            catalog.finish_pass()
+            assert str(big) not in catalog._cwd_searched, "Vanished transcripts are forgotten"
+        finally:
+            project_catalog._CWD_SEARCH_BYTES = saved
+    print("[PASS] test_cwd_search_bounded_and_cached passed")
+
+
+if __name__ == "__main__":
+    print("Running project_catalog tests...\n")
+
+    try:
+        test_display_name_cross_platform()
+        test_decode_fallbacks()
+        test_resolve_on_disk_handles_dashes()
+        test_cwd_preferred_and_totals_incremental()
+        test_cwd_search_bounded_and_cached()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
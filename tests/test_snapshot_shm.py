@@ -0,0 +1,181 @@
+"""Unit tests for snapshot_shm and snapshot_reader modules"""
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import Config
+from snapshot_reader import BODY_OFFSET, SEQ, SEQ_OFFSET, SnapshotReader
+from snapshot_shm import SnapshotPublisher, encode_body
+from usage_monitor import empty_snapshot
+
+READER = Path(__file__).parent.parent / "src" / "snapshot_reader.py"
+
+
+def _snapshot(percentage: float) -> dict:
+    snapshot = empty_snapshot()
+    snapshot.update({
+        "active": True, "session_path": "/p/-work-app/abc123.jsonl", "project": "app",
+        "model_id": "claude-opus-4-6", "model_name": "Opus 4.6", "tokens": int(percentage * 2000),
+        "percentage": percentage, "color": Config.COLOR_SAFE, "plan_limit": 200000,
+        "costs": {"session": 1.25, "today": 3.5},
+    })
+    return snapshot
+
+
+def test_reader_is_standalone():
+    """Test that the reader imports only the standard library"""
+    tree = ast.parse(READER.read_text(encoding="utf-8"))
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            assert node.level == 0, "relative import in snapshot_reader"
+            modules.add(node.module.split(".")[0])
+    src_modules = {path.stem for path in READER.parent.glob("*.py")}
+    assert not modules & src_modules, modules & src_modules
+    print("[PASS] test_reader_is_standalone passed")
+
+
+def test_publish_and_read():
+    """Test a round trip through the segment, including the stopped flag"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "segment"
+        publisher = SnapshotPublisher(path)
+        reader = SnapshotReader(path)
+        assert reader.read() is None  # mapped but nothing published
+
+        publisher.publish(_snapshot(42.5))
+        snap = reader.read()
+        assert snap["active"] and not snap["stopped"]
+        assert snap["tokens"] == 85000 and snap["percentage"] == 42.5
+        assert snap["project"] == "app" and snap["session_id"] == "abc123"
+        assert snap["costs"] == {"session": 1.25, "today": 3.5}
+        first_seq = snap["sequence"]
+
+        publisher.publish(empty_snapshot())
+        assert not reader.read()["active"]
+        publisher.close()
+        assert reader.read()["stopped"]
+
+        # A restarted monitor continues the sequence
+        SnapshotPublisher(path).publish(_snapshot(50.0))
+        assert reader.read()["sequence"] > first_seq + 4
+        reader.close()
+    print("[PASS] test_publish_and_read passed")
+
+
+def test_torn_reads_rejected():
+    """Test that a write in progress or a torn body is never returned"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "segment"
+        publisher = SnapshotPublisher(path)
+        publisher.publish(_snapshot(10.0))
+        reader = SnapshotReader(path)
+
+        seq = publisher._seq
+        SEQ.pack_into(publisher._mm, SEQ_OFFSET, seq + 1)  # writer "stuck" mid-write
+        assert reader.read() is None
+        SEQ.pack_into(publisher._mm, SEQ_OFFSET, seq)
+        publisher._mm[BODY_OFFSET + 40] ^= 0xFF  # corrupt the body, sequence intact
+        assert reader.read() is None
+        reader.close()
+    print("[PASS] test_torn_reads_rejected passed")
+
+
+def test_symlink_and_foreign_segments_refused():
+    """Test that the publisher never follows a symlink or writes a file it does not own"""
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "victim"
+        target.write_bytes(b"keep")
+        link = Path(tmp) / "segment"
+        link.symlink_to(target)
+        try:
+            SnapshotPublisher(link)
+            assert False, "Expected OSError for a symlinked segment"
+        except OSError:
+            pass
+        assert target.read_bytes() == b"keep"
+
+        if hasattr(os, "getuid") and os.getuid() == 0:
+            foreign = Path(tmp) / "foreign"
+            foreign.write_bytes(b"")
+            os.chown(foreign, 12345, 12345)
+            try:
+                SnapshotPublisher(foreign)
+                assert False, "Expected OSError for a segment owned by another user"
+            except OSError as e:
+                assert "owned by" in str(e)
+    print("[PASS] test_symlink_and_foreign_segments_refused passed")
+
+
+def test_second_writer_refused():
+    """Test that a segment published by another running monitor is not taken over"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "segment"
+        other = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        try:
+            publisher = SnapshotPublisher(path)
+            body = bytearray(encode_body(_snapshot(30.0)))
+            body[4:8] = other.pid.to_bytes(4, "little")  # as if written by the other process
+            body[0:4] = zlib.crc32(body[4:]).to_bytes(4, "little")
+            publisher._mm[BODY_OFFSET:BODY_OFFSET + len(body)] = body
+            SEQ.pack_into(publisher._mm, SEQ_OFFSET, publisher._seq + 2)
+            publisher._mm.close()
+
+            try:
+                SnapshotPublisher(path)
+                assert False, "Expected OSError while the other writer is running"
+            except OSError as e:
+                assert str(other.pid) in str(e)
+            assert SnapshotReader(path).read()["pid"] == other.pid
+        finally:
+            other.kill()
+            other.wait()
+        SnapshotPublisher(path).publish(_snapshot(40.0))  # writer gone: take over
+        assert SnapshotReader(path).read()["pid"] == os.getpid()
+    print("[PASS] test_second_writer_refused passed")
+
+
+def test_reader_cli():
+    """Test the reader command line with a custom format"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "segment"
+        publisher = SnapshotPublisher(path)
+        publisher.publish(_snapshot(42.5))
+        result = subprocess.run(
+            [sys.executable, "-S", str(READER), "--path", str(path), "--format", "{percentage:.0f}% {project}"],
+            capture_output=True, text=True, timeout=30,
+        )
+        assert result.returncode == 0 and result.stdout.strip() == "42% app", result
+        missing = subprocess.run([sys.executable, "-S", str(READER), "--path", str(Path(tmp) / "none")],
+                                 capture_output=True, text=True, timeout=30)
+        assert missing.returncode == 1 and missing.stdout == ""
+    print("[PASS] test_reader_cli passed")
+
+
+if __name__ == "__main__":
+    print("Running snapshot_shm tests...\n")
+
+    try:
+        test_reader_is_standalone()
+        test_publish_and_read()
+        test_torn_reads_rejected()
+        test_symlink_and_foreign_segments_refused()
+        test_second_writer_refused()
+        test_reader_cli()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
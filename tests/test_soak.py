@@ -0,0 +1,86 @@
+"""Unit tests for soak module"""
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from soak import SoakRunner, TranscriptFeeder, check_budgets
+
+
+def test_check_budgets():
+    """Test that only exceeded, enabled budgets are reported"""
+    report = {"traced_growth_mb": 3.0, "rss_growth_mb": None, "cpu_pct": 0.2}
+    violations = check_budgets(report, {"traced_growth_mb": 1.0, "rss_growth_mb": 5.0, "cpu_pct": 1.0})
+    assert len(violations) == 1 and "traced memory" in violations[0], violations
+    assert check_budgets(report, {"traced_growth_mb": 0, "cpu_pct": 0.1}) != []
+    assert check_budgets(report, {}) == []
+    print("[PASS] test_check_budgets passed")
+
+
+def test_runner_detects_leak():
+    """Test that a leaking tick shows up as growth at its allocation site"""
+    leak = []
+
+    def tick():
+        leak.append(bytearray(4096))
+
+    report = SoakRunner(tick, sample_every=50, warmup=10).run(210)
+    assert report["ticks"] == 210
+    assert report["traced_growth_mb"] > 0.5, report["traced_growth_mb"]
+    assert report["growth_sites"][0]["site"].endswith("test_soak.py:" + str(tick.__code__.co_firstlineno + 1))
+    assert check_budgets(report, {"traced_growth_mb": 0.5}) != []
+    print("[PASS] test_runner_detects_leak passed")
+
+
+def test_cpu_untraced_and_harness_excluded():
+    """Test that CPU is timed with tracing off and the runner's own samples are not growth"""
+    tracing = []
+
+    def tick():
+        tracing.append(tracemalloc.is_tracing())
+
+    runner = SoakRunner(tick, sample_every=1, warmup=5, cpu_ticks=50)
+    report = runner.run(150)
+    assert tracing[:150] == [True] * 150
+    assert tracing[150:] == [False] * 50 and report["cpu_ticks"] == 50
+    # 146 sample dicts were added after the baseline; none may count as growth
+    assert len(report["samples"]) == 146
+    sites = [Path(site["site"].rsplit(":", 1)[0]).name for site in report["growth_sites"]]
+    assert "soak.py" not in sites, report["growth_sites"]
+    print("[PASS] test_cpu_untraced_and_harness_excluded passed")
+
+
+def test_feeder_rotates_sessions():
+    """Test that the feeder starts a new session and removes the old one"""
+    with tempfile.TemporaryDirectory() as tmp:
+        feeder = TranscriptFeeder(Path(tmp) / "-soak", lines_per_tick=4, rotate_lines=10)
+        first = feeder.path
+        for _ in range(3):
+            feeder.feed()
+        feeder.close()
+
+        assert feeder.sessions == 2
+        assert not first.exists() and feeder.path.exists()
+        assert feeder.path.read_bytes().count(b"\n") == 2
+    print("[PASS] test_feeder_rotates_sessions passed")
+
+
+if __name__ == "__main__":
+    print("Running soak tests...\n")
+
+    try:
+        test_check_budgets()
+        test_runner_detects_leak()
+        test_cpu_untraced_and_harness_excluded()
+        test_feeder_rotates_sessions()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
@@ -5,7 +5,7 @@ from pathlib import Path
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from token_calculator import TokenCalculator
+from token_calculator import TokenCalculator, NUMPY_AVAILABLE
 from config import Config
 
 
@@ -59,6 +59,48 @@ def test_get_usage_data():
     print("[PASS] test_get_usage_data passed")
 
 
+def _assert_batch_matches_scalar(use_numpy):
+    """Compare the batch API against the scalar methods"""
+    calc = TokenCalculator(plan_limit=200000)
+    tokens = [0, 139999, 140000, 179999, 180000, 189999, 190000, 250000, 1000, 44000]
+    limits = [200000] * 8 + [88000, 88000]
+    batch = calc.get_usage_data_batch(tokens, limits, use_numpy=use_numpy)
+
+    for i, (tok, limit) in enumerate(zip(tokens, limits)):
+        scalar = TokenCalculator(plan_limit=limit).get_usage_data(tok)
+        assert batch["percentage"][i] == scalar["percentage"], f"Percentage mismatch at {i}"
+        assert batch["color"][i] == scalar["color"], f"Color mismatch at {i}"
+        assert bool(batch["compress_enabled"][i]) == scalar["compress_enabled"], f"Compress mismatch at {i}"
+
+    crossing_indices = [c[0] for c in batch["crossings"]]
+    assert crossing_indices == [2, 4, 6, 8], f"Unexpected crossings {batch['crossings']}"
+
+
+def test_batch_matches_scalar_fallback():
+    """Test stdlib batch backend against scalar methods"""
+    _assert_batch_matches_scalar(use_numpy=False)
+    print("[PASS] test_batch_matches_scalar_fallback passed")
+
+
+def test_batch_matches_scalar_numpy():
+    """Test NumPy batch backend against scalar methods (skipped without numpy)"""
+    if not NUMPY_AVAILABLE:
+        print("[SKIP] test_batch_matches_scalar_numpy skipped (numpy not installed)")
+        return
+    _assert_batch_matches_scalar(use_numpy=True)
+    print("[PASS] test_batch_matches_scalar_numpy passed")
+
+
+def test_batch_single_limit():
+    """Test batch API with the calculator's own plan limit"""
+    calc = TokenCalculator(plan_limit=88000)
+    batch = calc.get_usage_data_batch([44000, 88000])
+
+    assert abs(batch["percentage"][0] - 50.0) < 0.01
+    assert batch["color"][1] == Config.COLOR_CRITICAL
+    print("[PASS] test_batch_single_limit passed")
+
+
 if __name__ == "__main__":
     print("Running token_calculator tests...\n")
 
@@ -67,6 +109,9 @@ if __name__ == "__main__":
         test_color_thresholds()
         test_compress_threshold()
         test_get_usage_data()
+        test_batch_matches_scalar_fallback()
+        test_batch_matches_scalar_numpy()
+        test_batch_single_limit()
 
         print("\n[SUCCESS] All tests passed!")
     except AssertionError as e:
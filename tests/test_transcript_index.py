@@ -0,0 +1,341 @@
+"""Unit tests for transcript_index module"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from transcript_index import INDEX_MAGIC, TranscriptIndex, encode_varint, decode_varint
+
+
+def _line(entry: dict) -> str:
+    return json.dumps(entry) + "\n"
+
+
+def _assistant(tokens: int, model: str = "claude-opus-4-6") -> str:
+    return _line({
+        "type": "assistant",
+        "message": {"model": model, "usage": {"input_tokens": tokens}},
+    })
+
+
+def _boundary(pre_tokens: int) -> str:
+    return _line({
+        "type": "system",
+        "subtype": "compact_boundary",
+        "compactMetadata": {"trigger": "manual", "preTokens": pre_tokens},
+    })
+
+
+def test_varint_roundtrip():
+    """Test varint encoding of small and large values"""
+    buf = bytearray()
+    values = [0, 1, 127, 128, 300, 2 ** 40]
+    for value in values:
+        encode_varint(value, buf)
+
+    pos = 0
+    for value in values:
+        decoded, pos = decode_varint(buf, pos)
+        assert decoded == value, f"Expected {value}, got {decoded}"
+    assert pos == len(buf)
+    print("[PASS] test_varint_roundtrip passed")
+
+
+def test_incremental_update_and_reload():
+    """Test that updates only index appended lines and survive a reload"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "session.jsonl"
+        index_file = Path(tmp) / "session.idx"
+        transcript.write_text(_line({"type": "user"}) + _assistant(1000))
+
+        index = TranscriptIndex(transcript, index_file)
+        assert index.update() == 1
+        assert index.latest_tokens == 1000
+        assert index.update() == 0, "Unchanged transcript should add nothing"
+
+        with open(transcript, "a") as f:
+            f.write(_assistant(2500, "claude-sonnet-4-6"))
+        assert index.update() == 1
+        assert index.latest_model == "claude-sonnet-4-6"
+
+        reloaded = TranscriptIndex(transcript, index_file)
+        reloaded.load()
+        assert list(reloaded.entry_offsets) == list(index.entry_offsets)
+        assert reloaded.latest_tokens == 2500
+        assert reloaded.scanned_offset == transcript.stat().st_size
+    print("[PASS] test_incremental_update_and_reload passed")
+
+
+def test_compaction_boundaries():
+    """Test compaction offsets and reclaimed tokens"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "session.jsonl"
+        transcript.write_text(
+            _assistant(150000) + _boundary(152000) + _assistant(30000) + _boundary(90000)
+        )
+
+        index = TranscriptIndex(transcript, Path(tmp) / "session.idx")
+        index.update()
+        compactions = index.compactions()
+
+        assert len(compactions) == 2
+        assert compactions[0]["reclaimed"] == 122000
+        assert compactions[1]["post_tokens"] is None
+        assert index.latest_boundary_offset == compactions[1]["offset"]
+    print("[PASS] test_compaction_boundaries passed")
+
+
+def test_truncated_transcript_rebuilds():
+    """Test that a shrunken transcript triggers a rebuild"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "session.jsonl"
+        transcript.write_text(_assistant(100) + _assistant(200))
+
+        index = TranscriptIndex(transcript, Path(tmp) / "session.idx")
+        index.update()
+        transcript.write_text(_assistant(5))
+        index.update()
+
+        assert list(index.entry_tokens) == [5]
+    print("[PASS] test_truncated_transcript_rebuilds passed")
+
+
+def _cached(message_id: str, uncached: int, read: int, write: int) -> str:
+    return _line({
+        "type": "assistant",
+        "message": {"id": message_id, "usage": {
+            "input_tokens": uncached, "output_tokens": 10, "cache_read_input_tokens": read,
+            "cache_creation": {"ephemeral_5m_input_tokens": write},
+        }},
+    })
+
+
+def test_cache_stats():
+    """Test rolling and session cache-hit ratios with split messages"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "session.jsonl"
+        index_file = Path(tmp) / "session.idx"
+        transcript.write_text(
+            _cached("m1", 100, 0, 9900)          # cold start: everything written
+            + _cached("m2", 100, 9900, 0)
+            + _cached("m2", 100, 9900, 0)        # second line of the same message
+            + _cached("m3", 100, 9900, 1000)
+        )
+        index = TranscriptIndex(transcript, index_file)
+        index.update()
+
+        stats = index.cache_stats(window=2)
+        assert stats["window_turns"] == 2
+        assert abs(stats["hit_ratio"] - 19800 / 21000) < 1e-9, stats
+        assert stats["cache_write_tokens"] == 10900  # m2 counted once
+        assert stats["cache_read_tokens"] == 19800
+        assert abs(stats["session_hit_ratio"] - 19800 / 31000) < 1e-9
+
+        reloaded = TranscriptIndex(transcript, index_file)
+        reloaded.load()
+        assert reloaded.cache_stats(window=2) == stats
+        assert TranscriptIndex(Path(tmp) / "none.jsonl").cache_stats(5)["hit_ratio"] is None
+    print("[PASS] test_cache_stats passed")
+
+
+def test_old_index_version_rebuilt():
+    """Test that an index written by an older layout is ignored"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "session.jsonl"
+        index_file = Path(tmp) / "session.idx"
+        transcript.write_text(_assistant(100))
+        index_file.write_bytes(INDEX_MAGIC + bytes([1]) + b"\x02\x00\x05\x00\x01\x50")
+
+        index = TranscriptIndex(transcript, index_file)
+        assert not index.load()
+        index.update()
+        assert list(index.entry_tokens) == [100]
+    print("[PASS] test_old_index_version_rebuilt passed")
+
+
+def test_message_split_across_reload():
+    """Test that a message continued after a reload is not counted twice"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "session.jsonl"
+        index_file = Path(tmp) / "session.idx"
+        transcript.write_text(_cached("m1", 100, 0, 9900))
+        TranscriptIndex(transcript, index_file).update()
+
+        with open(transcript, "a") as f:
+            f.write(_cached("m1", 100, 0, 9900))
+        reloaded = TranscriptIndex(transcript, index_file)
+        reloaded.update()
+        assert list(reloaded.entry_continues) == [0, 1]
+        assert reloaded.cache_write_total == 9900, "m1 must be counted once"
+    print("[PASS] test_message_split_across_reload passed")
+
+
+def test_concurrent_writers_keep_sidecar_valid():
+    """Test that two indexes updating one sidecar never corrupt it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "session.jsonl"
+        index_file = Path(tmp) / "session.idx"
+        transcript.write_text(_assistant(100))
+        first = TranscriptIndex(transcript, index_file)
+        second = TranscriptIndex(transcript, index_file)
+        second.load()  # loaded before the first one writes anything
+
+        first.update()
+        with open(transcript, "a") as f:
+            f.write(_assistant(200))
+        second.update()  # rewrites the sidecar from its own state
+        with open(transcript, "a") as f:
+            f.write(_assistant(300))
+        first.update()   # would have appended deltas onto the other's records
+
+        reloaded = TranscriptIndex(transcript, index_file)
+        assert reloaded.load()
+        assert list(reloaded.entry_tokens) == [100, 200, 300]
+        assert list(reloaded.entry_offsets) == list(first.entry_offsets)
+        assert reloaded.scanned_offset == transcript.stat().st_size
+        assert [p.name for p in Path(tmp).iterdir() if p.suffix == ".tmp"] == []
+    print("[PASS] test_concurrent_writers_keep_sidecar_valid passed")
+
+
+def test_updates_append_in_place():
+    """Test that updates append to the sidecar instead of rewriting it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "session.jsonl"
+        index_file = Path(tmp) / "session.idx"
+        transcript.write_text(_assistant(100) + _assistant(200))
+        index = TranscriptIndex(transcript, index_file)
+        index.update()
+        before = index_file.stat()
+        head = index_file.read_bytes()
+
+        with open(transcript, "a") as f:
+            f.write(_assistant(300))
+        index.update()
+        after = index_file.stat()
+        assert after.st_ino == before.st_ino, "Sidecar was replaced, not appended to"
+        assert index_file.read_bytes()[:len(head)] == head
+        assert 0 < after.st_size - before.st_size < 20
+
+        # Lock held by another writer: records wait for the next append
+        lock = index_file.with_name(index_file.name + ".lock")
+        lock.touch()
+        with open(transcript, "a") as f:
+            f.write(_assistant(400))
+        index.update()
+        assert index_file.stat().st_size == after.st_size and index._unwritten
+        lock.unlink()
+        with open(transcript, "a") as f:
+            f.write(_assistant(500))
+        index.update()
+        reloaded = TranscriptIndex(transcript, index_file)
+        reloaded.load()
+        assert list(reloaded.entry_tokens) == [100, 200, 300, 400, 500]
+    print("[PASS] test_updates_append_in_place passed")
+
+
+def test_stale_files_and_torn_tail_cleaned_on_load():
+    """Test that orphaned temp/lock files are removed and a torn tail is cut off"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "session.jsonl"
+        index_file = Path(tmp) / "session.idx"
+        transcript.write_text(_assistant(100))
+        TranscriptIndex(transcript, index_file).update()
+        committed = index_file.read_bytes()
+        with open(index_file, "ab") as f:
+            f.write(b"\x02\x80")  # torn record from a crashed writer
+
+        old = time.time() - 3600
+        orphan = index_file.with_name(index_file.name + ".4242.tmp")
+        lock = index_file.with_name(index_file.name + ".lock")
+        recent = index_file.with_name(index_file.name + ".4343.tmp")
+        for path in (orphan, lock, recent):
+            path.write_bytes(b"x")
+        os.utime(orphan, (old, old))
+        os.utime(lock, (old, old))
+
+        index = TranscriptIndex(transcript, index_file)
+        assert index.load()
+        assert not orphan.exists() and not lock.exists()
+        assert recent.exists(), "A writer's in-progress temp file must be left alone"
+        assert index_file.read_bytes() == committed
+
+        with open(transcript, "a") as f:
+            f.write(_assistant(200))
+        index.update()
+        reloaded = TranscriptIndex(transcript, index_file)
+        reloaded.load()
+        assert list(reloaded.entry_tokens) == [100, 200]
+    print("[PASS] test_stale_files_and_torn_tail_cleaned_on_load passed")
+
+
+def _sidechain(tokens: int, agent: str) -> str:
+    return _line({
+        "type": "assistant",
+        "isSidechain": True,
+        "agentId": agent,
+        "message": {"model": "claude-haiku-4-5", "usage": {"input_tokens": tokens}},
+    })
+
+
+def test_sidechain_streams():
+    """Test that sidechain entries get their own streams and never become the latest usage"""
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "session.jsonl"
+        index_file = Path(tmp) / "session.idx"
+        transcript.write_text(_assistant(90000) + _sidechain(4000, "a1") + _sidechain(6000, "a1"))
+
+        index = TranscriptIndex(transcript, index_file)
+        assert index.update() == 3
+        assert index.latest_tokens == 90000, "Subagent usage must not replace the main context"
+        assert index.latest_model == "claude-opus-4-6"
+        assert len(index.entry_offsets) == 1 and len(index.usage_offsets) == 3
+
+        with open(transcript, "a") as f:
+            f.write(_sidechain(2000, "b2"))
+        index.update()
+        streams = index.sidechains()
+        assert [s["agent"] for s in streams] == ["b2", "a1"]
+        assert streams[1]["tokens"] == 6000 and streams[1]["entries"] == 2
+        assert all(s["active"] for s in streams)
+
+        with open(transcript, "a") as f:
+            f.write(_assistant(95000))
+        index.update()
+        assert index.latest_tokens == 95000
+        assert not any(s["active"] for s in index.sidechains())
+
+        reloaded = TranscriptIndex(transcript, index_file)
+        assert reloaded.load()
+        assert reloaded.sidechains() == index.sidechains()
+        assert list(reloaded.usage_offsets) == list(index.usage_offsets)
+    print("[PASS] test_sidechain_streams passed")
+
+
+if __name__ == "__main__":
+    print("Running transcript_index tests...\n")
+
+    try:
+        test_varint_roundtrip()
+        test_incremental_update_and_reload()
+        test_compaction_boundaries()
+        test_truncated_transcript_rebuilds()
+        test_cache_stats()
+        test_old_index_version_rebuilt()
+        test_message_split_across_reload()
+        test_concurrent_writers_keep_sidecar_valid()
+        test_updates_append_in_place()
+        test_stale_files_and_torn_tail_cleaned_on_load()
+        test_sidechain_streams()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
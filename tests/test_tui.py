@@ -0,0 +1,83 @@
+"""Unit tests for tui module"""
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import Config
+from tui import build_frame, diff_frames
+from usage_monitor import empty_snapshot
+
+
+def _active_snapshot(percentage: float) -> dict:
+    snapshot = empty_snapshot()
+    snapshot.update({
+        "active": True, "project": "app", "model_name": "Sonnet 4.5",
+        "tokens": int(percentage * 2000), "percentage": percentage,
+        "color": Config.COLOR_SAFE, "plan_limit": 200000,
+    })
+    return snapshot
+
+
+def test_frame_dimensions():
+    """Test that frames always fill the screen and keep the footer last"""
+    for width, height in ((40, 12), (10, 3), (80, 2)):
+        frame = build_frame(_active_snapshot(42.0), width, height, bar_chars=("#", "-"))
+        assert len(frame) == height
+        assert all(len(row) == width for row in frame)
+        assert "".join(ch for ch, _ in frame[-1]).startswith("q quit"[:width])
+    print("[PASS] test_frame_dimensions passed")
+
+
+def test_unchanged_frame_writes_nothing():
+    """Test that an identical frame produces no runs"""
+    frame = build_frame(_active_snapshot(42.0), 40, 12, bar_chars=("#", "-"))
+    again = build_frame(_active_snapshot(42.0), 40, 12, bar_chars=("#", "-"))
+    assert diff_frames(frame, again) == []
+    print("[PASS] test_unchanged_frame_writes_nothing passed")
+
+
+def test_diff_only_changed_cells():
+    """Test that a percentage change rewrites only the cells that differ"""
+    old = build_frame(_active_snapshot(42.0), 40, 12, bar_chars=("#", "-"))
+    new = build_frame(_active_snapshot(43.0), 40, 12, bar_chars=("#", "-"))
+    runs = diff_frames(old, new)
+    assert runs
+    written = sum(len(text) for _, _, text, _ in runs)
+    assert written < 40, written  # a full redraw would be 480 cells
+
+    # Applying the runs to the old frame reproduces the new one
+    patched = [list(row) for row in old]
+    for y, x, text, style in runs:
+        for i, ch in enumerate(text):
+            patched[y][x + i] = (ch, style)
+    assert patched == new
+    print("[PASS] test_diff_only_changed_cells passed")
+
+
+def test_resize_redraws_everything():
+    """Test that a size change (or no previous frame) redraws every cell"""
+    old = build_frame(_active_snapshot(42.0), 40, 12, bar_chars=("#", "-"))
+    new = build_frame(_active_snapshot(42.0), 50, 12, bar_chars=("#", "-"))
+    assert sum(len(text) for _, _, text, _ in diff_frames(old, new)) == 50 * 12
+    assert sum(len(text) for _, _, text, _ in diff_frames(None, old)) == 40 * 12
+    print("[PASS] test_resize_redraws_everything passed")
+
+
+if __name__ == "__main__":
+    print("Running tui tests...\n")
+
+    try:
+        test_frame_dimensions()
+        test_unchanged_frame_writes_nothing()
+        test_diff_only_changed_cells()
+        test_resize_redraws_everything()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
@@ -0,0 +1,208 @@
+"""Unit tests for usage_export module"""
+import csv
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import usage_export
+from config import Config
+from usage_export import ColumnChunk, PYARROW_AVAILABLE, export_usage, resolve_format
+
+
+def _assistant(message_id: str, output: int, timestamp: str) -> str:
+    return json.dumps({
+        "type": "assistant",
+        "timestamp": timestamp,
+        "message": {"id": message_id, "model": "claude-opus-4-6",
+                    "usage": {"input_tokens": 100, "output_tokens": output}},
+    }) + "\n"
+
+
+def _with_projects_dir(test):
+    """Run a test against a temporary CLAUDE_PROJECTS_DIR"""
+    def wrapper():
+        original = Config.CLAUDE_PROJECTS_DIR
+        with tempfile.TemporaryDirectory() as tmp:
+            Config.CLAUDE_PROJECTS_DIR = Path(tmp) / "projects"
+            try:
+                test(Path(tmp))
+            finally:
+                Config.CLAUDE_PROJECTS_DIR = original
+    wrapper.__name__ = test.__name__
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+
+def test_column_chunk_dictionary_encoding():
+    """Test that string columns are dictionary-encoded per chunk"""
+    chunk = ColumnChunk()
+    chunk.append((1, "a", "s1", "m", 0, 1, 2, 3, 4, 5, 15))
+    chunk.append((2, "a", "s2", "m", 9, 1, 2, 3, 4, 5, 15))
+
+    assert len(chunk) == 2
+    assert chunk.dictionaries["project"] == ["a"]
+    assert chunk.column_values("session") == ["s1", "s2"]
+    assert chunk.columns["offset"].typecode == "q"
+    chunk.clear()
+    assert len(chunk) == 0
+    print("[PASS] test_column_chunk_dictionary_encoding passed")
+
+
+@_with_projects_dir
+def test_csv_export_dedupes_and_filters(tmp: Path):
+    """Test CSV export with message-id dedupe and project/since pushdown"""
+    wanted = Config.CLAUDE_PROJECTS_DIR / "-work-app"
+    other = Config.CLAUDE_PROJECTS_DIR / "-work-other"
+    wanted.mkdir(parents=True)
+    other.mkdir()
+    (wanted / "s1.jsonl").write_text(
+        _assistant("msg_1", 5, "2026-01-01T00:00:00Z")
+        + _assistant("msg_1", 50, "2026-01-01T00:00:01Z")
+        + _assistant("msg_2", 7, "2026-01-01T00:00:02Z")
+    )
+    (other / "s2.jsonl").write_text(_assistant("msg_3", 1, "2026-01-01T00:00:00Z"))
+    stale = wanted / "old.jsonl"
+    stale.write_text(_assistant("msg_4", 1, "2020-01-01T00:00:00Z"))
+    os.utime(stale, (0, 0))
+
+    output = tmp / "usage.csv"
+    since = datetime(2025, 12, 31, tzinfo=timezone.utc).timestamp()
+    count = export_usage(output, "csv", since=since, project="app", chunk_rows=1)
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert count == 2, f"Expected 2 records, got {count}"
+    assert [r["output"] for r in rows] == ["50", "7"], "Last line of each message should win"
+    assert {r["session"] for r in rows} == {"s1"}
+    print("[PASS] test_csv_export_dedupes_and_filters passed")
+
+
+def test_resolve_format_without_pyarrow():
+    """Test that auto falls back to CSV and explicit pyarrow formats fail without pyarrow"""
+    saved = usage_export.PYARROW_AVAILABLE
+    usage_export.PYARROW_AVAILABLE = False
+    try:
+        assert resolve_format("auto", Path("usage.parquet")) == "csv"
+        try:
+            resolve_format("parquet", Path("usage.parquet"))
+            assert False, "Expected RuntimeError"
+        except RuntimeError as e:
+            assert "requirements-export.txt" in str(e)
+    finally:
+        usage_export.PYARROW_AVAILABLE = saved
+    print("[PASS] test_resolve_format_without_pyarrow passed")
+
+
+@_with_projects_dir
+def test_parquet_and_arrow_export(tmp: Path):
+    """Test Parquet and Arrow IPC export round trips (skipped without pyarrow)"""
+    if not PYARROW_AVAILABLE:
+        print("[SKIP] test_parquet_and_arrow_export skipped (pyarrow not installed)")
+        return
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+
+    project = Config.CLAUDE_PROJECTS_DIR / "-work-app"
+    project.mkdir(parents=True)
+    (project / "s1.jsonl").write_text(
+        _assistant("msg_1", 5, "2026-01-01T00:00:00Z")
+        + _assistant("msg_2", 7, "2026-01-01T00:00:02Z")
+        + _assistant("msg_3", 9, "2026-01-01T00:00:04Z")
+    )
+
+    parquet_path = tmp / "usage.parquet"
+    assert export_usage(parquet_path, "auto", chunk_rows=2) == 3
+    table = pq.read_table(parquet_path)
+    assert table.column("output").to_pylist() == [5, 7, 9]
+    assert set(table.column("session").to_pylist()) == {"s1"}
+
+    arrow_path = tmp / "usage.arrow"
+    assert export_usage(arrow_path, "auto", chunk_rows=2) == 3
+    with pyarrow.ipc.open_file(str(arrow_path)) as reader:
+        table = reader.read_all()
+    assert table.column("output").to_pylist() == [5, 7, 9]
+    assert table.num_rows == 3
+    print("[PASS] test_parquet_and_arrow_export passed")
+
+
+@_with_projects_dir
+def test_arrow_export_dictionaries_grow_across_chunks(tmp: Path):
+    """Test chunks whose project/session/model dictionaries differ (skipped without pyarrow)"""
+    if not PYARROW_AVAILABLE:
+        print("[SKIP] test_arrow_export_dictionaries_grow_across_chunks skipped (pyarrow not installed)")
+        return
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+
+    for i, name in enumerate(("-work-app", "-work-other", "-work-third")):
+        project = Config.CLAUDE_PROJECTS_DIR / name
+        project.mkdir(parents=True)
+        (project / f"s{i}.jsonl").write_text(
+            _assistant(f"msg_{i}a", 10 * i + 1, "2026-01-01T00:00:00Z")
+            + _assistant(f"msg_{i}b", 10 * i + 2, "2026-01-01T00:00:01Z")
+            + _assistant(f"msg_{i}c", 10 * i + 3, "2026-01-01T00:00:02Z")
+        )
+
+    expected = None
+    for suffix in ("arrow", "parquet"):
+        output = tmp / f"usage.{suffix}"
+        assert export_usage(output, suffix, chunk_rows=2) == 9
+        if suffix == "arrow":
+            with pyarrow.ipc.open_file(str(output)) as reader:
+                assert reader.num_record_batches == 5
+                table = reader.read_all()
+        else:
+            table = pq.read_table(output)
+        rows = sorted(zip(table.column("session").to_pylist(), table.column("output").to_pylist()))
+        expected = expected or rows
+        assert rows == expected
+    assert len({session for session, _ in expected}) == 3
+    assert sorted(output for _, output in expected) == [1, 2, 3, 11, 12, 13, 21, 22, 23]
+    print("[PASS] test_arrow_export_dictionaries_grow_across_chunks passed")
+
+
+@_with_projects_dir
+def test_failed_export_removes_output(tmp: Path):
+    """Test that an export that raises leaves no partial file behind"""
+    def failing(since=None, project=None):
+        yield (1, "a", "s1", "m", 0, 1, 2, 3, 4, 5, 15)
+        raise OSError("disk went away")
+
+    saved = usage_export.iter_usage_records
+    usage_export.iter_usage_records = failing
+    output = tmp / "usage.csv"
+    try:
+        export_usage(output, "csv", chunk_rows=1)
+        assert False, "Expected OSError"
+    except OSError:
+        pass
+    finally:
+        usage_export.iter_usage_records = saved
+    assert not output.exists()
+    print("[PASS] test_failed_export_removes_output passed")
+
+
+if __name__ == "__main__":
+    print("Running usage_export tests...\n")
+
+    try:
+        test_column_chunk_dictionary_encoding()
+        test_csv_export_dedupes_and_filters()
+        test_resolve_format_without_pyarrow()
+        test_parquet_and_arrow_export()
+        test_arrow_export_dictionaries_grow_across_chunks()
+        test_failed_export_removes_output()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)
@@ -0,0 +1,170 @@
+"""Unit tests for usage_monitor module"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import cost_ledger
+import project_catalog
+from config import Config
+from project_catalog import ProjectCatalog
+from transcript_index import TranscriptIndex
+from usage_monitor import UsageMonitor, empty_snapshot, format_snapshot, format_subagents
+
+
+def _assistant(tokens: int) -> str:
+    return json.dumps({
+        "type": "assistant",
+        "cwd": "/work/app",
+        "message": {"model": "claude-opus-4-6", "usage": {"input_tokens": tokens}},
+    }) + "\n"
+
+
+def _with_projects_dir(test):
+    """Run a test against a temporary CLAUDE_PROJECTS_DIR, catalog and index dir"""
+    def wrapper():
+        saved = (Config.CLAUDE_PROJECTS_DIR, Config.CLAUDE_PROJECTS_DIRS, Config.INDEX_DIR,
+                 project_catalog._catalog)
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            Config.CLAUDE_PROJECTS_DIR = tmp / "projects"
+            Config.CLAUDE_PROJECTS_DIRS = []
+            Config.INDEX_DIR = tmp / "index"
+            project_catalog._catalog = ProjectCatalog(tmp / "projects.json")
+            try:
+                test(tmp)
+            finally:
+                (Config.CLAUDE_PROJECTS_DIR, Config.CLAUDE_PROJECTS_DIRS, Config.INDEX_DIR,
+                 project_catalog._catalog) = saved
+    wrapper.__name__ = test.__name__
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+
+@_with_projects_dir
+def test_subscribers_only_see_changes(tmp: Path):
+    """Test that subscribers are called once per changed snapshot and never on idle polls"""
+    monitor = UsageMonitor()
+    seen = []
+    monitor.subscribe(seen.append)
+    assert monitor.poll() is None, "No session: still the empty snapshot"
+    assert seen == []
+
+    path = Config.CLAUDE_PROJECTS_DIR / "-work-app" / "s1.jsonl"
+    path.parent.mkdir(parents=True)
+    path.write_text(_assistant(40000))
+    snapshot = monitor.poll()
+    assert snapshot is not None and seen == [snapshot]
+    assert snapshot["active"] and snapshot["tokens"] == 40000
+    assert snapshot["session_path"] == str(path)
+    assert snapshot["project"] == "app"
+
+    assert monitor.poll() is None and len(seen) == 1, "Unchanged transcript must not notify"
+
+    with open(path, "a") as f:
+        f.write(json.dumps({"type": "user"}) + "\n")
+    assert monitor.poll() is None, "Lines without usage leave the snapshot unchanged"
+
+    with open(path, "a") as f:
+        f.write(_assistant(52000))
+    assert monitor.poll()["tokens"] == 52000
+    assert len(seen) == 2
+
+    monitor.unsubscribe(seen.append)
+    with open(path, "a") as f:
+        f.write(_assistant(60000))
+    assert monitor.poll() is not None
+    assert len(seen) == 2, "Unsubscribed callback must not be called"
+    print("[PASS] test_subscribers_only_see_changes passed")
+
+
+@_with_projects_dir
+def test_pushed_session_is_pinned(tmp: Path):
+    """Test that a pushed session is read even when another transcript is newer"""
+    project = Config.CLAUDE_PROJECTS_DIR / "-work-app"
+    project.mkdir(parents=True)
+    pushed = project / "pushed.jsonl"
+    newer = project / "newer.jsonl"
+    pushed.write_text(_assistant(1000))
+    newer.write_text(_assistant(2000))
+    os.utime(pushed, (time.time() - 60, time.time() - 60))
+
+    monitor = UsageMonitor()
+    assert monitor.poll()["tokens"] == 2000
+    monitor.push({"transcript_path": pushed, "received_at": time.monotonic()})
+    assert monitor.poll()["tokens"] == 1000
+    assert monitor.snapshot["session_path"] == str(pushed)
+
+    monitor.push({"transcript_path": pushed, "received_at": time.monotonic() - Config.HOOK_PIN_TTL_S - 1})
+    assert monitor.poll()["tokens"] == 2000, "An expired pin falls back to discovery"
+    assert monitor.pinned_session is None
+    print("[PASS] test_pushed_session_is_pinned passed")
+
+
+@_with_projects_dir
+def test_index_updated_once_per_snapshot(tmp: Path):
+    """Test that every reader of a snapshot shares one update of the session's index"""
+    path = Config.CLAUDE_PROJECTS_DIR / "-work-app" / "s1.jsonl"
+    path.parent.mkdir(parents=True)
+    path.write_text(_assistant(40000))
+
+    saved = (Config.COST_TRACKING_ENABLED, Config.SHOW_SUBAGENTS, Config.COST_LEDGER_FILE,
+             cost_ledger._ledger, TranscriptIndex.update)
+    updates = []
+
+    def counting_update(index, *args, **kwargs):
+        updates.append(index.transcript_path)
+        return saved[-1](index, *args, **kwargs)
+
+    Config.COST_TRACKING_ENABLED = True
+    Config.SHOW_SUBAGENTS = True
+    Config.COST_LEDGER_FILE = tmp / "costs.json"
+    cost_ledger._ledger = None
+    TranscriptIndex.update = counting_update
+    try:
+        monitor = UsageMonitor(track_sessions=True)
+        snapshot = monitor.poll()
+        assert snapshot["tokens"] == 40000 and snapshot["costs"] is not None
+        assert len(snapshot["sessions"]) == 1
+        assert updates.count(path) == 1, f"Index updated {updates.count(path)} times in one poll"
+    finally:
+        (Config.COST_TRACKING_ENABLED, Config.SHOW_SUBAGENTS, Config.COST_LEDGER_FILE,
+         cost_ledger._ledger, TranscriptIndex.update) = saved
+    print("[PASS] test_index_updated_once_per_snapshot passed")
+
+
+def test_format_snapshot():
+    """Test the headless status line"""
+    assert format_snapshot(empty_snapshot()) == "No active session"
+    snapshot = dict(empty_snapshot(), active=True, project="app", percentage=42.25,
+                    tokens=84500, plan_limit=200000, model_name="Opus 4.6",
+                    subagents=[{"tokens": 31000}, {"tokens": 12400}])
+    line = format_snapshot(snapshot)
+    assert line.startswith("app  42.2%  84,500 / 200,000 tokens  [Opus 4.6]"), line
+    assert line.endswith("subagents=2"), line
+    assert format_subagents(snapshot["subagents"]) == "2 subagents: 31k, 12k"
+    assert format_subagents([]) == ""
+    print("[PASS] test_format_snapshot passed")
+
+
+if __name__ == "__main__":
+    print("Running usage_monitor tests...\n")
+
+    try:
+        test_subscribers_only_see_changes()
+        test_pushed_session_is_pinned()
+        test_index_updated_once_per_snapshot()
+        test_format_snapshot()
+
+        print("\n[PASS] All tests passed!")
+    except AssertionError as e:
+        print(f"\n[FAIL] Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n[FAIL] Error running tests: {e}")
+        sys.exit(1)